@@ -0,0 +1,167 @@
+"""
+Uygulamanın sıcak yolları için çevrimdışı benchmark.
+
+sheets_store (load_data, load_page, load_record, prefetch_worksheets, save_data_row, submit_save,
+delete_row_by_value, delete_rows_by_values, bulk_upsert, sync_if_changed), liste araması, kohort istatistiği ve veri kontrolü, fake_gspread arka ucu üzerinde 1k/10k/100k satırla çalıştırılır;
+her adım için süre, Sheets API çağrı sayısı ve tepe bellek raporlanır.
+
+Çalıştırma:
+    python benchmarks/bench_app.py
+    python benchmarks/bench_app.py --rows 1000 10000 --latency 0.05 --json sonuc.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("NEU_KARDIYO_MIRROR", ":memory:")
+os.environ.setdefault("NEU_KARDIYO_JOURNAL", ":memory:")
+# Çıplak modda (ScriptRunContext yok) Streamlit'in her çağrıdaki uyarısını sustur
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import plausibility  # noqa: E402
+import sheets_store as store  # noqa: E402
+from cohort_stats import CohortStats  # noqa: E402
+from fake_gspread import FakeClient, FakeSpreadsheet  # noqa: E402
+from schema import COLUMN_SCHEMA, FLOAT  # noqa: E402
+from search_index import SearchIndex  # noqa: E402
+
+KEY = "Dosya Numarası"
+HEKIMLER = ["FATİH", "ZEYNEP", "NURAY", "LEYLA"]
+
+def data_values(n: int, seed=3):
+    """1. sayfa: başlık + n hasta (metin hücreler; satır sürümü sütunu gerçek sayfadaki gibi baştan var)."""
+    rnd = random.Random(seed)
+    headers = [KEY, "Adı Soyadı", "Tarih", "Hekim", "İletişim"] + list(COLUMN_SCHEMA) + [store.ROW_VERSION_COL]
+
+    def cell(col):
+        kind = COLUMN_SCHEMA[col]
+        if kind == FLOAT:
+            return f"{rnd.uniform(0, 200):.2f}"
+        if kind == "boolean":
+            return rnd.choice(["True", "False"])
+        if kind == "category":
+            return rnd.choice(["NSR", "Erkek", "Kadın"])
+        return str(rnd.randint(30, 180))
+
+    rows = [
+        [str(100000 + i), f"Hasta {i}", f"2024-{rnd.randint(1, 12):02d}-01", rnd.choice(HEKIMLER), ""]
+        + [cell(c) for c in headers[5:-1]] + [""]
+        for i in range(n)
+    ]
+    return [headers] + rows
+
+def log_values(headers, n):
+    return [headers] + [[f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}"] + ["x"] * (len(headers) - 1) for i in range(n)]
+
+def bulk_records(n):
+    """Toplu içe aktarma: mevcut 250 kayda yeni lab değerleri + 250 yeni kayıt."""
+    existing = [{KEY: str(100000 + i), "Hgb": "11.5", "LDL": "140"} for i in range(100, min(n, 350))]
+    new = [{KEY: str(700000 + i), "Hgb": "13.0", "LVEDD": "50", "IVS": "10", "PW": "9"} for i in range(250)]
+    return existing + new
+
+def make_backend(n, latency, quota):
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", data_values(n)),
+            ("Case Report", log_values(["TarihSaat", "Tarih", "Dosya No", "Hasta", "Doktor", "Not"], 200)),
+            ("Editöre Mektup", log_values(["TarihSaat", "Tarih", "Dergi Adı", "Makale İsmi", "Yazarlar"], 200)),
+        ],
+        latency=latency,
+        quota_per_min=quota,
+    )
+    store.use_client(FakeClient([sh]))
+    return sh
+
+def measure(sh, name, fn, track_memory):
+    calls0 = sh.total_calls
+    if track_memory:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    wall = time.perf_counter() - t0
+    peak = 0
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"step": name, "ms": wall * 1000, "api_calls": sh.total_calls - calls0, "peak_mb": peak / 1e6}
+
+def run_size(n, latency, quota, track_memory):
+    sh = make_backend(n, latency, quota)
+    cache = store.get_read_cache()
+    new_id = str(900000 + n)
+    indexes = store.study_worksheet_indexes(store.SHEET_ID)
+    payload = {KEY: "100001", "Hekim": "ZEYNEP", "Hgb": "13.2", "LVEDD": "48"}
+
+    def search():
+        df = store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY)
+        idx = cache.derived(store.SHEET_ID, store.DATA_WS_INDEX, df, "search", lambda: SearchIndex(df, prefix_col=KEY))
+        idx.filter(df, "zeynep")
+        idx.filter(df, "1001", prefix=True)
+
+    def cohort():
+        df = store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY)
+        cache.derived(
+            store.SHEET_ID, store.DATA_WS_INDEX, df, "cohort_stats", lambda: CohortStats(df),
+            update=lambda old, removed, added: old.updated(removed, added),
+        ).summary()
+
+    def prefetch():
+        store.prefetch_worksheets(exclude=(store.SHEET_ID, store.DATA_WS_INDEX))
+        while store.get_prefetcher().stats()["pending"]:
+            time.sleep(0.001)
+
+    steps = [
+        ("load_data (soğuk)", lambda: store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY)),
+        ("load_data (sıcak)", lambda: store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY)),
+        ("load_page (3 sütun, 50 satır)", lambda: store.load_page(
+            store.SHEET_ID, store.DATA_WS_INDEX, [KEY, "Tarih", "Hekim"], 3, 50, "Tarih", True)),
+        ("load_record (tek hasta)", lambda: store.load_record(store.SHEET_ID, store.DATA_WS_INDEX, "100007")),
+        ("ön yükleme (diğer sekmeler)", prefetch),
+        ("sekme geçişi (ön yüklenmiş)", lambda: store.load_data(store.CASE_SHEET_ID, store.CASE_WS_INDEX)),
+        ("değişiklik kontrolü (aynı)", lambda: store.sync_if_changed(store.SHEET_ID, indexes)),
+        ("arama (indeks + 2 sorgu)", search),
+        ("kohort istatistiği (tam)", cohort),
+        ("veri kontrolü (tüm tablo)", lambda: plausibility.flag_report(
+            store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY))),
+        ("save_data_row (güncelle)", lambda: store.save_data_row(store.SHEET_ID, payload, KEY, store.DATA_WS_INDEX)),
+        ("save_data_row (yeni)", lambda: store.save_data_row(store.SHEET_ID, {**payload, KEY: new_id}, KEY, store.DATA_WS_INDEX)),
+        ("submit_save (günlük üzerinden)", lambda: store.submit_save(
+            store.SHEET_ID, {**payload, "Hgb": "13.4"}, KEY, store.DATA_WS_INDEX)),
+        ("kohort istatistiği (yazma sonrası)", cohort),
+        ("delete_row_by_value", lambda: store.delete_row_by_value(store.SHEET_ID, store.DATA_WS_INDEX, KEY, new_id)),
+        ("delete_rows_by_values (10)", lambda: store.delete_rows_by_values(
+            store.SHEET_ID, store.DATA_WS_INDEX, KEY, [str(100010 + i) for i in range(10)])),
+        ("bulk_upsert (250 güncel.+250 yeni)", lambda: store.bulk_upsert(
+            store.SHEET_ID, bulk_records(n), KEY, store.DATA_WS_INDEX, dry_run=False)),
+        ("değişiklik kontrolü (yazılmış)", lambda: store.sync_if_changed(store.SHEET_ID, indexes)),
+        ("load_data (yazma sonrası)", lambda: store.load_data(store.SHEET_ID, store.DATA_WS_INDEX, required_col=KEY)),
+    ]
+    return [{"rows": n, **measure(sh, name, fn, track_memory)} for name, fn in steps]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--latency", type=float, default=0.0, help="API çağrısı başına gecikme (s)")
+    ap.add_argument("--quota", type=int, default=None, help="dakika başına API kotası")
+    ap.add_argument("--no-memory", action="store_true", help="tracemalloc kapalı (süreler daha gerçekçi)")
+    ap.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    args = ap.parse_args()
+
+    results = []
+    print(f"{'satır':>8}  {'adım':<36}{'ms':>10}{'API':>6}{'tepe MB':>10}")
+    for n in args.rows:
+        for r in run_size(n, args.latency, args.quota, not args.no_memory):
+            results.append(r)
+            print(f"{r['rows']:>8}  {r['step']:<36}{r['ms']:>10.1f}{r['api_calls']:>6}{r['peak_mb']:>10.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+SheetsClient dayanıklılık denemesi: sahte Sheets arka ucu belirli oranda
+429/5xx hatası enjekte eder; tekrar deneme, birleştirme ve hata raporu sayılır.
+
+Çalıştırma:  python benchmarks/bench_client.py [hata_oranı]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from fake_gspread import FakeSpreadsheet, FaultInjector  # noqa: E402
+from sheets_client import SheetsClient, SheetsError  # noqa: E402
+
+def main(fail_rate=0.3):
+    faults = FaultInjector(fail_rate=0.0, seed=1)
+    values = [["Dosya Numarası", "Hgb"]] + [[str(i), "13.1"] for i in range(1000)]
+    sh = FakeSpreadsheet("bench", [("Sayfa1", values)], faults=faults)
+    ws = sh.worksheets()[0]
+    faults.fail_rate = fail_rate
+    # Gerçek beklemeler yerine çok kısa: kota ve geri çekilme mantığı aynı
+    client = SheetsClient(read_per_min=6000, write_per_min=6000, base_delay=0.001, max_delay=0.01)
+
+    ok = failed = 0
+    t0 = time.perf_counter()
+    for i in range(200):
+        try:
+            client.call("get_all_values", ws.get_all_values)
+            ok += 1
+        except SheetsError:
+            failed += 1
+    print(f"Sıralı 200 okuma: {ok} başarılı, {failed} başarısız, {time.perf_counter() - t0:.2f} s")
+
+    faults.fail_rate = 0.0
+    slow = lambda: (time.sleep(0.05), ws.get_all_values())[1]  # noqa: E731
+    threads = [
+        threading.Thread(target=client.call, args=("get_all_values", slow), kwargs={"key": "ws0"})
+        for _ in range(20)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    print(f"İstemci sayaçları: {client.counters}")
+    print(f"Enjekte edilen hata: {faults.injected}, kaydedilen hata: {len(client.errors)}")
+    if client.errors:
+        print(f"Son hata: {client.last_error()}")
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 0.3)
@@ -0,0 +1,132 @@
+"""
+Veri Girişi ekranının rerun maliyeti: tam sayfa vs fragment.
+
+web_app.py, Streamlit AppTest ile fake_gspread arka ucu üzerinde çalıştırılır.
+Her etkileşim (liste araması, mod değişimi) iki kez ölçülür:
+
+- fragment: etkileşim tarayıcıdaki gibi yalnızca ilgili fragment'ı yeniden çalıştırır
+  (arama -> data_list; mod değişimi -> data_mode, ardından geri çağrının istediği
+  data_mode + entry_form). Süre, bu etkileşimde kapanan "fragment:<key>" perf
+  run'larının toplamıdır.
+- tam rerun: fragment'sız yapıda aynı etkileşimin gerektirdiği tam sayfa rerun'ı.
+
+AppTest widget etkileşimini her zaman tam rerun olarak gönderir; fragment rerun'ı için
+istek verisine tarayıcının yaptığı gibi fragment kimlikleri eklenir.
+
+Çalıştırma:
+    python benchmarks/bench_rerun.py
+    python benchmarks/bench_rerun.py --rows 1000 10000 --repeat 5
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+
+os.environ.setdefault("NEU_KARDIYO_MIRROR", ":memory:")
+os.environ.setdefault("NEU_KARDIYO_JOURNAL", ":memory:")
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import streamlit.testing.v1.local_script_runner as local_runner  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from bench_app import make_backend  # noqa: E402
+
+class RunLog(logging.Handler):
+    """perf'in her rerun sonunda yazdığı JSON satırlarından (etiket, ms) toplar."""
+
+    def __init__(self):
+        super().__init__()
+        self.runs = []
+
+    def emit(self, record):
+        data = json.loads(record.getMessage())
+        if data.get("event") == "rerun":
+            self.runs.append((data["label"], data["total_ms"]))
+
+def install_run_log() -> RunLog:
+    handler = RunLog()
+    perf_log = logging.getLogger("neu_kardiyo.perf")
+    perf_log.setLevel(logging.INFO)
+    perf_log.propagate = False
+    perf_log.addHandler(handler)
+    logging.getLogger("neu_kardiyo").addHandler(logging.NullHandler())
+    return handler
+
+def run_fragments(at, *keys):
+    """Tarayıcıdaki gibi yalnızca verilen fragment'ları yeniden çalıştırır (bekleyen widget durumuyla)."""
+    storage = at._fragment_storage
+    ids = [fid for k in keys for fid in storage._ids_by_target_key.get(k, ())]
+    if not ids:
+        raise RuntimeError(f"fragment bulunamadı: {keys}")
+    original = local_runner.RerunData
+    local_runner.RerunData = functools.partial(original, fragment_id_queue=ids)
+    try:
+        at.run()
+    finally:
+        local_runner.RerunData = original
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    at.run()  # AppTest ağacı yalnızca fragment'ı içerir; sonraki etkileşim için tam sayfayı geri kur
+
+def measure(log, fn, fragment):
+    """fn sırasında kapanan run'ların toplam süresi (fragment=True: yalnızca fragment run'ları)."""
+    start = len(log.runs)
+    fn()
+    runs = log.runs[start:]
+    if fragment:
+        runs = [r for r in runs if r[0].startswith("fragment:")]
+    else:
+        runs = runs[-1:]
+    return sum(ms for _, ms in runs)
+
+def search_box(at):
+    return next(t for t in at.text_input if t.label.startswith("🔎"))
+
+def run_size(n, repeat, log):
+    make_backend(n, 0.0, None)
+    at = AppTest.from_file(os.path.join(ROOT, "web_app.py"), default_timeout=120)
+    at.secrets["app_password"] = "bench"
+    at.session_state["auth_ok"] = True
+    at.run()
+    search_box(at).input("1000").run()  # ısınma: arama indeksi kurulur
+
+    samples = {"arama (liste)": ([], []), "mod değişimi": ([], [])}
+    for i in range(repeat):
+        frag, full = samples["arama (liste)"]
+        search_box(at).set_value(str(100000 + i))
+        frag.append(measure(log, lambda: run_fragments(at, "data_list"), fragment=True))
+        full.append(measure(log, lambda: search_box(at).input(str(200000 + i)).run(), fragment=False))
+
+        frag, full = samples["mod değişimi"]
+        mode = "Düzenleme" if i % 2 == 0 else "Yeni Kayıt"
+        at.radio(key="data_mode").set_value(mode)
+        frag.append(measure(log, lambda: run_fragments(at, "data_mode"), fragment=True))
+        # Fragment'sız yapıda aynı etkileşim, yeni durumla tüm sayfanın yeniden çalışmasıdır
+        full.append(measure(log, at.run, fragment=False))
+
+    return [
+        {"rows": n, "step": name, "full_ms": statistics.median(full), "fragment_ms": statistics.median(frag)}
+        for name, (frag, full) in samples.items()
+    ]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    log = install_run_log()
+
+    print(f"{'satır':>8}  {'etkileşim':<20}{'tam rerun ms':>14}{'fragment ms':>14}{'kazanç':>9}")
+    for n in args.rows:
+        for r in run_size(n, args.repeat, log):
+            gain = r["full_ms"] / r["fragment_ms"] if r["fragment_ms"] else float("inf")
+            print(f"{r['rows']:>8}  {r['step']:<20}{r['full_ms']:>14.1f}{r['fragment_ms']:>14.1f}{gain:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
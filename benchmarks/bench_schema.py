@@ -0,0 +1,70 @@
+"""
+load_data ayrıştırma karşılaştırması: eski df.astype(str), schema.apply_schema ve
+satırlardan doğrudan tiplenmiş kurulum yapan schema.build_frame
+(float32 / Int32 / boolean / category). Süre ve bellek kullanımı raporlanır.
+
+Çalıştırma:  python benchmarks/bench_schema.py [satır_sayısı]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from schema import (  # noqa: E402
+    BOOL_COLS, CATEGORY_COLS, COLUMN_SCHEMA, FLOAT, INT_COLS, apply_schema, build_frame, memory_bytes,
+)
+
+def synthetic_values(n: int, seed=7):
+    """get_all_values() biçiminde (başlık + metin satırlar) sahte H-Type HT sayfası."""
+    rnd = random.Random(seed)
+    headers = ["Dosya Numarası", "Adı Soyadı", "Tarih", "Hekim"] + list(COLUMN_SCHEMA)
+
+    def cell(col):
+        kind = COLUMN_SCHEMA[col]
+        if col in INT_COLS:
+            return str(rnd.randint(20, 180))
+        if col in BOOL_COLS:
+            return rnd.choice(["True", "False"])
+        if col in CATEGORY_COLS:
+            return rnd.choice(["NSR", "LBBB", "Erkek", "Kadın"])
+        if kind == FLOAT:
+            return "" if rnd.random() < 0.1 else f"{rnd.uniform(0, 300):.2f}"
+        return ""
+
+    rows = [
+        [str(100000 + i), f"Hasta {i}", "2024-05-01", "ZEYNEP"] + [cell(c) for c in headers[4:]]
+        for i in range(n)
+    ]
+    return headers, rows
+
+def main(n=50_000):
+    headers, rows = synthetic_values(n)
+    print(f"{n} satır, {len(headers)} sütun")
+
+    t0 = time.perf_counter()
+    old = pd.DataFrame(rows, columns=headers).astype(str)
+    old_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    new = apply_schema(pd.DataFrame(rows, columns=headers))
+    new_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    built = build_frame(headers, rows)
+    built_s = time.perf_counter() - t0
+
+    old_mb, new_mb, built_mb = memory_bytes(old) / 1e6, memory_bytes(new) / 1e6, memory_bytes(built) / 1e6
+    print(f"astype(str):   {old_s * 1000:8.1f} ms  {old_mb:8.1f} MB")
+    print(f"apply_schema:  {new_s * 1000:8.1f} ms  {new_mb:8.1f} MB  ({old_mb / new_mb:.1f}x daha az bellek)")
+    print(f"build_frame:   {built_s * 1000:8.1f} ms  {built_mb:8.1f} MB  ({old_mb / built_mb:.1f}x daha az bellek)")
+
+    for c in COLUMN_SCHEMA:
+        assert str(new[c].dtype) == str(built[c].dtype), c
+        pd.testing.assert_series_equal(new[c], built[c], check_names=False)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
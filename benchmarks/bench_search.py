@@ -0,0 +1,69 @@
+"""
+Arama filtresi karşılaştırması: eski satır başına apply() filtresi ile
+SearchIndex (veri versiyonu başına bir kez kurulan katlanmış metin sütunu).
+
+Çalıştırma:  python benchmarks/bench_search.py [satır_sayısı]
+"""
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from search_index import SearchIndex  # noqa: E402
+
+HEKIMLER = ["FATİH", "ZEYNEP", "NURAY", "LEYLA", "İbrahim", "Işıl"]
+QUERIES = ["12", "zeynep", "fatih", "ışıl", "2024-05", "yok-boyle-bir-sey"]
+
+def synthetic_frame(n: int, seed=42) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "Dosya Numarası": [str(100000 + i) for i in range(n)],
+            "Tarih": [f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}" for _ in range(n)],
+            "Hekim": [rnd.choice(HEKIMLER) for _ in range(n)],
+            "Hgb": [f"{rnd.uniform(9, 17):.1f}" for _ in range(n)],
+            "LVEDD": [f"{rnd.uniform(38, 60):.0f}" for _ in range(n)],
+            "EKG": [rnd.choice(["NSR", "LBBB", "RBBB"]) for _ in range(n)],
+        }
+    )
+
+def apply_filter(df: pd.DataFrame, q: str) -> pd.DataFrame:
+    """Önceki uygulama (web_app.py): satır başına Series oluşturan apply."""
+    mask = df.apply(
+        lambda row: row.astype(str).str.contains(q, case=False, na=False).any(),
+        axis=1,
+    )
+    return df[mask]
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+def main(n=50_000):
+    df = synthetic_frame(n)
+    print(f"{n} satır, {len(df.columns)} sütun")
+
+    build_s, idx = timed(SearchIndex, df, None, "Dosya Numarası", repeat=1)
+    print(f"İndeks kurulumu (versiyon başına bir kez): {build_s * 1000:.1f} ms")
+    print(f"{'sorgu':<20}{'apply (ms)':>12}{'indeks (ms)':>13}{'hız':>8}{'eşleşme':>10}")
+    for q in QUERIES:
+        old_s, old = timed(apply_filter, df, q, repeat=1)
+        new_s, new = timed(idx.filter, df, q)
+        print(f"{q:<20}{old_s * 1000:>12.1f}{new_s * 1000:>13.2f}{old_s / new_s:>7.0f}x{len(new):>10}")
+        # i/ı/İ/I katlaması nedeniyle indeks eski filtrenin üst kümesidir
+        assert set(old.index) <= set(new.index)
+
+    pre_s, pre = timed(idx.filter, df, "1001", True)
+    print(f"Dosya No önek araması '1001': {pre_s * 1000:.2f} ms, {len(pre)} eşleşme")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,147 @@
+"""
+Soğuk başlangıç benchmark'ı: modül import süresi + ekran başına ilk çizim süresi.
+
+1) Import: web_app.py'nin içe aktardığı modüller ayrı, taze bir Python sürecinde
+   `-X importtime` ile yüklenir; üst düzey modül başına kümülatif süre ve tembel
+   yüklenmesi gereken ağır paketlerin (gspread, oauth2client, openpyxl)
+   açılışta yüklenip yüklenmediği raporlanır.
+2) İlk çizim: her ekran için arka uç ve paylaşılan kaynaklar sıfırlanır (konteyner
+   yeniden başlaması gibi), web_app.py Streamlit AppTest ile fake_gspread üzerinde
+   o ekran seçili olarak bir kez çalıştırılır; toplam süre, başlık / kenar çubuğu
+   payı, API çağrısı ve ardından gelen sıcak rerun süresi raporlanır.
+
+Çalıştırma:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --rows 10000 --repeat 5 --json baslangic.json
+"""
+import argparse
+import ast
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+
+os.environ.setdefault("NEU_KARDIYO_MIRROR", ":memory:")
+os.environ.setdefault("NEU_KARDIYO_JOURNAL", ":memory:")
+os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Uygulamanın rerun başına JSON log satırları tabloyu bölmesin
+logging.getLogger("neu_kardiyo").addHandler(logging.NullHandler())
+
+def app_imports():
+    """web_app.py'nin üst düzeyde içe aktardığı stdlib dışı modüller (sırasıyla); elle tutulan liste eskimesin."""
+    with open(os.path.join(ROOT, "web_app.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0:
+            names.append(node.module)
+    top = dict.fromkeys(n.split(".")[0] for n in names)
+    return [m for m in top if m not in sys.stdlib_module_names]
+
+# web_app.py'nin açılışta içe aktardığı modüller (sırasıyla)
+APP_IMPORTS = app_imports()
+LAZY = ["gspread", "oauth2client", "openpyxl"]  # pyarrow'yı pandas kendisi yükler
+
+def import_once():
+    """Taze süreçte APP_IMPORTS'u yükler: ({modül: ms}, açılışta yüklenen tembel paketler)."""
+    code = (
+        f"import sys, json\nimport {', '.join(APP_IMPORTS)}\n"
+        f"print(json.dumps([m for m in {LAZY!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith(" ") and not name.startswith("  ") and cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1000  # yalnızca üst düzey modüller
+    return times, json.loads(proc.stdout.strip().splitlines()[-1])
+
+def bench_imports(repeat):
+    runs = [import_once() for _ in range(repeat)]
+    names = [m for m in APP_IMPORTS if all(m in t for t, _ in runs)]
+    per_module = {m: statistics.median(t[m] for t, _ in runs) for m in names}
+    totals = [sum(t.values()) for t, _ in runs]
+    return per_module, statistics.median(totals), runs[-1][1]
+
+def bench_first_render(n, repeat):
+    from streamlit.testing.v1 import AppTest
+    from bench_app import make_backend
+
+    def app(screen=None):
+        at = AppTest.from_file(os.path.join(ROOT, "web_app.py"), default_timeout=120)
+        at.secrets["app_password"] = "bench"
+        at.session_state["auth_ok"] = True
+        if screen is not None:
+            at.session_state["menu"] = screen
+        return at
+
+    # Isınma + ekran listesi (ilk AppTest'in betik derleme maliyeti ölçüme girmesin)
+    make_backend(n, 0.0, None)
+    probe = app()
+    probe.run()
+    screens = list(probe.radio(key="menu").options)
+
+    out = []
+    for screen in screens:
+        samples = []
+        for _ in range(repeat):
+            sh = make_backend(n, 0.0, None)  # önbellek, ayna ve tutamaçlar sıfırlanır
+            at = app(screen)
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"{screen}: {at.exception[0].message}")
+            first = at.session_state["perf_last"]
+            calls = sh.total_calls
+            at.run()
+            samples.append({
+                "first_ms": first.total_ms,
+                "header_ms": first.spans.get("header", (0, 0.0))[1],
+                "sidebar_ms": first.spans.get("sidebar", (0, 0.0))[1],
+                "api_calls": calls,
+                "warm_ms": at.session_state["perf_last"].total_ms,
+            })
+        out.append({"rows": n, "screen": screen, **{k: statistics.median(s[k] for s in samples) for k in samples[0]}})
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    args = ap.parse_args()
+
+    per_module, total, loaded = bench_imports(args.repeat)
+    print(f"{'modül':<20}{'import ms':>12}")
+    for name, ms in per_module.items():
+        print(f"{name:<20}{ms:>12.1f}")
+    print(f"{'toplam':<20}{total:>12.1f}")
+    print(f"açılışta yüklenen tembel paketler: {', '.join(loaded) or 'yok'}\n")
+
+    renders = []
+    print(f"{'satır':>8}  {'ekran':<38}{'ilk ms':>9}{'başlık':>8}{'kenar':>8}{'API':>6}{'sıcak ms':>10}")
+    for n in args.rows:
+        for r in bench_first_render(n, args.repeat):
+            renders.append(r)
+            print(
+                f"{r['rows']:>8}  {r['screen']:<38}{r['first_ms']:>9.1f}{r['header_ms']:>8.1f}"
+                f"{r['sidebar_ms']:>8.1f}{r['api_calls']:>6.0f}{r['warm_ms']:>10.1f}"
+            )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"imports": per_module, "import_total_ms": total, "lazy_loaded": loaded, "renders": renders},
+                      f, ensure_ascii=False, indent=1)
+
+if __name__ == "__main__":
+    main()
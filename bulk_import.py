@@ -0,0 +1,120 @@
+"""
+CSV / Excel'den toplu hasta aktarımı (eko ve laboratuvar çıktıları).
+
+Kaynak sütunlar sayfadaki alan adlarına eşlenir, hücreler şemaya göre doğrulanıp
+sayfaya yazılacak metne çevrilir, türetilmiş ölçümler mevcut kayıtla birleştirilmiş
+değerlerden hesaplanır ve mevcut kayıtlarla karşılaştırılarak bir plan (yeni kayıtlar,
+hücre bazında değişiklikler) çıkarılır. Yazma sheets_store.bulk_upsert'tedir;
+bu modül Streamlit'e ve Sheets'e bağımlı değildir.
+"""
+import io
+import re
+
+import numpy as np
+import pandas as pd
+
+import derived_metrics as metrics
+from schema import COLUMN_SCHEMA, normalize_cells, same_cell
+from search_index import tr_fold
+
+def read_table(data: bytes, filename: str) -> pd.DataFrame:
+    """Yüklenen dosyayı tüm hücreleri metin olacak şekilde okur (.csv ayraç otomatik, .xlsx/.xls)."""
+    if filename.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(io.BytesIO(data), dtype=str)
+    else:
+        text = data.decode("utf-8-sig", errors="replace")
+        df = pd.read_csv(io.StringIO(text), dtype=str, sep=None, engine="python")
+    df.columns = [str(c).strip() for c in df.columns]
+    return df.fillna("")
+
+def _fold_name(name: str) -> str:
+    return re.sub(r"[^0-9a-zçğöşü]", "", tr_fold(name))
+
+# Laboratuvar / eko çıktılarında sık görülen başlıklar
+_ALIASES = {"dosyano": "Dosya Numarası", "hastano": "Dosya Numarası", "protokolno": "Dosya Numarası"}
+
+def suggest_mapping(source_cols, fields) -> dict:
+    """Kaynak sütun -> alan adı önerisi (büyük/küçük harf, boşluk ve noktalama farkı yok sayılır)."""
+    by_fold = {}
+    for f in fields:
+        by_fold.setdefault(_fold_name(f), f)
+    for alias, f in _ALIASES.items():
+        if f in fields:
+            by_fold.setdefault(alias, f)
+    return {c: by_fold.get(_fold_name(c)) for c in source_cols}
+
+def validate(src: pd.DataFrame, mapping: dict, key_col: str, schema=None):
+    """
+    Eşlenen sütunları doğrular ve normalize eder.
+    (kayıtlar, hatalar) döner: kayıtlar {alan: metin} listesi (boş hücreler yazılmaz,
+    mevcut değeri silmez); hatalı satırlar kayıtlara alınmaz.
+    """
+    schema = COLUMN_SCHEMA if schema is None else schema
+    cols = {field: src_col for src_col, field in mapping.items() if field}
+    if key_col not in cols:
+        return [], [{"Satır": None, "Sütun": key_col, "Değer": "", "Hata": "Anahtar sütunu eşlenmedi"}]
+
+    errors = []
+    bad_rows = np.zeros(len(src), dtype=bool)
+    cells = {}
+    for field, src_col in cols.items():
+        values, bad = normalize_cells(src[src_col].to_numpy(), schema.get(field))
+        cells[field] = values
+        for i in np.flatnonzero(bad):
+            errors.append({"Satır": int(i) + 2, "Sütun": src_col, "Değer": src[src_col].iloc[i], "Hata": "Geçersiz değer"})
+        bad_rows |= bad
+
+    keys = pd.Series(cells[key_col])
+    for i in np.flatnonzero((keys == "").to_numpy()):
+        errors.append({"Satır": int(i) + 2, "Sütun": cols[key_col], "Değer": "", "Hata": f"{key_col} boş"})
+    bad_rows |= (keys == "").to_numpy()
+    dup = keys.duplicated(keep=False).to_numpy() & (keys != "").to_numpy()
+    for i in np.flatnonzero(dup):
+        errors.append({"Satır": int(i) + 2, "Sütun": cols[key_col], "Değer": keys.iloc[i], "Hata": "Dosyada tekrar eden kayıt"})
+    bad_rows |= dup
+
+    records = [
+        {f: cells[f][i] for f in cols if cells[f][i] != ""}
+        for i in range(len(src)) if not bad_rows[i]
+    ]
+    return records, errors
+
+def _fmt(v) -> str:
+    return "" if np.isnan(v) else repr(float(v))
+
+def add_derived(records, existing: dict, key_col: str):
+    """
+    Her kaydın türetilmiş alanlarını (BMI, BSA, LV Mass, ...) mevcut kayıtla birleştirilmiş
+    değerlerden tek vektörel hesapla doldurur. existing: anahtar -> {alan: metin}.
+    Girdisi eksik alanlar boş bırakılır (0 = ölçülmedi).
+    """
+    if not records:
+        return records
+    merged = pd.DataFrame([{**existing.get(r[key_col], {}), **r} for r in records])
+    derived = metrics.compute_derived(merged, blank=True)
+    for col, vals in derived.items():
+        vals = np.broadcast_to(np.asarray(vals, dtype="float64"), (len(records),))
+        for r, v in zip(records, vals):
+            r[col] = _fmt(v)
+    return records
+
+def plan(records, existing: dict, key_col: str) -> dict:
+    """
+    Kuru çalıştırma: hangi kayıtlar eklenecek, hangi hücreler değişecek.
+    {"new": [kayıt], "updates": {anahtar: {alan: yeni}}, "diff": [satır], "unchanged": n}
+    """
+    new, updates, diff = [], {}, []
+    unchanged = 0
+    for r in records:
+        key = r[key_col]
+        old = existing.get(key)
+        if old is None:
+            new.append(r)
+            continue
+        changed = {f: v for f, v in r.items() if not same_cell(v, old.get(f, ""))}
+        if not changed:
+            unchanged += 1
+            continue
+        updates[key] = changed
+        diff.extend({key_col: key, "Alan": f, "Eski": old.get(f, ""), "Yeni": v} for f, v in changed.items())
+    return {"new": new, "updates": updates, "diff": diff, "unchanged": unchanged}
@@ -0,0 +1,126 @@
+"""
+İstatistik ekranı için kohort özetleri: grup başına (Cinsiyet, DM) n / ortalama / SS
+ve seçili değişken çiftleri için Pearson korelasyonu.
+
+Sonuçlar yeterli istatistiklerden (adet, toplam, kareler toplamı, çapraz çarpım
+toplamı) türetilir. Bunlar tüm kohort için bir kez vektörel kurulur; tek satırlık
+yazmada eski satırın katkısı çıkarılıp yenisininki eklenir, kohort yeniden taranmaz.
+"""
+import numpy as np
+import pandas as pd
+
+STAT_COLS = ["Homosistein", "LVMi", "GLS", "Mitral E/e'", "RWT", "LVEF"]
+CORR_PAIRS = [
+    ("Homosistein", "LVMi"),
+    ("Homosistein", "RWT"),
+    ("Homosistein", "GLS"),
+    ("Homosistein", "Mitral E/e'"),
+    ("LVMi", "GLS"),
+]
+ALL = "Tümü"
+
+# Grup etiketi -> (Cinsiyet, DM); None: o ölçüte göre ayrılmaz
+GROUPS = {
+    ALL: (None, None),
+    "Erkek": ("Erkek", None),
+    "Kadın": ("Kadın", None),
+    "DM var": (None, True),
+    "DM yok": (None, False),
+    "Erkek · DM var": ("Erkek", True),
+    "Erkek · DM yok": ("Erkek", False),
+    "Kadın · DM var": ("Kadın", True),
+    "Kadın · DM yok": ("Kadın", False),
+}
+
+def _values(df: pd.DataFrame, col) -> np.ndarray:
+    """Sütun float64 olarak; form boş alanı 0 yazdığından 0 da eksik (NaN) sayılır."""
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    x = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return np.where(x == 0, np.nan, x)
+
+def _membership(df: pd.DataFrame) -> np.ndarray:
+    """(grup sayısı x satır) 0/1 matrisi."""
+    n = len(df)
+    sex = df["Cinsiyet"].astype(str).str.strip().to_numpy() if "Cinsiyet" in df.columns else np.full(n, "")
+    dm = df["DM"].astype("boolean") if "DM" in df.columns else pd.Series(pd.NA, index=df.index, dtype="boolean")
+    dm_is = {True: dm.eq(True).fillna(False).to_numpy(bool), False: dm.eq(False).fillna(False).to_numpy(bool)}
+    rows = []
+    for sex_v, dm_v in GROUPS.values():
+        m = np.ones(n, dtype=bool)
+        if sex_v is not None:
+            m &= sex == sex_v
+        if dm_v is not None:
+            m &= dm_is[dm_v]
+        rows.append(m)
+    return np.array(rows, dtype="float64").reshape(len(GROUPS), n)
+
+def _moments(df: pd.DataFrame) -> dict:
+    """Satırların katkısı: grup x değişken (ve grup x çift) toplamları."""
+    member = _membership(df)
+    vals = {c: _values(df, c) for c in set(STAT_COLS).union(*CORR_PAIRS)}
+    x = np.column_stack([vals[c] for c in STAT_COLS]) if len(df) else np.empty((0, len(STAT_COLS)))
+    ok = ~np.isnan(x)
+    x0 = np.where(ok, x, 0.0)
+    out = {"n": member @ ok, "s": member @ x0, "ss": member @ (x0 * x0)}
+
+    pair = np.zeros((6, len(GROUPS), len(CORR_PAIRS)))
+    for j, (a, b) in enumerate(CORR_PAIRS):
+        both = ~np.isnan(vals[a]) & ~np.isnan(vals[b])
+        xa, xb = np.where(both, vals[a], 0.0), np.where(both, vals[b], 0.0)
+        pair[:, :, j] = (member @ np.column_stack([both, xa, xb, xa * xa, xb * xb, xa * xb])).T
+    out["pair"] = pair
+    return out
+
+class CohortStats:
+    """df: 1. sayfanın tiplenmiş DataFrame'i (load_data)."""
+
+    def __init__(self, df: pd.DataFrame = None, moments=None):
+        self.m = moments if moments is not None else _moments(df)
+
+    def updated(self, removed: pd.DataFrame, added: pd.DataFrame) -> "CohortStats":
+        """removed satırlarının katkısını çıkarıp added'ınkini ekleyen yeni nesne (self değişmez)."""
+        minus = _moments(removed) if len(removed) else None
+        plus = _moments(added) if len(added) else None
+        m = {}
+        for k, v in self.m.items():
+            v = v.copy()
+            if minus is not None:
+                v -= minus[k]
+            if plus is not None:
+                v += plus[k]
+            m[k] = v
+        return CohortStats(moments=m)
+
+    def summary(self) -> pd.DataFrame:
+        """Uzun biçim: Grup, Değişken, n, Ortalama, SS (n < 2 ise SS boş)."""
+        n = np.rint(self.m["n"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(n > 0, self.m["s"] / n, np.nan)
+            var = np.where(n > 1, (self.m["ss"] - n * mean * mean) / (n - 1), np.nan)
+        sd = np.sqrt(np.clip(var, 0, None))  # çıkarma sonrası yuvarlama artığı eksiye düşmesin
+        g, c = np.meshgrid(np.arange(len(GROUPS)), np.arange(len(STAT_COLS)), indexing="ij")
+        labels = list(GROUPS)
+        return pd.DataFrame({
+            "Grup": [labels[i] for i in g.ravel()],
+            "Değişken": [STAT_COLS[j] for j in c.ravel()],
+            "n": n.ravel().astype(int),
+            "Ortalama": mean.ravel(),
+            "SS": sd.ravel(),
+        })
+
+    def correlations(self, group=ALL) -> pd.DataFrame:
+        """group için çift başına n ve Pearson r (n < 3 ya da varyans 0 ise r boş)."""
+        n, sa, sb, saa, sbb, sab = self.m["pair"][:, list(GROUPS).index(group), :]
+        n = np.rint(n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = sab - sa * sb / n
+            va = saa - sa * sa / n
+            vb = sbb - sb * sb / n
+            r = np.where((n >= 3) & (va > 0) & (vb > 0), cov / np.sqrt(va * vb), np.nan)
+        return pd.DataFrame({
+            "Değişken 1": [a for a, _ in CORR_PAIRS],
+            "Değişken 2": [b for _, b in CORR_PAIRS],
+            "n": n.astype(int),
+            "r": np.clip(r, -1, 1),
+        })
@@ -0,0 +1,135 @@
+"""
+Türetilmiş klinik/eko ölçümleri (BMI, BSA, LV Mass, LVMi, RWT, E/A, E/e', LACi,
+TAPSE/Sm, TAPSE/sPAP).
+
+Her fonksiyon hem tekil sayılarla (form) hem de NumPy dizileri / DataFrame
+sütunlarıyla (toplu yeniden hesaplama) çalışır. Girdi eksik (0, boş, NaN) ise
+sonuç formdaki eski davranışla aynı şekilde 0'dır; compute_derived(blank=True) bu
+satırları NaN (boş hücre) olarak döndürür (0 = ölçülmedi).
+"""
+import numpy as np
+import pandas as pd
+
+def _num(x):
+    if isinstance(x, pd.Series):
+        return pd.to_numeric(x, errors="coerce").astype("float64").to_numpy()
+    if np.ndim(x) == 0:
+        try:
+            return np.float64(x)
+        except (TypeError, ValueError):
+            return np.float64("nan")
+    return np.asarray(x, dtype="float64")
+
+def _out(x):
+    return float(x) if np.ndim(x) == 0 else x
+
+def _pos(x):
+    """x > 0 (NaN -> False)"""
+    with np.errstate(invalid="ignore"):
+        return np.greater(x, 0)
+
+def ratio(num, den):
+    """num / den; den <= 0 veya eksikse 0."""
+    num, den = _num(num), _num(den)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(_pos(den), num / np.where(_pos(den), den, 1.0), 0.0)
+    return _out(np.nan_to_num(r))
+
+def bmi(boy_cm, kilo):
+    boy_cm, kilo = _num(boy_cm), _num(kilo)
+    return ratio(kilo, (boy_cm / 100) ** 2)
+
+def bsa(boy_cm, kilo):
+    """Mosteller: sqrt(boy * kilo / 3600)"""
+    boy_cm, kilo = _num(boy_cm), _num(kilo)
+    ok = _pos(boy_cm) & _pos(kilo)
+    return _out(np.where(ok, np.sqrt(np.where(ok, boy_cm * kilo, 0.0) / 3600), 0.0))
+
+def lv_mass(lvedd_mm, ivs_mm, pw_mm):
+    """Devereux (ASE): 0.8 * 1.04 * ((LVEDD + IVS + PW)^3 - LVEDD^3) + 0.6, cm cinsinden."""
+    d, i, p = _num(lvedd_mm) / 10, _num(ivs_mm) / 10, _num(pw_mm) / 10
+    ok = _pos(d) & _pos(i) & _pos(p)
+    with np.errstate(invalid="ignore"):
+        m = 0.8 * (1.04 * ((d + i + p) ** 3 - d ** 3)) + 0.6
+    return _out(np.where(ok, m, 0.0))
+
+def lvmi(lvm, bsa_m2):
+    return ratio(lvm, bsa_m2)
+
+def rwt(pw_mm, lvedd_mm):
+    pw_mm, lvedd_mm = _num(pw_mm), _num(lvedd_mm)
+    return _out(np.where(_pos(pw_mm), _num(ratio(2 * pw_mm, lvedd_mm)), 0.0))
+
+# Çıktı sütunu -> kendisinden hesaplandığı sütunlar (sayfa başlıklarıyla aynı adlar)
+DERIVED_COLUMNS = {
+    "BMI": ["Boy", "Kilo"],
+    "BSA": ["Boy", "Kilo"],
+    "LV Mass": ["LVEDD", "IVS", "PW"],
+    "LVMi": ["LVEDD", "IVS", "PW", "Boy", "Kilo"],
+    "RWT": ["PW", "LVEDD"],
+    "Mitral E/A": ["Mitral E", "Mitral A"],
+    "Mitral E/e'": ["Mitral E", "Septal e'"],
+    "LACi": ["LAEDV", "LVEDV"],
+    "TAPSE/Sm": ["TAPSE", "RV Sm"],
+    "TAPSE/sPAP": ["TAPSE", "sPAP"],
+}
+
+def compute_derived(values, blank=False) -> dict:
+    """
+    values: sütun adı -> değer eşlemesi (dict ya da DataFrame).
+    Tüm türetilmiş sütunları aynı biçimde (tekil ya da dizi) döndürür.
+    blank=True: girdilerinden biri eksik olan değerler 0 yerine NaN olur.
+    """
+    def g(c):
+        return values[c] if c in values else 0.0
+
+    bsa_v = bsa(g("Boy"), g("Kilo"))
+    lvm_v = lv_mass(g("LVEDD"), g("IVS"), g("PW"))
+    out = {
+        "BMI": bmi(g("Boy"), g("Kilo")),
+        "BSA": bsa_v,
+        "LV Mass": lvm_v,
+        "LVMi": lvmi(lvm_v, bsa_v),
+        "RWT": rwt(g("PW"), g("LVEDD")),
+        "Mitral E/A": ratio(g("Mitral E"), g("Mitral A")),
+        "Mitral E/e'": ratio(g("Mitral E"), g("Septal e'")),
+        "LACi": ratio(g("LAEDV"), g("LVEDV")),
+        "TAPSE/Sm": ratio(g("TAPSE"), g("RV Sm")),
+        "TAPSE/sPAP": ratio(g("TAPSE"), g("sPAP")),
+    }
+    if blank:
+        for col, v in out.items():
+            v2 = np.where(inputs_present(values, col), v, np.nan)
+            out[col] = float(v2[0]) if np.ndim(v) == 0 else v2
+    return out
+
+def inputs_present(values, col) -> np.ndarray:
+    """col'un tüm girdileri dolu (> 0) mu; satır başına bool (values: dict ya da DataFrame)."""
+    n = len(values) if isinstance(values, pd.DataFrame) else 1
+    ok = np.ones(n, dtype=bool)
+    for c in DERIVED_COLUMNS[col]:
+        ok &= _pos(_num(values[c])) if c in values else False
+    return ok
+
+def stale_cells(df: pd.DataFrame, rtol=1e-4, atol=1e-3) -> dict:
+    """
+    Sayfadaki türetilmiş değerleri yeniden hesaplananlarla karşılaştırır.
+    Sütun adı -> (satır konumları dizisi, doğru değerler dizisi); yalnızca farklı/eksik olanlar.
+    Girdilerinden biri eksik satırlar karşılaştırılmaz; yalnızca eski formun yazdığı
+    0 değerleri boşaltılır (doğru değer NaN = boş hücre).
+    """
+    fresh = compute_derived(df, blank=True)
+    out = {}
+    for col, new in fresh.items():
+        new = np.broadcast_to(np.asarray(new, dtype="float64"), (len(df),))
+        present = inputs_present(df, col)
+        if col in df.columns:
+            old = _num(df[col])
+            bad = present & ~np.isclose(old, new, rtol=rtol, atol=atol)  # NaN (boş hücre) de eskimiş sayılır
+            bad |= ~present & (old == 0)
+        else:
+            bad = present
+        pos = np.flatnonzero(bad)
+        if len(pos):
+            out[col] = (pos, new[pos])
+    return out
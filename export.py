@@ -0,0 +1,133 @@
+"""
+Çalışma verisinin dışa aktarımı (Excel / CSV / Parquet).
+
+Dosyalar parça parça diske yazılır; yazım sırasında bellekte tüm çıktı tutulmaz:
+Excel openpyxl write-only modunda satır satır, CSV ve Parquet EXPORT_CHUNK satırlık
+parçalarla. Sonuç dosyanın yolu döner; önbelleğe alma (veri versiyonu başına bir kez)
+çağıranın işidir. Streamlit'e bağımlı değildir. (İndirme düğmesi dosyayı sunmak için
+bir kez tamamen belleğe okur; bkz. web_app.render_export.)
+"""
+import hashlib
+import importlib.util
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import derived_metrics as metrics
+
+EXPORT_CHUNK = 5000
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "neu_kardiyo_export")
+EXPORT_MAX_AGE = 3600  # saniye: bundan eski dışa aktarım dosyaları silinir
+
+# Kimliği belirleyen sütunlar ("kimlik bilgilerini çıkar" seçeneğinde atılır)
+PHI_COLS = ["Adı Soyadı", "İletişim", "Hasta"]
+# Hastane dosya numaraları: atılmaz, tuzlu özetle değiştirilir (satırlar eşleştirilebilir kalsın)
+RECORD_ID_COLS = ["Dosya Numarası", "Dosya No"]
+
+FORMATS = {
+    "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV", "text/csv"),
+    "parquet": ("Parquet", "application/octet-stream"),
+}
+
+def parquet_available() -> bool:
+    """Parquet yazımı isteğe bağlı pyarrow paketini gerektirir."""
+    return importlib.util.find_spec("pyarrow") is not None
+
+def pseudonymize(values: pd.Series, salt: str) -> pd.Series:
+    """Her değeri tuzlu SHA-256 özetinin ilk 16 hanesiyle değiştirir; boş hücre boş kalır."""
+    text = values.fillna("").astype(str).str.strip()
+    codes = {
+        v: hashlib.sha256(f"{salt}:{v}".encode("utf-8")).hexdigest()[:16] if v else ""
+        for v in text.unique()
+    }
+    return text.map(codes)
+
+def prepare(df: pd.DataFrame, strip_phi=False, derived=False, salt="") -> pd.DataFrame:
+    """
+    Dışa aktarılacak tablo: isteğe bağlı türetilmiş sütunlar ve kimlik sütunlarının çıkarılması.
+    Girdisi eksik türetilmiş değerler 0 değil boş (NaN) yazılır. strip_phi ile dosya numaraları
+    salt ile özetlenir: aynı tuzla yapılan dışa aktarımlarda aynı hasta aynı kodu alır.
+    """
+    if derived:
+        fresh = metrics.compute_derived(df, blank=True)
+        df = df.assign(**{c: np.asarray(v, dtype="float32") for c, v in fresh.items()})
+    if strip_phi:
+        df = df.drop(columns=[c for c in PHI_COLS if c in df.columns])
+        df = df.assign(**{c: pseudonymize(df[c], salt) for c in RECORD_ID_COLS if c in df.columns})
+    return df
+
+def _plain(chunk: pd.DataFrame) -> pd.DataFrame:
+    """float32 sütunları kısa gösterimli float64'e çevirir (12.3 -> 12.300000190734863 olmasın)."""
+    out = {}
+    for c in chunk.columns:
+        if chunk[c].dtype == "float32":
+            out[c] = chunk[c].astype(str).astype("float64")
+    return chunk.assign(**out) if out else chunk
+
+def _chunks(df):
+    for start in range(0, len(df), EXPORT_CHUNK):
+        yield df.iloc[start:start + EXPORT_CHUNK]
+
+def _write_xlsx(df, path, sheet_name):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name[:31])
+    ws.append([str(c) for c in df.columns])
+    for chunk in _chunks(df):
+        chunk = _plain(chunk)
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            ws.append(list(row))
+    wb.save(path)
+
+def _write_csv(df, path):
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        # to_csv float32'yi zaten kısa gösterimle yazar
+        for i, chunk in enumerate(_chunks(df)):
+            chunk.to_csv(f, index=False, header=(i == 0))
+        if len(df) == 0:
+            df.to_csv(f, index=False)
+
+def _write_parquet(df, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def _cleanup():
+    now = time.time()
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if now - os.path.getmtime(path) > EXPORT_MAX_AGE:
+                os.remove(path)
+        except OSError:
+            pass
+
+def write_file(df: pd.DataFrame, fmt: str, sheet_name="Veri") -> str:
+    """df'yi fmt ("xlsx" / "csv" / "parquet") biçiminde geçici bir dosyaya yazar; yolunu döndürür."""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    _cleanup()
+    fd, path = tempfile.mkstemp(suffix=f".{fmt}", dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        if fmt == "xlsx":
+            _write_xlsx(df, path, sheet_name)
+        elif fmt == "csv":
+            _write_csv(df, path)
+        elif fmt == "parquet":
+            _write_parquet(df, path)
+        else:
+            raise ValueError(f"Bilinmeyen biçim: {fmt}")
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
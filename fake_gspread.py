@@ -0,0 +1,307 @@
+"""
+Bellek içi sahte gspread arka ucu (Client / Spreadsheet / Worksheet).
+
+Canlı Google kimlik bilgisi olmadan uygulamanın Sheets yolunu çalıştırmak için:
+gerçek API'deki gibi satır listeleri tutar, A1 aralıklarını yorumlar,
+çağrı başına gecikme ve dakika başına kota simüle eder ve yapılandırılabilir
+oranda 429/5xx hatası enjekte eder.
+"""
+import random
+import re
+import threading
+import time
+from collections import deque
+
+def _col_to_num(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
+def _num_to_col(n: int) -> str:
+    s = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+_A1 = re.compile(r"^([A-Z]*)(\d*)")
+
+def parse_a1_start(a1: str):
+    """'A5:CL5' / 'B7' / '1:1' / "'Sayfa'!C3" -> (satır, sütun), 1 tabanlı."""
+    a1 = a1.split("!")[-1].split(":")[0]
+    letters, digits = _A1.match(a1).groups()
+    return (int(digits) if digits else 1), (_col_to_num(letters) if letters else 1)
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+class FakeAPIError(Exception):
+    """gspread.exceptions.APIError gibi: .response.status_code taşır."""
+
+    def __init__(self, status_code, message=""):
+        super().__init__(message or f"fake API error {status_code}")
+        self.response = FakeResponse(status_code)
+        self.code = status_code
+
+class FaultInjector:
+    """
+    Her çağrıda fail_rate olasılıkla statuses içinden bir hata üretir (istek uygulanmadan).
+    after_rate: yazma sunucuda uygulandıktan sonra yanıt yerine hata (kaybolan yanıt).
+    """
+
+    def __init__(self, fail_rate=0.0, statuses=(429, 500, 503), seed=None, after_rate=0.0):
+        self.fail_rate = fail_rate
+        self.after_rate = after_rate
+        self.statuses = list(statuses)
+        self._rnd = random.Random(seed)
+        self.injected = 0
+
+    def maybe_fail(self, op):
+        if self.fail_rate and self._rnd.random() < self.fail_rate:
+            self.injected += 1
+            raise FakeAPIError(self._rnd.choice(self.statuses), f"injected failure in {op}")
+
+    def maybe_fail_after(self, op):
+        if self.after_rate and self._rnd.random() < self.after_rate:
+            self.injected += 1
+            raise FakeAPIError(self._rnd.choice(self.statuses), f"injected failure after {op}")
+
+class FakeCell:
+    def __init__(self, row, col, value):
+        self.row = row
+        self.col = col
+        self.value = value
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, ws_id, title, values=None, spare_rows=100):
+        self.spreadsheet = spreadsheet
+        self.id = ws_id
+        self.title = title
+        self._rows = [list(map(str, r)) for r in (values or [])]
+        self.row_count = len(self._rows) + spare_rows
+        self.col_count = max([len(r) for r in self._rows] + [26])
+
+    # --- yardımcılar ---
+    def _api(self, op):
+        self.spreadsheet._api(op)
+
+    def _snapshot(self):
+        width = max([len(r) for r in self._rows] + [0])
+        return [r + [""] * (width - len(r)) for r in self._rows]
+
+    def _write(self, row, col, values):
+        for r_off, vals in enumerate(values):
+            r = row - 1 + r_off
+            while len(self._rows) <= r:
+                self._rows.append([])
+            target = self._rows[r]
+            need = col - 1 + len(vals)
+            if len(target) < need:
+                target.extend([""] * (need - len(target)))
+            for c_off, v in enumerate(vals):
+                target[col - 1 + c_off] = "" if v is None else str(v)
+            self.row_count = max(self.row_count, r + 1)
+            self.col_count = max(self.col_count, need)
+
+    # --- gspread Worksheet API'si ---
+    def get_all_values(self):
+        self._api("get_all_values")
+        with self.spreadsheet.lock:
+            return self._snapshot()
+
+    def row_values(self, row):
+        self._api("row_values")
+        with self.spreadsheet.lock:
+            return list(self._rows[row - 1]) if row <= len(self._rows) else []
+
+    def col_values(self, col):
+        self._api("col_values")
+        with self.spreadsheet.lock:
+            vals = [r[col - 1] if col - 1 < len(r) else "" for r in self._rows]
+            while vals and vals[-1] == "":
+                vals.pop()
+            return vals
+
+    def update(self, range_name, values):
+        self._api("update")
+        with self.spreadsheet.lock:
+            row, col = parse_a1_start(range_name)
+            self._write(row, col, values)
+            self.spreadsheet.touch()
+        self.spreadsheet._applied("update")
+        return {"updatedRange": f"'{self.title}'!{range_name}"}
+
+    def batch_update(self, data):
+        self._api("batch_update")
+        with self.spreadsheet.lock:
+            for item in data:
+                row, col = parse_a1_start(item["range"])
+                self._write(row, col, item["values"])
+            self.spreadsheet.touch()
+        self.spreadsheet._applied("batch_update")
+        return {"totalUpdatedCells": sum(len(v) for d in data for v in d["values"])}
+
+    def append_row(self, values, **kwargs):
+        self._api("append_row")
+        with self.spreadsheet.lock:
+            n, grid = len(self._rows) + 1, self.row_count
+            self._write(n, 1, [list(values)])
+            self.row_count = grid + 1  # gspread gibi: ekleme rowCount'u her zaman artırır
+            self.spreadsheet.touch()
+        self.spreadsheet._applied("append_row")
+        return {"updates": {"updatedRange": f"'{self.title}'!A{n}:{_num_to_col(max(len(values), 1))}{n}"}}
+
+    def append_rows(self, values, **kwargs):
+        self._api("append_rows")
+        with self.spreadsheet.lock:
+            n, grid = len(self._rows) + 1, self.row_count
+            self._write(n, 1, [list(v) for v in values])
+            self.row_count = grid + len(values)
+            self.spreadsheet.touch()
+        self.spreadsheet._applied("append_rows")
+        width = max([len(v) for v in values] + [1])
+        return {"updates": {"updatedRange": f"'{self.title}'!A{n}:{_num_to_col(width)}{n + len(values) - 1}"}}
+
+    def batch_get(self, ranges):
+        """Her aralık için satır listesi (gspread ValueRange gibi; boş hücreler kırpılır)."""
+        self._api("batch_get")
+        with self.spreadsheet.lock:
+            out = []
+            for a1 in ranges:
+                start, end = a1.split("!")[-1], None
+                if ":" in start:
+                    start, end = start.split(":")
+                r0, c0 = parse_a1_start(start)
+                r1, c1 = parse_a1_start(end) if end else (r0, c0)
+                block = [
+                    [v for v in self._rows[r - 1][c0 - 1:c1]] if r <= len(self._rows) else []
+                    for r in range(r0, r1 + 1)
+                ]
+                for row in block:
+                    while row and row[-1] == "":
+                        row.pop()
+                while block and not block[-1]:
+                    block.pop()
+                out.append(block)
+            return out
+
+    def find(self, query):
+        self._api("find")
+        with self.spreadsheet.lock:
+            for r, row in enumerate(self._rows, start=1):
+                for c, v in enumerate(row, start=1):
+                    if v == str(query):
+                        return FakeCell(r, c, v)
+        return None
+
+    def delete_rows(self, start_index, end_index=None):
+        self._api("delete_rows")
+        with self.spreadsheet.lock:
+            self._delete(start_index, end_index or start_index)
+            self.spreadsheet.touch()
+        self.spreadsheet._applied("delete_rows")
+
+    def _delete(self, start, end):
+        del self._rows[start - 1:end]
+        self.row_count -= end - start + 1
+
+class FakeSpreadsheet:
+    def __init__(self, sheet_id="fake", worksheets=None, faults=None, latency=0.0, quota_per_min=None):
+        """
+        worksheets: [(başlık, değerler), ...]
+        latency: her API çağrısına eklenen gecikme (saniye)
+        quota_per_min: son 60 saniyede bu sayıyı aşan çağrılar 429 alır (None: sınırsız)
+        """
+        self.id = sheet_id
+        self.lock = threading.RLock()
+        self.faults = faults or FaultInjector()
+        self.latency = latency
+        self.quota_per_min = quota_per_min
+        self.calls = {}
+        self._window = deque()  # son 60 saniyedeki çağrı zamanları
+        self.revision = 0       # her yazmada artar (Drive modifiedTime karşılığı)
+        self._worksheets = [
+            FakeWorksheet(self, i, title, values) for i, (title, values) in enumerate(worksheets or [])
+        ]
+
+    def _api(self, op):
+        with self.lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+            if self.quota_per_min is not None:
+                now = time.monotonic()
+                while self._window and now - self._window[0] > 60:
+                    self._window.popleft()
+                if len(self._window) >= self.quota_per_min:
+                    raise FakeAPIError(429, f"quota exceeded in {op}")
+                self._window.append(now)
+        if self.latency:
+            time.sleep(self.latency)
+        self.faults.maybe_fail(op)
+
+    def _applied(self, op):
+        """Yazma uygulandı; yanıt yine de hata olarak dönebilir (FaultInjector.after_rate)."""
+        self.faults.maybe_fail_after(op)
+
+    @property
+    def total_calls(self) -> int:
+        with self.lock:
+            return sum(self.calls.values())
+
+    def touch(self):
+        with self.lock:
+            self.revision += 1
+
+    def get_lastUpdateTime(self):
+        """Drive modifiedTime yerine: yazma sayacından türetilen sabit biçimli zaman damgası."""
+        self._api("get_lastUpdateTime")
+        with self.lock:
+            return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(1_700_000_000 + self.revision)) + ".000Z"
+
+    def worksheets(self):
+        self._api("worksheets")
+        return list(self._worksheets)
+
+    def get_worksheet(self, index):
+        self._api("get_worksheet")
+        return self._worksheets[index] if 0 <= index < len(self._worksheets) else None
+
+    def _by_title(self, a1):
+        title = a1.split("!")[0].strip("'").replace("''", "'")
+        return next(ws for ws in self._worksheets if ws.title == title)
+
+    def values_batch_get(self, ranges, params=None):
+        self._api("values_batch_get")
+        with self.lock:
+            out = []
+            for a1 in ranges:
+                ws = self._by_title(a1)
+                values = [list(r) for r in ws._rows]
+                while values and not any(values[-1]):
+                    values.pop()
+                out.append({"range": a1, "values": values})
+            return {"valueRanges": out}
+
+    def batch_update(self, body):
+        self._api("batch_update")
+        with self.lock:
+            for req in body.get("requests", []):
+                dim = req.get("deleteDimension")
+                if dim and dim["range"]["dimension"] == "ROWS":
+                    ws = next(w for w in self._worksheets if w.id == dim["range"]["sheetId"])
+                    ws._delete(dim["range"]["startIndex"] + 1, dim["range"]["endIndex"])
+            self.touch()
+        self._applied("batch_update")
+        return {"replies": [{} for _ in body.get("requests", [])]}
+
+class FakeClient:
+    """gspread.Client yerine: open_by_key ile FakeSpreadsheet döndürür."""
+
+    def __init__(self, spreadsheets):
+        self._spreadsheets = {sh.id: sh for sh in spreadsheets}
+
+    def open_by_key(self, key):
+        sh = self._spreadsheets[key]
+        sh._api("open_by_key")
+        return sh
@@ -0,0 +1,260 @@
+"""
+Google Sheets çalışma sayfalarının yerel SQLite aynası.
+
+load_data okumaları buradan yapar; senkronizasyon sayfayı tek seferde okuyup
+yalnızca değişen satırları (içerik özeti farklı olanları) yerel tabloya yazar.
+Streamlit'e bağımlı değildir; get_all_values() sunan her nesneyle (ör. bellek
+içi sahte bir worksheet) çalışır.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheets (
+    sheet_id TEXT NOT NULL,
+    ws_index INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (sheet_id, ws_index)
+);
+CREATE TABLE IF NOT EXISTS rows (
+    sheet_id TEXT NOT NULL,
+    ws_index INTEGER NOT NULL,
+    row_key TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (sheet_id, ws_index, row_key)
+);
+"""
+
+def _digest(row) -> str:
+    return hashlib.sha1(json.dumps(row, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def row_keys(headers, rows, key_col):
+    """
+    Her satır için aynadaki anahtarı üretir.
+    Anahtar sütunu boşsa ya da tekrar ediyorsa satır sırasına göre '#<sıra>' kullanılır.
+    """
+    key_idx = headers.index(key_col) if key_col in headers else None
+    seen = set()
+    keys = []
+    for pos, row in enumerate(rows):
+        key = ""
+        if key_idx is not None and key_idx < len(row):
+            key = str(row[key_idx]).strip()
+        if not key or key in seen:
+            key = f"#{pos}"
+        seen.add(key)
+        keys.append(key)
+    return keys
+
+class LocalMirror:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def has_synced(self, sheet_id, ws_index) -> bool:
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT 1 FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            )
+            return cur.fetchone() is not None
+
+    def last_synced(self, sheet_id, ws_index):
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT synced_at FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            )
+            row = cur.fetchone()
+            return row[0] if row else None
+
+    def read_values(self, sheet_id, ws_index):
+        """get_all_values() ile aynı biçimde (başlık + satırlar) döndürür; hiç senkronlanmadıysa None."""
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT headers FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            )
+            head = cur.fetchone()
+            if head is None:
+                return None
+            headers = json.loads(head[0])
+            if not headers:
+                return []
+            cur = self._conn.execute(
+                "SELECT data FROM rows WHERE sheet_id=? AND ws_index=? ORDER BY pos",
+                (sheet_id, ws_index),
+            )
+            return [headers] + [json.loads(r[0]) for r in cur.fetchall()]
+
+    def headers(self, sheet_id, ws_index):
+        """Aynadaki başlık satırı; hiç senkronlanmadıysa None."""
+        with self._lock:
+            head = self._conn.execute(
+                "SELECT headers FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            ).fetchone()
+        return json.loads(head[0]) if head else None
+
+    def keys(self, sheet_id, ws_index):
+        """Anahtar sütunu dolu ve tekil satırların anahtarları, sayfa sırasıyla."""
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT row_key FROM rows WHERE sheet_id=? AND ws_index=? AND row_key NOT LIKE '#%' ORDER BY pos",
+                (sheet_id, ws_index),
+            )
+            return [r[0] for r in cur.fetchall()]
+
+    def read_page(self, sheet_id, ws_index, columns, sort_col=None, descending=False, offset=0, limit=50):
+        """
+        Yalnızca istenen sütunlardan bir sayfa satır: (sütunlar, satırlar, toplam satır).
+        Hücreler json_extract ile seçilir, sıralama ve LIMIT/OFFSET SQLite'ta yapılır;
+        satırların geri kalanı Python'a hiç gelmez.
+        """
+        with self._lock:
+            head = self._conn.execute(
+                "SELECT headers FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            ).fetchone()
+            if head is None:
+                return [], [], 0
+            headers = json.loads(head[0])
+            cols = [c for c in columns if c in headers]
+            select = ", ".join(f"json_extract(data, '$[{headers.index(c)}]')" for c in cols) or "NULL"
+            order = "pos"
+            if sort_col in headers:
+                order = f"json_extract(data, '$[{headers.index(sort_col)}]') {'DESC' if descending else 'ASC'}, pos"
+            total = self._conn.execute(
+                "SELECT COUNT(*) FROM rows WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            ).fetchone()[0]
+            cur = self._conn.execute(
+                f"SELECT {select} FROM rows WHERE sheet_id=? AND ws_index=? ORDER BY {order} LIMIT ? OFFSET ?",
+                (sheet_id, ws_index, limit, offset),
+            )
+            rows = [["" if v is None else str(v) for v in r][:len(cols)] for r in cur.fetchall()]
+        return cols, rows, total
+
+    def apply_values(self, sheet_id, ws_index, values, key_col) -> dict:
+        """
+        Sayfadan okunan tam değer listesini aynaya uygular.
+        Yalnızca eklenen, içeriği değişen ve silinen satırlara dokunur.
+        """
+        headers = [str(h).strip() for h in values[0]] if values else []
+        rows = [list(r) for r in values[1:]] if values else []
+        keys = row_keys(headers, rows, key_col)
+        incoming = {k: (pos, row) for pos, (k, row) in enumerate(zip(keys, rows))}
+
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "SELECT row_key, pos, digest FROM rows WHERE sheet_id=? AND ws_index=?",
+                (sheet_id, ws_index),
+            )
+            existing = {k: (pos, d) for k, pos, d in cur.fetchall()}
+
+            upserts, moves = [], []
+            added = updated = 0
+            for key, (pos, row) in incoming.items():
+                digest = _digest(row)
+                old = existing.get(key)
+                if old is None:
+                    added += 1
+                    upserts.append((sheet_id, ws_index, key, pos, digest, json.dumps(row, ensure_ascii=False)))
+                elif old[1] != digest:
+                    updated += 1
+                    upserts.append((sheet_id, ws_index, key, pos, digest, json.dumps(row, ensure_ascii=False)))
+                elif old[0] != pos:
+                    moves.append((pos, sheet_id, ws_index, key))
+            removed = [(sheet_id, ws_index, k) for k in existing if k not in incoming]
+
+            self._conn.executemany("INSERT OR REPLACE INTO rows VALUES (?,?,?,?,?,?)", upserts)
+            self._conn.executemany(
+                "UPDATE rows SET pos=? WHERE sheet_id=? AND ws_index=? AND row_key=?", moves
+            )
+            self._conn.executemany(
+                "DELETE FROM rows WHERE sheet_id=? AND ws_index=? AND row_key=?", removed
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sheets VALUES (?,?,?,?)",
+                (sheet_id, ws_index, json.dumps(headers, ensure_ascii=False), time.time()),
+            )
+
+        return {"added": added, "updated": updated, "removed": len(removed)}
+
+    def get_row(self, sheet_id, ws_index, key):
+        """Anahtarın aynadaki satırı {başlık: değer} olarak; yoksa None."""
+        with self._lock:
+            head = self._conn.execute(
+                "SELECT headers FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            ).fetchone()
+            row = self._conn.execute(
+                "SELECT data FROM rows WHERE sheet_id=? AND ws_index=? AND row_key=?",
+                (sheet_id, ws_index, key),
+            ).fetchone()
+        if head is None or row is None:
+            return None
+        headers, values = json.loads(head[0]), json.loads(row[0])
+        return {h: (values[i] if i < len(values) else "") for i, h in enumerate(headers)}
+
+    def get_rows(self, sheet_id, ws_index, keys) -> dict:
+        """Verilen anahtarların aynadaki satırları: anahtar -> {başlık: değer} (olmayanlar yok)."""
+        keys = list(dict.fromkeys(keys))
+        out = {}
+        with self._lock:
+            head = self._conn.execute(
+                "SELECT headers FROM sheets WHERE sheet_id=? AND ws_index=?", (sheet_id, ws_index)
+            ).fetchone()
+            if head is None:
+                return out
+            headers = json.loads(head[0])
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                cur = self._conn.execute(
+                    "SELECT row_key, data FROM rows WHERE sheet_id=? AND ws_index=? AND row_key IN ({})".format(
+                        ",".join("?" * len(chunk))
+                    ),
+                    (sheet_id, ws_index, *chunk),
+                )
+                for key, data in cur.fetchall():
+                    values = json.loads(data)
+                    out[key] = {h: (values[j] if j < len(values) else "") for j, h in enumerate(headers)}
+        return out
+
+    def upsert_row(self, sheet_id, ws_index, headers, key, row):
+        """Sheets'e yazılan satırı aynaya da yazar (write-through)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sheets SET headers=? WHERE sheet_id=? AND ws_index=?",
+                (json.dumps(list(headers), ensure_ascii=False), sheet_id, ws_index),
+            )
+            cur = self._conn.execute(
+                "SELECT pos FROM rows WHERE sheet_id=? AND ws_index=? AND row_key=?",
+                (sheet_id, ws_index, key),
+            )
+            found = cur.fetchone()
+            if found:
+                pos = found[0]
+            else:
+                cur = self._conn.execute(
+                    "SELECT COALESCE(MAX(pos), -1) + 1 FROM rows WHERE sheet_id=? AND ws_index=?",
+                    (sheet_id, ws_index),
+                )
+                pos = cur.fetchone()[0]
+            row = [str(v) for v in row]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rows VALUES (?,?,?,?,?,?)",
+                (sheet_id, ws_index, key, pos, _digest(row), json.dumps(row, ensure_ascii=False)),
+            )
+
+    def delete_key(self, sheet_id, ws_index, key):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM rows WHERE sheet_id=? AND ws_index=? AND row_key=?",
+                (sheet_id, ws_index, key),
+            )
+
+def sync_worksheet(mirror: LocalMirror, sheet_id, ws_index, ws, key_col) -> dict:
+    """Sayfayı bir kez okuyup değişen satırları aynaya uygular."""
+    return mirror.apply_values(sheet_id, ws_index, ws.get_all_values(), key_col)
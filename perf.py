@@ -0,0 +1,138 @@
+"""
+Rerun başına performans ölçümü ve Sheets API çağrı muhasebesi.
+
+Her Streamlit rerun'ı start_run() ile bir RunStats açar (iş parçacığına bağlı
+contextvar). span()/timed() ile sarılan bölümler ve record_api() ile bildirilen
+API çağrıları o rerun'a yazılır; rerun dışındaki (arka plan) çağrılar
+BACKGROUND'a gider. Biten rerun JSON satırı olarak loglanır.
+"""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+log = logging.getLogger("neu_kardiyo.perf")
+
+class RunStats:
+    def __init__(self, label="", session_id=""):
+        self.label = label
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.wall_start = time.time()
+        self.last = self.started
+        self.total_ms = None
+        self.spans = {}   # ad -> [adet, toplam_ms, max_ms]
+        self.api = {}     # işlem -> [adet, toplam_ms, bayt, hata]
+        self._lock = threading.Lock()
+
+    def add_span(self, name, ms):
+        with self._lock:
+            s = self.spans.setdefault(name, [0, 0.0, 0.0])
+            s[0] += 1
+            s[1] += ms
+            s[2] = max(s[2], ms)
+            self.last = time.perf_counter()
+
+    def add_api(self, op, ms, nbytes, ok):
+        with self._lock:
+            a = self.api.setdefault(op, [0, 0.0, 0, 0])
+            a[0] += 1
+            a[1] += ms
+            a[2] += nbytes
+            a[3] += 0 if ok else 1
+            self.last = time.perf_counter()
+
+    def finish(self, end=None):
+        if self.total_ms is None:
+            self.total_ms = ((end or self.last) - self.started) * 1000
+        return self
+
+    @property
+    def api_calls(self):
+        return sum(a[0] for a in self.api.values())
+
+    @property
+    def api_bytes(self):
+        return sum(a[2] for a in self.api.values())
+
+    def merge(self, other: "RunStats"):
+        """Oturum toplamı için başka bir rerun'ı bu nesneye ekler."""
+        with self._lock:
+            for name, (n, total, mx) in other.spans.items():
+                s = self.spans.setdefault(name, [0, 0.0, 0.0])
+                s[0] += n
+                s[1] += total
+                s[2] = max(s[2], mx)
+            for op, (n, ms, b, err) in other.api.items():
+                a = self.api.setdefault(op, [0, 0.0, 0, 0])
+                a[0] += n
+                a[1] += ms
+                a[2] += b
+                a[3] += err
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "session": self.session_id,
+            "ts": self.wall_start,
+            "total_ms": round(self.total_ms or 0.0, 1),
+            "api_calls": self.api_calls,
+            "api_bytes": self.api_bytes,
+            "spans": {k: {"n": n, "ms": round(t, 1), "max_ms": round(m, 1)} for k, (n, t, m) in self.spans.items()},
+            "api": {k: {"n": n, "ms": round(t, 1), "bytes": b, "errors": e} for k, (n, t, b, e) in self.api.items()},
+        }
+
+BACKGROUND = RunStats(label="background")
+_current = contextvars.ContextVar("perf_run", default=None)
+
+def current() -> RunStats:
+    return _current.get() or BACKGROUND
+
+def start_run(label="", session_id="") -> RunStats:
+    run = RunStats(label, session_id)
+    _current.set(run)
+    return run
+
+def end_run(run: RunStats):
+    """Rerun'ı kapatır ve yapılandırılmış JSON log satırı yazar."""
+    run.finish()
+    log.info(json.dumps({"event": "rerun", **run.to_dict()}, ensure_ascii=False))
+    return run
+
+@contextmanager
+def span(name):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        current().add_span(name, (time.perf_counter() - t0) * 1000)
+
+def timed(name=None):
+    """Fonksiyonun her çağrısını span olarak kaydeden dekoratör."""
+    def deco(fn):
+        label = name or getattr(fn, "__name__", "fn")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+def estimate_bytes(obj) -> int:
+    """API yanıtının yaklaşık boyutu (hücre metinlerinin uzunluğu)."""
+    if obj is None:
+        return 0
+    if isinstance(obj, str):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(len(str(k)) + estimate_bytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_bytes(v) for v in obj)
+    return len(str(obj)) if isinstance(obj, (int, float, bool)) else 0
+
+def record_api(op, ms, result=None, ok=True):
+    current().add_api(op, ms, estimate_bytes(result), ok)
@@ -0,0 +1,134 @@
+"""
+Veri girişi için akla yatkınlık kontrolleri: sütun başına makul aralıklar ve
+alanlar arası tutarlılık kuralları (LVESD < LVEDD, Hct ~ 3 x Hgb, TA Diyastol < TA Sistol ...).
+
+Form ölçülmeyen alanlara 0 yazdığından sayısal sütunlarda 0 eksik sayılır; kurallar
+yalnızca dolu değerlere uygulanır. Tüm tablo tek vektörel geçişte kontrol edilir
+(check_frame / flag_report), kayıt anında aynı kurallar tek satıra uygulanır (check_record).
+"""
+import numpy as np
+import pandas as pd
+
+from schema import COLUMN_SCHEMA, FLOAT, INT, build_frame
+
+# Sütun -> (alt, üst) makul aralık (erişkin HT kohortu; sınırlar bilerek geniş)
+RANGES = {
+    "Yaş": (18, 100), "Boy": (120, 220), "Kilo": (30, 250), "BMI": (12, 70), "BSA": (1.0, 3.0),
+    "TA Sistol": (70, 260), "TA Diyastol": (40, 160),
+    "Hgb": (5, 22), "Hct": (15, 65), "WBC": (1, 50), "PLT": (20, 1000), "Neu": (10, 95), "Lym": (2, 80),
+    "MPV": (5, 15), "RDW": (9, 30),
+    "Glukoz": (40, 600), "Üre": (5, 300), "Kreatinin": (0.3, 15), "Ürik Asit": (1, 15),
+    "Na": (115, 165), "K": (2, 8), "ALT": (3, 1000), "AST": (3, 1000), "Tot. Prot": (3, 11), "Albümin": (1.5, 6),
+    "Chol": (50, 500), "LDL": (10, 400), "HDL": (10, 150), "Trig": (20, 2000),
+    "Lp(a)": (0.1, 300), "Homosistein": (2, 100), "Folik Asit": (1, 40), "B12": (50, 2000),
+    "LVEDD": (25, 80), "LVESD": (10, 70), "IVS": (5, 25), "PW": (5, 25),
+    "LVEDV": (30, 350), "LVESV": (10, 250), "LV Mass": (50, 600), "LVMi": (30, 300), "RWT": (0.15, 1.0),
+    "Ao Asc": (20, 60), "LVEF": (10, 80), "SV": (20, 150), "LVOT VTI": (8, 40),
+    "GLS": (5, 35), "GCS": (5, 50),
+    "Mitral E": (20, 200), "Mitral A": (20, 200), "Mitral E/A": (0.3, 4), "Septal e'": (2, 25),
+    "Lateral e'": (2, 30), "Mitral E/e'": (2, 40), "LAEDV": (5, 200), "LAESV": (10, 250), "LA Strain": (5, 70),
+    "TAPSE": (5, 40), "RV Sm": (4, 25), "sPAP": (10, 120), "TY vel.": (1, 5),
+    "RVOT VTI": (5, 35), "RVOT accT": (40, 200), "TAPSE/sPAP": (0.1, 3),
+}
+# Strain değerleri bazı hekimlerce negatif, bazılarınca mutlak değer olarak girilir
+ABS_COLS = {"GLS", "GCS"}
+
+# (kural, sütunlar, ihlal(*değerler) -> bool dizisi); yalnızca tüm sütunları dolu satırlarda bakılır
+CROSS_RULES = [
+    ("LVESD < LVEDD", ("LVESD", "LVEDD"), lambda es, ed: es >= ed),
+    ("LVESV < LVEDV", ("LVESV", "LVEDV"), lambda es, ed: es >= ed),
+    ("TA Diyastol < TA Sistol", ("TA Diyastol", "TA Sistol"), lambda d, s: d >= s),
+    ("Hct ≈ 3 × Hgb", ("Hct", "Hgb"), lambda hct, hgb: np.abs(hct / hgb - 3) > 0.6),
+    ("LDL + HDL ≤ Chol", ("LDL", "HDL", "Chol"), lambda ldl, hdl, chol: ldl + hdl > chol * 1.05),
+    ("Nötrofil + Lenfosit ≤ %100", ("Neu", "Lym"), lambda neu, lym: neu + lym > 100),
+    ("LVEF hacimlerle uyumlu", ("LVEF", "LVEDV", "LVESV"),
+     lambda ef, edv, esv: np.abs((edv - esv) / edv * 100 - ef) > 15),
+]
+
+NUMERIC_COLS = [c for c, kind in COLUMN_SCHEMA.items() if kind in (FLOAT, INT)]
+
+def _matrix(df: pd.DataFrame, cols) -> np.ndarray:
+    """(satır x sütun) float64; olmayan sütun NaN."""
+    out = np.full((len(df), len(cols)), np.nan)
+    for j, c in enumerate(cols):
+        if c in df.columns:
+            out[:, j] = pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    return out
+
+def _fmt(values: np.ndarray) -> np.ndarray:
+    """Sayıları kısa metne çevirir (vektörel; 12.300000190734863 -> '12.3')."""
+    return pd.Series(np.round(values, 3)).astype(str).str.removesuffix(".0").to_numpy(dtype=object)
+
+def _violations(df: pd.DataFrame):
+    """(satır konumları, kurallar, mesajlar) nesne dizileri, satır sırasıyla."""
+    cols = list(RANGES)
+    x = _matrix(df, cols)
+    x[x == 0] = np.nan
+    for j, c in enumerate(cols):
+        if c in ABS_COLS:
+            x[:, j] = np.abs(x[:, j])
+    lo = np.array([RANGES[c][0] for c in cols])
+    hi = np.array([RANGES[c][1] for c in cols])
+    with np.errstate(invalid="ignore"):
+        bad = (x < lo) | (x > hi)  # NaN karşılaştırmaları False: eksik değer ihlal değil
+
+    rows, js = np.nonzero(bad)
+    names = np.array(cols, dtype=object)
+    expect = np.array([f" (beklenen {lo_:g}–{hi_:g})" for lo_, hi_ in zip(lo, hi)], dtype=object)
+    parts = [(rows, names[js], names[js] + " = " + _fmt(x[rows, js]) + expect[js])]
+
+    index = {c: j for j, c in enumerate(cols)}
+    for rule, rule_cols, violated in CROSS_RULES:
+        vals = [x[:, index[c]] if c in index else _matrix(df, [c])[:, 0] for c in rule_cols]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            hit = np.nonzero(violated(*vals) & np.all(~np.isnan(np.column_stack(vals)), axis=1))[0]
+        msg = np.full(len(hit), f"{rule} sağlanmıyor (", dtype=object)
+        for i, (c, v) in enumerate(zip(rule_cols, vals)):
+            msg = msg + (", " if i else "") + f"{c}=" + _fmt(v[hit])
+        parts.append((hit, np.full(len(hit), rule, dtype=object), msg + ")"))
+
+    rows = np.concatenate([p[0] for p in parts])
+    order = np.argsort(rows, kind="stable")
+    return rows[order], np.concatenate([p[1] for p in parts])[order], np.concatenate([p[2] for p in parts])[order]
+
+def _keys(df: pd.DataFrame, key_col) -> np.ndarray:
+    return df[key_col].astype(str).to_numpy() if key_col in df.columns else np.arange(len(df)).astype(str)
+
+def check_frame(df: pd.DataFrame, key_col="Dosya Numarası") -> pd.DataFrame:
+    """
+    Tüm kuralları df'ye uygular. Uzun biçim döner: anahtar, Kural, Mesaj (ihlal başına bir satır,
+    df sırasıyla). Eksik (boş / 0) değerler ihlal sayılmaz.
+    """
+    rows, rules, messages = _violations(df)
+    return pd.DataFrame({key_col: _keys(df, key_col)[rows], "Kural": rules, "Mesaj": messages})
+
+def zero_counts(df: pd.DataFrame) -> np.ndarray:
+    """Satır başına 0 olarak kaydedilmiş sayısal alan sayısı (eksik sayılan)."""
+    cols = [c for c in NUMERIC_COLS if c in df.columns]
+    return (_matrix(df, cols) == 0).sum(axis=1)
+
+def flag_report(df: pd.DataFrame, key_col="Dosya Numarası") -> pd.DataFrame:
+    """Hasta başına uyarı raporu: anahtar, uyarı sayısı, uyarılar ve 0 kayıtlı alan sayısı."""
+    rows, _, messages = _violations(df)
+    flagged, starts, counts = np.unique(rows, return_index=True, return_counts=True)
+    return pd.DataFrame({
+        key_col: _keys(df, key_col)[flagged],
+        "Uyarı": counts,
+        "Uyarılar": ["; ".join(messages[a:a + n]) for a, n in zip(starts, counts)],
+        "0 kayıtlı alan": zero_counts(df)[flagged],
+    })
+
+def blank_zeros(record: dict) -> dict:
+    """Formdan gelen kayıtta sayısal alanlardaki 0'ı boş hücreye çevirir (ölçülmedi)."""
+    out = dict(record)
+    for c in NUMERIC_COLS:
+        v = out.get(c)
+        if isinstance(v, (int, float, np.number)) and not isinstance(v, bool) and v == 0:
+            out[c] = ""
+    return out
+
+def check_record(record: dict) -> list:
+    """Kayıt anında tek satırlık kontrol: ihlal mesajları (boş liste: sorun yok)."""
+    headers = [str(k) for k in record]
+    row = ["" if v is None else str(v) for v in record.values()]
+    return list(check_frame(build_frame(headers, [row]), key_col=None)["Mesaj"])
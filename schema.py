@@ -0,0 +1,136 @@
+"""
+H-Type HT veri sayfası (1. sayfa) için sütun şeması.
+
+Sheets tüm hücreleri metin olarak döndürür; load_data bu tabloya göre sütunları
+tek seferde (vektörel) tiplenmiş ve kompakt dtype'lara çevirir. Şemada olmayan
+sütunlar (Dosya Numarası, Adı Soyadı, Tarih, notlar vb.) metin olarak kalır.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+FLOAT = "float32"
+INT = "Int32"          # boş hücre <NA> olabilsin diye nullable; "120080" gibi yazım hataları da sığar
+INT_LIMIT = np.iinfo(np.int32).max  # yine de sığmayan değer tabloyu düşürmez, <NA> olur
+BOOL = "boolean"       # nullable bool
+CATEGORY = "category"
+
+ANTHRO_COLS = ["Boy", "Kilo", "BMI", "BSA"]
+LAB_COLS = [
+    "Hgb", "Hct", "WBC", "PLT", "Neu", "Lym", "MPV", "RDW",
+    "Glukoz", "Üre", "Kreatinin", "Ürik Asit", "Na", "K", "ALT", "AST", "Tot. Prot", "Albümin",
+    "Chol", "LDL", "HDL", "Trig",
+    "Lp(a)", "Homosistein", "Folik Asit", "B12",
+]
+ECHO_COLS = [
+    "LVEDD", "LVESD", "IVS", "PW", "LVEDV", "LVESV", "LV Mass", "LVMi", "RWT", "Ao Asc",
+    "LVEF", "SV", "LVOT VTI", "GLS", "GCS", "SD-LS",
+    "Mitral E", "Mitral A", "Mitral E/A", "Septal e'", "Lateral e'", "Mitral E/e'",
+    "LAEDV", "LAESV", "LA Strain", "LACi",
+    "TAPSE", "RV Sm", "TAPSE/Sm", "sPAP", "TY vel.", "TAPSE/sPAP", "RVOT VTI", "RVOT accT",
+]
+INT_COLS = ["Yaş", "TA Sistol", "TA Diyastol"]
+BOOL_COLS = ["DM", "KAH", "HPL", "İnme", "Sigara"]
+CATEGORY_COLS = ["EKG", "Cinsiyet"]
+
+COLUMN_SCHEMA = {
+    **{c: FLOAT for c in ANTHRO_COLS + LAB_COLS + ECHO_COLS},
+    **{c: INT for c in INT_COLS},
+    **{c: BOOL for c in BOOL_COLS},
+    **{c: CATEGORY for c in CATEGORY_COLS},
+}
+
+_BOOL_MAP = {
+    "true": True, "false": False, "1": True, "0": False,
+    "evet": True, "hayır": False, "hayir": False, "var": True, "yok": False,
+}
+
+def _to_float(values) -> np.ndarray:
+    """Metin hücrelerini float64'e çevirir; boş -> NaN, sayı olmayan -> NaN."""
+    arr = np.asarray(values, dtype=object)
+    arr = np.where(arr == "", None, arr)
+    try:
+        return arr.astype("float64")
+    except (TypeError, ValueError):
+        # Hızlı yol başarısız (ör. "12,5" ya da serbest metin): ondalık virgülü düzelt, kalanı NaN
+        s = pd.Series(arr, dtype=object).map(lambda v: v if v is None else str(v).strip().replace(",", "."))
+        return pd.to_numeric(s, errors="coerce").to_numpy(dtype="float64")
+
+def parse_column(values, kind: str) -> pd.Series:
+    """values: metin hücreleri (liste ya da Series); şemadaki türde Series döner."""
+    index = values.index if isinstance(values, pd.Series) else None
+    if kind == FLOAT:
+        return pd.Series(_to_float(values), index=index, dtype=FLOAT)
+    if kind == INT:
+        x = np.round(_to_float(values))
+        with np.errstate(invalid="ignore"):
+            x[~(np.abs(x) <= INT_LIMIT)] = np.nan
+        return pd.Series(x, index=index).astype(INT)
+    s = pd.Series(values, index=index, dtype=object).map(lambda v: str(v).strip())
+    if kind == BOOL:
+        return s.map(lambda v: _BOOL_MAP.get(v.lower())).astype(BOOL)
+    if kind == CATEGORY:
+        return s.astype(CATEGORY)
+    return s
+
+def normalize_cells(values, kind):
+    """
+    Dışarıdan gelen metin hücrelerini sayfaya yazılacak biçime getirir ("12,5" -> "12.5",
+    "evet" -> "True"). (hücreler, geçersiz) döner; boş hücre "" kalır, geçersiz olanlar
+    (dolu ama türe uymayan) maskede True'dur.
+    """
+    s = pd.Series(values, dtype=object).map(lambda v: "" if v is None or v != v else str(v).strip())
+    blank = (s == "").to_numpy()
+    if kind in (FLOAT, INT):
+        nums = _to_float(s.to_numpy())
+        bad = np.isnan(nums) & ~blank
+        if kind == INT:
+            out = ["" if np.isnan(v) else str(int(round(v))) for v in nums]
+        else:
+            out = ["" if np.isnan(v) else repr(float(v)) for v in nums]
+        return out, bad
+    if kind == BOOL:
+        parsed = s.map(lambda v: _BOOL_MAP.get(v.lower()))
+        bad = parsed.isna().to_numpy() & ~blank
+        return ["" if v is None else str(v) for v in parsed], bad
+    return list(s), np.zeros(len(s), dtype=bool)
+
+def same_cell(a, b) -> bool:
+    """Hücre metinleri aynı değeri mi taşıyor? ("13.20" == "13.2"; form boş hücreyi 0 gösterir)."""
+    a, b = str(a).strip(), str(b).strip()
+    if a == b:
+        return True
+    try:
+        x = float(a.replace(",", ".")) if a else 0.0
+        y = float(b.replace(",", ".")) if b else 0.0
+    except ValueError:
+        return False
+    return math.isclose(x, y, rel_tol=1e-6, abs_tol=1e-9)
+
+def build_frame(headers, rows, schema=None) -> pd.DataFrame:
+    """
+    get_all_values() satırlarından (her satır başlık sayısı kadar hücre) doğrudan
+    tiplenmiş DataFrame kurar; sayısal sütunlar hiç metin sütunu olarak oluşturulmaz.
+    """
+    schema = COLUMN_SCHEMA if schema is None else schema
+    block = np.empty((len(rows), len(headers)), dtype=object)
+    if rows:
+        block[:] = rows
+    data = {}
+    for j, name in enumerate(headers):
+        kind = schema.get(name)
+        values = block[:, j]
+        data[name] = parse_column(values, kind) if kind else pd.Series(values, dtype=object).astype(str)
+    return pd.DataFrame(data, columns=list(headers))
+
+def apply_schema(df: pd.DataFrame, schema=None) -> pd.DataFrame:
+    """Metin DataFrame'ini şemadaki sütunlar için tiplenmiş hale getirir (yeni DataFrame döner)."""
+    schema = COLUMN_SCHEMA if schema is None else schema
+    typed = {c: parse_column(df[c].astype(str), schema[c]) for c in df.columns if c in schema}
+    if not typed:
+        return df
+    return df.assign(**typed)
+
+def memory_bytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(deep=True).sum())
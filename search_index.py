@@ -0,0 +1,51 @@
+"""
+Liste ekranları için önceden kurulan arama indeksi.
+
+Satırların aranabilir sütunları bir kez (veri versiyonu başına) küçük harfe
+çevrilip Türkçe i/ı/İ/I farkları katlanarak tek bir metin sütununda birleştirilir;
+her tuş vuruşu bu sütun üzerinde tek bir vektörel alt-dize taramasıdır.
+"""
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# Türkçe büyük/küçük harf katlama: i/ı/İ/I aramada birbirine eşit sayılır
+_TR_FOLD = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_SEP = "\x1f"  # sütunlar arası ayraç: eşleşme iki hücreye taşmasın
+
+def tr_fold(text: str) -> str:
+    return str(text).translate(_TR_FOLD).lower()
+
+def _fold_series(s: pd.Series) -> pd.Series:
+    # Tiplenmiş sütunlarda boş hücre "nan"/"<NA>" olarak aranmasın
+    return s.astype("string").fillna("").str.translate(_TR_FOLD).str.lower()
+
+class SearchIndex:
+    """
+    df: aranacak DataFrame, columns: aranacak sütunlar (varsayılan: hepsi),
+    prefix_col: önek aramasının yapılacağı sütun (ör. "Dosya Numarası").
+    """
+
+    def __init__(self, df: pd.DataFrame, columns=None, prefix_col=None):
+        cols = [c for c in (columns if columns is not None else df.columns) if c in df.columns]
+        self.index = df.index
+        if cols:
+            parts = [_fold_series(df[c]) for c in cols]
+            self.text = reduce(lambda a, b: a + _SEP + b, parts)
+        else:
+            self.text = pd.Series("", index=df.index, dtype="string")
+        self.prefix = _fold_series(df[prefix_col]).str.strip() if prefix_col in df.columns else None
+
+    def mask(self, q: str, prefix=False) -> np.ndarray:
+        """q'yu içeren satırlar için boolean dizi; prefix=True ise önek sütununun başında arar."""
+        qf = tr_fold(q.strip())
+        if not qf:
+            return np.ones(len(self.index), dtype=bool)
+        if prefix and self.prefix is not None:
+            return self.prefix.str.startswith(qf).to_numpy(dtype=bool)
+        return self.text.str.contains(qf, regex=False).to_numpy(dtype=bool)
+
+    def filter(self, df: pd.DataFrame, q: str, prefix=False) -> pd.DataFrame:
+        """Aynı veri versiyonundan gelen df'yi süzer."""
+        return df[self.mask(q, prefix)]
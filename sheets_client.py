@@ -0,0 +1,229 @@
+"""
+Google Sheets çağrıları için kota farkındalıklı sarmalayıcı.
+
+- Token bucket: dakika başına okuma/yazma kotasına göre istekleri sıraya sokar.
+- 429 / 5xx / ağ hatalarında jitter'lı üstel geri çekilme ile tekrar dener. İdempotent
+  olmayan yazmalar (satır ekleme / silme) yalnızca 429'da körlemesine tekrarlanır; diğer
+  hatalarda istek sunucuda uygulanmış olabileceğinden önce verify ile sayfa okunur.
+- Aynı anahtarlı eşzamanlı okumalar tek bir uçuştaki çağrıyı paylaşır.
+- Başarısız çağrılar SheetsError (yapılandırılmış) olarak yükseltilir ve kaydedilir.
+
+Streamlit'e ve gspread'e bağımlı değildir; çağrılar düz fonksiyon olarak verilir.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+log = logging.getLogger("neu_kardiyo.sheets")
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+class SheetsError(Exception):
+    """Sheets çağrısı hatası: işlem adı, HTTP durumu (varsa), deneme sayısı ve mesaj."""
+
+    def __init__(self, op, status, attempts, message):
+        super().__init__(message)
+        self.op = op
+        self.status = status
+        self.attempts = attempts
+        self.message = message
+        self.ts = time.time()
+
+    @property
+    def is_quota(self) -> bool:
+        return self.status == 429
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": self.ts,
+            "op": self.op,
+            "status": self.status,
+            "attempts": self.attempts,
+            "message": self.message,
+        }
+
+    def __str__(self):
+        reason = "kota aşıldı" if self.is_quota else f"HTTP {self.status}" if self.status else "bağlantı hatası"
+        return f"{self.op}: {reason} ({self.attempts} deneme) - {self.message}"
+
+def error_status(exc):
+    """gspread APIError / requests hatalarından HTTP durum kodunu çıkarır; yoksa None."""
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+    try:
+        return int(status) if status is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def is_retryable(exc) -> bool:
+    status = error_status(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # requests.ConnectionError / Timeout OSError alt sınıflarıdır
+    return isinstance(exc, (OSError, TimeoutError))
+
+class TokenBucket:
+    """Dakikada rate_per_min jeton üretir; en fazla capacity jeton birikir."""
+
+    def __init__(self, rate_per_min, capacity=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or rate_per_min
+        self.tokens = float(self.capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self, timeout=None) -> bool:
+        """Bir jeton alınana kadar bekler; timeout dolarsa False."""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+class SheetsClient:
+    def __init__(
+        self,
+        read_per_min=60,
+        write_per_min=60,
+        drive_per_min=60,
+        max_retries=5,
+        base_delay=1.0,
+        max_delay=32.0,
+        sleep=time.sleep,
+        on_call=None,
+    ):
+        """
+        on_call(op, ms, result, ok): her gerçek API denemesinden sonra çağrılır (ölçüm için).
+        drive_per_min: Drive metadata istekleri (kind="drive") ayrı kotadan sayılır, Sheets
+        okuma jetonlarını tüketmez.
+        """
+        self.on_call = on_call
+        self.buckets = {
+            "read": TokenBucket(read_per_min, sleep=sleep),
+            "write": TokenBucket(write_per_min, sleep=sleep),
+            "drive": TokenBucket(drive_per_min, sleep=sleep),
+        }
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._inflight = {}  # coalesce anahtarı -> Future
+        self.errors = deque(maxlen=50)
+        self.counters = {"calls": 0, "retries": 0, "coalesced": 0, "failures": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def call(self, op, fn, *args, kind="read", key=None, idempotent=True, verify=None, **kwargs):
+        """
+        fn(*args, **kwargs) çağrısını kota/yeniden deneme kurallarıyla yürütür.
+        key verilirse aynı anahtarlı eşzamanlı çağrılar tek sonucu paylaşır.
+
+        idempotent=False (append / delete): 429 dışındaki hatalarda istek uygulanmış olabilir.
+        verify() sayfayı okuyup karar verir: True = zaten uygulandı (sonuç None döner),
+        False = uygulanmadı, aynı çağrı güvenle tekrarlanabilir, None = belirsiz. verify
+        yoksa, belirsizse ya da kendisi hata verirse tekrar denenmez, SheetsError yükseltilir.
+        """
+        if key is None:
+            return self._run(op, fn, args, kwargs, kind, idempotent, verify)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            else:
+                self.counters["coalesced"] += 1
+        if not leader:
+            return future.result()
+
+        try:
+            result = self._run(op, fn, args, kwargs, kind, idempotent, verify)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _run(self, op, fn, args, kwargs, kind, idempotent=True, verify=None):
+        attempt = 0
+        while True:
+            attempt += 1
+            self.buckets[kind].acquire()
+            self._count("calls")
+            t0 = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                self._notify(op, t0, result, True)
+                return result
+            except Exception as e:
+                self._notify(op, t0, None, False)
+                if is_retryable(e) and attempt <= self.max_retries:
+                    if not idempotent and error_status(e) != 429:
+                        applied = self._verify(op, verify)
+                        if applied:
+                            return None
+                        if applied is None:
+                            raise self._fail(op, e, attempt) from e
+                    self._count("retries")
+                    # Full jitter: [0, min(max_delay, base * 2^n)]
+                    self._sleep(random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1))))
+                    continue
+                raise self._fail(op, e, attempt) from e
+
+    def _verify(self, op, verify):
+        """İdempotent olmayan yazma hatasından sonra: True / False / None (bkz. call)."""
+        if verify is None:
+            return None
+        try:
+            return verify()
+        except Exception as e:
+            log.warning(json.dumps({"event": "sheets_verify_error", "op": op, "message": str(e)}, ensure_ascii=False))
+            return None
+
+    def _fail(self, op, exc, attempt) -> SheetsError:
+        err = SheetsError(op, error_status(exc), attempt, str(exc) or type(exc).__name__)
+        self._report(err)
+        return err
+
+    def _notify(self, op, t0, result, ok):
+        if self.on_call is not None:
+            try:
+                self.on_call(op, (time.perf_counter() - t0) * 1000, result, ok)
+            except Exception:
+                pass  # ölçüm hatası çağrıyı bozmasın
+
+    def _report(self, err: SheetsError):
+        self._count("failures")
+        with self._lock:
+            self.errors.append(err.to_dict())
+        log.warning(json.dumps({"event": "sheets_error", **err.to_dict()}, ensure_ascii=False))
+
+    def last_error(self):
+        with self._lock:
+            return self.errors[-1] if self.errors else None
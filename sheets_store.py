@@ -0,0 +1,1461 @@
+"""
+Google Sheets veri katmanı: bağlantı, paylaşılan okuma önbelleği, yerel ayna,
+yazma indeksi, okuma (load_data), yazma/silme (save_data_row, delete_*) ve
+yazmaları kalıcı günlükten arka planda uygulayan yazıcı (submit_save, submit_delete).
+
+web_app.py ekranları buradan kullanır; benchmark'lar da aynı yolu
+fake_gspread arka ucuyla (use_client) canlı kimlik bilgisi olmadan çalıştırır.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+import bulk_import
+import derived_metrics as metrics
+import perf
+from local_mirror import LocalMirror
+from schema import build_frame, memory_bytes, same_cell
+from sheets_client import RETRYABLE_STATUS, SheetsClient, SheetsError
+from write_journal import CONFLICT, WriteJournal
+
+log = logging.getLogger("neu_kardiyo.sheets")
+
+# ===================== AYARLAR =====================
+SHEET_ID = "1_Jd27n2lvYRl-oKmMOVySd5rGvXLrflDCQJeD_Yz6Y4"
+CASE_SHEET_ID = SHEET_ID
+LETTER_SHEET_ID = SHEET_ID
+
+DATA_WS_INDEX = 0       # 1. sayfa: Veri Girişi
+CASE_WS_INDEX = 1       # 2. sayfa: Case Report Takip
+LETTER_WS_INDEX = 2     # 3. sayfa: Editöre Mektup
+
+READ_CACHE_TTL = 60     # saniye: paylaşılan okuma önbelleğinin ömrü
+MEMO_MAX = 64           # sayfa başına saklanan en fazla liste sayfası / projeksiyon sonucu
+CARRY_MAX_ROWS = 1000   # art arda yamalarda biriken değişen satır sınırı; aşılırsa türetilmişler baştan kurulur
+CHANGE_BUS_KEEP = 500   # değişiklik yayınında tutulan son olay sayısı
+
+SHEETS_READ_QUOTA = 60    # dakika başına okuma isteği (kullanıcı başına Sheets kotası)
+SHEETS_WRITE_QUOTA = 60   # dakika başına yazma isteği
+DRIVE_META_QUOTA = 60     # dakika başına Drive metadata isteği (modifiedTime kontrolü; Sheets kotasından ayrı)
+
+MIRROR_PATH = os.environ.get("NEU_KARDIYO_MIRROR", "neu_kardiyo_mirror.sqlite3")  # sayfaların yerel kopyası
+MIRROR_SYNC_INTERVAL = 30                    # saniye: değişiklik kontrolü yapılamazsa tam senkron aralığı
+CHANGE_CHECK_INTERVAL = 5                    # saniye: Drive modifiedTime ile ucuz değişiklik kontrolü
+MIRROR_FULL_SYNC_INTERVAL = 600              # saniye: değişiklik görünmese de bu sürede bir tam senkron
+
+# Her sayfanın tekil anahtar sütunu (ayna ve upsert için)
+WS_KEY_COLS = {
+    DATA_WS_INDEX: "Dosya Numarası",
+    CASE_WS_INDEX: "TarihSaat",
+    LETTER_WS_INDEX: "TarihSaat",
+}
+
+# Güncellemede yazılan satır sürümü (son güncelleme zamanı); eşzamanlı düzenlemeyi yakalar
+ROW_VERSION_COL = "Son Güncelleme"
+
+# Çalışmanın tüm sayfaları: (sheet_id, worksheet_index)
+STUDY_WORKSHEETS = [
+    (SHEET_ID, DATA_WS_INDEX),
+    (CASE_SHEET_ID, CASE_WS_INDEX),
+    (LETTER_SHEET_ID, LETTER_WS_INDEX),
+]
+
+# ===================== GOOGLE SHEETS BAĞLANTI =====================
+@perf.timed("connect_to_gsheets")
+@st.cache_resource
+def connect_to_gsheets():
+    # gspread / oauth2client (~0.2 s) ilk gerçek bağlantıda yüklenir; soğuk başlangıcı ve fake arka ucu yavaşlatmaz
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    scope = [
+        "https://spreadsheets.google.com/feeds",
+        "https://www.googleapis.com/auth/drive",
+    ]
+    creds = ServiceAccountCredentials.from_json_keyfile_dict(
+        st.secrets["gcp_service_account"], scope
+    )
+    return gspread.authorize(creds)
+
+_client_override = None
+
+def use_client(client):
+    """
+    Gerçek Google istemcisi yerine verilen istemciyi kullanır (ör. fake_gspread.FakeClient).
+    Tüm paylaşılan kaynaklar (tutamaçlar, önbellek, ayna, indeks) sıfırlanır.
+    """
+    global _client_override
+    get_prefetcher().cancel()  # eski arka uçtan kalan ön yüklemeler yeni önbelleğe yazmasın
+    get_journal_flusher().stop()
+    get_mirror_sync_stop().set()  # eski senkron iş parçacığı yeni arka uca karışmasın
+    _client_override = client
+    st.cache_resource.clear()
+
+def get_client():
+    return _client_override if _client_override is not None else connect_to_gsheets()
+
+@st.cache_resource
+def get_sheets_client():
+    return SheetsClient(
+        read_per_min=SHEETS_READ_QUOTA,
+        write_per_min=SHEETS_WRITE_QUOTA,
+        drive_per_min=DRIVE_META_QUOTA,
+        on_call=perf.record_api,
+    )
+
+def sheets_call(op, fn, *args, kind="read", key=None, idempotent=True, verify=None, **kwargs):
+    """
+    Tüm Sheets çağrıları buradan geçer: kota, geri çekilmeli tekrar deneme ve
+    (key verilirse) eşzamanlı aynı okumaların birleştirilmesi. Hata: SheetsError.
+    Satır ekleme / silme idempotent=False ve verify ile çağrılır (bkz. SheetsClient.call).
+    """
+    return get_sheets_client().call(
+        op, fn, *args, kind=kind, key=key, idempotent=idempotent, verify=verify, **kwargs
+    )
+
+@st.cache_resource
+def get_spreadsheet(sheet_id):
+    """Spreadsheet tutamacı bir kez açılır (metadata isteği) ve tekrar kullanılır."""
+    return sheets_call("open_by_key", get_client().open_by_key, sheet_id, key=("open", sheet_id))
+
+@st.cache_resource
+def _worksheet_handles():
+    return {}  # sheet_id -> [Worksheet, ...]
+
+def get_worksheet(sheet_id, worksheet_index, refresh=False):
+    """
+    Önbellekteki Worksheet tutamacını döndürür; yoksa None.
+    refresh=True tüm sayfaların metadata'sını (başlık, ızgara boyutu) tek istekle tazeler.
+    """
+    handles = _worksheet_handles()
+    if refresh or sheet_id not in handles:
+        handles[sheet_id] = sheets_call(
+            "worksheets", get_spreadsheet(sheet_id).worksheets, key=("worksheets", sheet_id)
+        )
+    ws_list = handles[sheet_id]
+    return ws_list[worksheet_index] if 0 <= worksheet_index < len(ws_list) else None
+
+def batch_get_values(sheet_id, worksheet_indexes, refresh_meta=False) -> dict:
+    """Birden çok sayfanın tüm değerlerini tek values_batch_get çağrısıyla getirir."""
+    targets = []
+    for i, ws_index in enumerate(worksheet_indexes):
+        ws = get_worksheet(sheet_id, ws_index, refresh=refresh_meta and i == 0)
+        if ws is not None:
+            targets.append((ws_index, ws))
+    if not targets:
+        return {}
+    ranges = ["'{}'".format(ws.title.replace("'", "''")) for _, ws in targets]
+    resp = sheets_call(
+        "values_batch_get", get_spreadsheet(sheet_id).values_batch_get, ranges,
+        key=("values_batch_get", sheet_id, tuple(ranges)),
+    )
+    value_ranges = resp.get("valueRanges", [])
+    return {ws_index: vr.get("values", []) for (ws_index, _), vr in zip(targets, value_ranges)}
+
+def study_worksheet_indexes(sheet_id):
+    return [i for sid, i in STUDY_WORKSHEETS if sid == sheet_id]
+
+# ===================== OKUMA ÖNBELLEĞİ =====================
+class ReadCache:
+    """
+    Tüm oturumların paylaştığı load_data önbelleği.
+    Anahtar: (sheet_id, worksheet_index). Her anahtarın bir veri versiyonu vardır;
+    başarılı her yazma versiyonu artırır ve eski kaydı geçersiz kılar.
+    """
+
+    def __init__(self, ttl=READ_CACHE_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.patches = 0
+        self._lock = threading.Lock()
+        self._entries = {}   # key -> (version, loaded_at, df)
+        self._versions = {}  # key -> int
+        self._derived = {}   # key -> {ad: değer}; df'den türetilen yapılar (arama indeksi vb.)
+        self._memo = {}      # key -> (versiyon, {ad: değer}); aynadan okunan küçük sonuçlar (liste sayfası vb.)
+        self._carry = {}     # key -> {ad: (eski değer, çıkan satırlar, eklenen satırlar)}; yamadan önceki hâl
+        self.load_stats = {}  # key -> {"rows", "bytes", "parse_ms"}: son ayrıştırmanın ölçümleri
+        self.load_errors = {}  # key -> son başarısız ayrıştırmanın hata mesajı
+
+    def version(self, sheet_id, worksheet_index) -> int:
+        with self._lock:
+            return self._versions.get((sheet_id, worksheet_index), 0)
+
+    def get(self, sheet_id, worksheet_index, confirmed_at=None, count=True):
+        """
+        confirmed_at: ayna sunucuyla en son ne zaman doğrulandı (senkron ya da değişiklik
+        kontrolü). Kayıt yüklendikten sonra doğrulandıysa TTL o andan itibaren sayılır.
+        count=False: isabet/ıska sayaçlarına yansımaz (ön yükleme yoklaması).
+        """
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, loaded_at, df = entry
+                fresh_at = max(loaded_at, confirmed_at or 0)
+                if version == self._versions.get(key, 0) and time.time() - fresh_at < self.ttl:
+                    self.hits += count
+                    return df
+            self.misses += count
+            return None
+
+    def put(self, sheet_id, worksheet_index, df, version):
+        """Okuma sürerken yazma olduysa (versiyon değiştiyse) sonucu saklamaz."""
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            if version == self._versions.get(key, 0):
+                self._entries[key] = (version, time.time(), df)
+                self._derived.pop(key, None)
+                self._carry.pop(key, None)
+
+    def bump(self, sheet_id, worksheet_index):
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._entries.pop(key, None)
+            self._derived.pop(key, None)
+            self._carry.pop(key, None)
+
+    def patch(self, sheet_id, worksheet_index, fn, change=None) -> bool:
+        """
+        Yazma sonrası: versiyonu artırır ve önbellekteki df'yi fn(df) ile kurulan yeni
+        bir kopyayla değiştirir; sayfa yeniden okunmaz. Geçerli kayıt yoksa ya da fn
+        başarısız olursa bump gibi davranır (sonraki load_data aynadan okur).
+        change: (anahtar sütunu, çıkan anahtarlar, eklenen anahtarlar). Verilirse eski
+        türetilmiş yapılar değişen satırlarla saklanır; derived(update=...) onları baştan
+        kurmak yerine günceller. Araya okuma girmeyen art arda yamaların satırları birikir.
+        """
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            old_derived = self._derived.pop(key, None) or {}
+            prev_carry = self._carry.pop(key, None) or {}
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+        if entry is None or entry[0] != version - 1:
+            return False
+        try:
+            df = fn(entry[2])
+        except Exception:
+            return False
+        if df is None:
+            return False
+        carry = None
+        if change is not None and (old_derived or prev_carry):
+            col, removed_keys, added_keys = change
+            removed, added = frame_rows(entry[2], col, removed_keys), frame_rows(df, col, added_keys)
+            carry = {name: (value, removed, added) for name, value in old_derived.items()}
+            for name, (value, r, a) in prev_carry.items():
+                if name not in carry and len(r) + len(a) + len(removed) + len(added) <= CARRY_MAX_ROWS:
+                    carry[name] = (value, pd.concat([r, removed]), pd.concat([a, added]))
+        with self._lock:
+            # fn çalışırken başka bir yazma olduysa yamalı kopya zaten eskidir
+            if self._versions.get(key, 0) != version:
+                return False
+            self._entries[key] = (version, entry[1], df)
+            self.patches += 1
+            if carry:
+                self._carry[key] = carry
+        return True
+
+    def derived(self, sheet_id, worksheet_index, df, name, build, update=None):
+        """
+        df'den türetilen bir yapıyı (ör. arama indeksi) veri versiyonu başına bir kez kurar.
+        df önbellekteki nesne değilse sonuç saklanmadan hesaplanır.
+        update(eski, çıkan_satırlar, eklenen_satırlar): df bir yamayla (patch change=...)
+        oluştuysa ve eski değer varsa build yerine çağrılır. Art arda yamaların satırları
+        tek seferde verildiğinden update toplamsal olmalıdır (satır sırası önemsiz).
+        """
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            entry = self._entries.get(key)
+            cached = entry is not None and entry[2] is df
+            if cached and name in self._derived.get(key, {}):
+                return self._derived[key][name]
+            carry = self._carry.get(key, {}).get(name) if cached and update is not None else None
+        if carry is not None:
+            value = update(*carry)
+        else:
+            value = build()
+        if cached:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[2] is df:
+                    self._derived.setdefault(key, {})[name] = value
+                    self._carry.get(key, {}).pop(name, None)
+        return value
+
+    def memo(self, sheet_id, worksheet_index, name, build):
+        """
+        Tam tabloya ihtiyaç duymayan okumaların (ör. projeksiyonlu liste sayfası) sonucunu
+        veri versiyonu başına saklar; versiyon değişince hepsi düşer. Anahtar başına en
+        fazla MEMO_MAX sonuç tutulur (en eskisi atılır).
+        """
+        key = (sheet_id, worksheet_index)
+        with self._lock:
+            version = self._versions.get(key, 0)
+            held = self._memo.get(key)
+            if held is not None and held[0] == version and name in held[1]:
+                return held[1][name]
+        value = build()
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                held = self._memo.get(key)
+                if held is None or held[0] != version:
+                    held = self._memo[key] = (version, {})
+                held[1][name] = value
+                while len(held[1]) > MEMO_MAX:
+                    held[1].pop(next(iter(held[1])))
+        return value
+
+    def record_load_error(self, sheet_id, worksheet_index, message):
+        with self._lock:
+            self.load_errors[(sheet_id, worksheet_index)] = message
+
+    def record_load(self, sheet_id, worksheet_index, rows, nbytes, parse_s):
+        with self._lock:
+            self.load_errors.pop((sheet_id, worksheet_index), None)
+            self.load_stats[(sheet_id, worksheet_index)] = {
+                "rows": rows,
+                "bytes": nbytes,
+                "parse_ms": parse_s * 1000,
+            }
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "patches": self.patches,
+                "entries": len(self._entries),
+            }
+
+@st.cache_resource
+def get_read_cache():
+    return ReadCache()
+
+def _restore_dtypes(out: pd.DataFrame, like: pd.DataFrame) -> pd.DataFrame:
+    """concat sonrası kayan tipleri (ör. farklı kategorili category -> object) geri alır."""
+    for c in like.columns:
+        if out[c].dtype != like[c].dtype:
+            kind = "category" if isinstance(like[c].dtype, pd.CategoricalDtype) else like[c].dtype
+            out[c] = out[c].astype(kind)
+    return out
+
+def _first_match(df, col, value):
+    """col sütununda value'ya eşit ilk satırın konumu; yoksa None."""
+    if col not in df.columns:
+        return None
+    hits = (df[col].astype(str).str.strip() == value).to_numpy().nonzero()[0]
+    return int(hits[0]) if len(hits) else None
+
+def upsert_frame_row(df, headers, key_col, key, row):
+    """
+    Sayfadaki yazmayı önbellekteki df'ye yansıtır: key varsa o satırı değiştirir,
+    yoksa sona ekler. Başlıklar df ile uyuşmuyorsa (yeni sütun) None döner.
+    """
+    if [str(h).strip() for h in headers] != list(df.columns):
+        return None
+    new_row = build_frame(list(df.columns), [list(row)])
+    pos = _first_match(df, key_col, key)
+    parts = [df, new_row] if pos is None else [df.iloc[:pos], new_row, df.iloc[pos + 1:]]
+    return _restore_dtypes(pd.concat(parts, ignore_index=True), df)
+
+def frame_rows(df, col, values):
+    """col sütununda her değerin ilk eşleştiği satırlar (yoksa atlanır)."""
+    positions = sorted({_first_match(df, col, str(v).strip()) for v in values} - {None})
+    return df.iloc[positions]
+
+def drop_frame_rows(df, col, values):
+    """col sütununda her değerin ilk eşleştiği satırı çıkarır (sayfadaki silmeyle aynı)."""
+    positions = {_first_match(df, col, str(v).strip()) for v in values} - {None}
+    if not positions:
+        return df
+    keep = pd.Series(True, index=df.index)
+    keep.iloc[sorted(positions)] = False
+    return df[keep.to_numpy()].reset_index(drop=True)
+
+# ===================== DEĞİŞİKLİK YAYINI =====================
+class ChangeBus:
+    """
+    Sunucu içi değişiklik yayını: her yazma (sayfa, anahtarlar, işlem) olayı yayınlar, oturumlar
+    son gördükleri sıra numarasından sonrasını okur. Google'a gidilmez; paylaşılan okuma
+    önbelleğini yazan taraf zaten yamaladığı için diğer oturumların yalnızca yeniden çizmesi gerekir.
+    """
+
+    def __init__(self, keep=CHANGE_BUS_KEEP):
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=keep)
+        self._seq = 0
+
+    def publish(self, sheet_id, worksheet_index, keys, op, origin=None) -> int:
+        """op: save / delete / bulk / sync. origin: yazan oturum (None: arka plan ya da Sheets'in kendisi)."""
+        with self._lock:
+            self._seq += 1
+            self._events.append({
+                "seq": self._seq, "ts": time.time(), "sheet_id": sheet_id, "ws_index": worksheet_index,
+                "keys": [str(k) for k in keys], "op": op, "origin": origin,
+            })
+            return self._seq
+
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def since(self, seq):
+        """
+        seq'ten sonraki olaylar (eskiden yeniye) ve son sıra numarası. Aradakiler tampondan
+        düştüyse (ya da seq önceki bir yayına aitse) başa kaynaksız bir "sync" olayı eklenir
+        (sheet_id None: tüm sayfalar).
+        """
+        with self._lock:
+            if seq > self._seq:
+                seq = -1
+            events = []
+            for e in reversed(self._events):
+                if e["seq"] <= seq:
+                    break
+                events.append(e)
+            events.reverse()
+            first = events[0]["seq"] if events else self._seq + 1
+            if first > seq + 1:
+                events.insert(0, {
+                    "seq": first - 1, "ts": time.time(), "sheet_id": None, "ws_index": None,
+                    "keys": [], "op": "sync", "origin": None,
+                })
+            return events, self._seq
+
+    def pending(self, seq, origin, target):
+        """
+        since(seq) içinden origin dışındaki kaynakların target (sheet_id, worksheet_index)
+        sayfasına dokunan olayları ve son sıra numarası. Kaynaksız "sync" olayı herkese gider.
+        """
+        events, last = self.since(seq)
+        return [
+            e for e in events
+            if e["origin"] != origin and (e["sheet_id"] is None or (e["sheet_id"], e["ws_index"]) == target)
+        ], last
+
+@st.cache_resource
+def get_change_bus():
+    return ChangeBus()
+
+_write_origin = contextvars.ContextVar("write_origin", default=None)
+
+def write_origin():
+    """Bu iş parçacığındaki yazmanın kaynağı: günlükten uygulanıyorsa gönderen oturum, değilse o anki rerun'ınki."""
+    return _write_origin.get() or perf.current().session_id or None
+
+def publish_change(sheet_id, worksheet_index, keys, op):
+    get_change_bus().publish(sheet_id, worksheet_index, keys, op, write_origin())
+
+# ===================== YEREL AYNA (SQLite) =====================
+@st.cache_resource
+def get_mirror():
+    return LocalMirror(MIRROR_PATH)
+
+class ChangeTracker:
+    """
+    Dosya başına son tam senkronda görülen Drive modifiedTime değeri ve sayfa başına
+    aynanın sunucuyla en son doğrulandığı an. Değişmeyen dosya için tam okuma yapılmaz.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.drive_ok = True  # Drive metadata okunamazsa (yetki yok vb.) zamanlı tam senkrona düşülür
+        self._tokens = {}     # sheet_id -> (modifiedTime, tam senkron zamanı)
+        self._confirmed = {}  # (sheet_id, worksheet_index) -> zaman
+        self.checks = 0
+        self.skipped = 0
+        self.full_syncs = 0
+
+    def needs_sync(self, sheet_id, token) -> bool:
+        with self._lock:
+            self.checks += 1
+            last = self._tokens.get(sheet_id)
+            if last is None:
+                return True
+            age = time.time() - last[1]
+            if age >= MIRROR_FULL_SYNC_INTERVAL:
+                return True
+            if token is None:
+                return age >= MIRROR_SYNC_INTERVAL
+            if token != last[0]:
+                return True
+            self.skipped += 1
+            return False
+
+    def synced(self, sheet_id, token):
+        with self._lock:
+            self._tokens[sheet_id] = (token, time.time())
+            self.full_syncs += 1
+
+    def confirm(self, sheet_id, worksheet_indexes):
+        now = time.time()
+        with self._lock:
+            for ws_index in worksheet_indexes:
+                self._confirmed[(sheet_id, ws_index)] = now
+
+    def confirmed_at(self, sheet_id, worksheet_index):
+        with self._lock:
+            return self._confirmed.get((sheet_id, worksheet_index))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"checks": self.checks, "skipped": self.skipped, "full_syncs": self.full_syncs}
+
+@st.cache_resource
+def get_change_tracker():
+    return ChangeTracker()
+
+def remote_change_token(sheet_id):
+    """Dosyanın Drive modifiedTime değeri (tek küçük metadata isteği); okunamazsa None."""
+    tracker = get_change_tracker()
+    if not tracker.drive_ok:
+        return None
+    try:
+        return sheets_call(
+            "get_lastUpdateTime", get_spreadsheet(sheet_id).get_lastUpdateTime,
+            kind="drive", key=("modified", sheet_id),
+        )
+    except SheetsError as e:
+        if e.status in (401, 403, 404):
+            tracker.drive_ok = False  # Drive kapsamı yok: bir daha deneme
+        return None
+    except Exception:
+        return None
+
+def sync_if_changed(sheet_id, worksheet_indexes, refresh_meta=False, force=False):
+    """
+    Önce dosyanın modifiedTime değerine bakar; son tam senkrondan beri değişmediyse
+    sayfaları okumadan aynayı doğrulanmış sayar ve None döner. Değiştiyse (ya da
+    force) sync_from_sheets ile tam okur ve onun özetini döndürür.
+    """
+    tracker = get_change_tracker()
+    token = remote_change_token(sheet_id)
+    if not force and not tracker.needs_sync(sheet_id, token):
+        if token is not None:
+            tracker.confirm(sheet_id, worksheet_indexes)
+        return None
+    # Damga okumadan önce alındı: okuma sırasında gelen yazma bir sonraki kontrolde yakalanır
+    result = sync_from_sheets(sheet_id, worksheet_indexes, refresh_meta)
+    tracker.synced(sheet_id, token)
+    return result
+
+def sync_from_sheets(sheet_id, worksheet_indexes, refresh_meta=False) -> dict:
+    """
+    Verilen sayfaları tek toplu okumayla aynaya senkronlar.
+    Değişen sayfaların okuma önbelleğini geçersiz kılar; sayfa başına değişiklik özetini döndürür.
+    """
+    result = {}
+    for ws_index, values in batch_get_values(sheet_id, worksheet_indexes, refresh_meta).items():
+        ws = get_worksheet(sheet_id, ws_index)
+        key_col = WS_KEY_COLS.get(ws_index, "")
+        changes = get_mirror().apply_values(sheet_id, ws_index, values, key_col)
+        # Okunan değerler bedava: yazma indeksini de tazele
+        get_sheet_index(sheet_id, ws_index).rebuild(values, key_col, ws.row_count, ws.col_count)
+        if any(changes.values()):
+            get_read_cache().bump(sheet_id, ws_index)
+            publish_change(sheet_id, ws_index, [], "sync")
+        result[ws_index] = changes
+    get_change_tracker().confirm(sheet_id, list(result))
+    return result
+
+@st.cache_resource
+def get_mirror_sync_stop():
+    """Senkron iş parçacığının durdurma işareti; use_client arka ucu değiştirmeden önce işaretler."""
+    return threading.Event()
+
+@st.cache_resource
+def start_mirror_sync():
+    """
+    Çalışma sayfalarını izleyen arka plan iş parçacığını bir kez başlatır: her turda
+    ucuz değişiklik kontrolü yapar, yalnızca dosya değiştiyse sayfaları okur.
+    """
+    sheet_ids = list(dict.fromkeys(sid for sid, _ in STUDY_WORKSHEETS))
+    stop = get_mirror_sync_stop()
+
+    def loop():
+        while not stop.wait(CHANGE_CHECK_INTERVAL):
+            for sheet_id in sheet_ids:
+                if stop.is_set():
+                    return
+                try:
+                    sync_if_changed(sheet_id, study_worksheet_indexes(sheet_id), refresh_meta=True)
+                except Exception:
+                    pass  # bir sonraki turda tekrar denenir
+
+    t = threading.Thread(target=loop, name="mirror-sync", daemon=True)
+    t.start()
+    return t
+
+# ===================== YARDIMCI =====================
+def colnum_to_letter(n: int) -> str:
+    s = ""
+    while n > 0:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+# ===================== VERİ ÇEKME =====================
+@perf.timed()
+def load_data(sheet_id, worksheet_index=0, required_col=None):
+    """
+    Sayfayı DataFrame olarak döndürür; önce paylaşılan önbelleğe bakar.
+    Dönen DataFrame oturumlar arasında paylaşılır, yerinde değiştirmeyin.
+    """
+    cache = get_read_cache()
+    df = cache.get(sheet_id, worksheet_index, get_change_tracker().confirmed_at(sheet_id, worksheet_index))
+    if df is None:
+        # Arka planda aynı sayfa hazırlanıyorsa onu bekle (aynı ayrıştırmayı iki kez yapma)
+        df = get_prefetcher().join(sheet_id, worksheet_index)
+    if df is None:
+        # İlk senkron versiyonu artırır; versiyonu ondan sonra al ki sonuç önbelleğe girsin
+        if not _ensure_synced(sheet_id, worksheet_index):
+            return pd.DataFrame()
+        df = _load_into_cache(sheet_id, worksheet_index)
+        if df is None:
+            message = get_read_cache().load_errors.get((sheet_id, worksheet_index))
+            if message:
+                st.error(f"⚠️ {worksheet_index + 1}. sayfa okunamadı: {message}")
+            return pd.DataFrame()
+
+    if required_col and required_col not in df.columns:
+        return pd.DataFrame()
+    return df
+
+def _load_into_cache(sheet_id, worksheet_index):
+    """Sayfayı aynadan ayrıştırıp okuma önbelleğine koyar; hata durumunda None."""
+    cache = get_read_cache()
+    version = cache.version(sheet_id, worksheet_index)
+    df = _fetch_sheet_df(sheet_id, worksheet_index)
+    if df is not None:
+        cache.put(sheet_id, worksheet_index, df, version)
+    return df
+
+def _ensure_synced(sheet_id, worksheet_index) -> bool:
+    """Ayna bu sayfayı hiç görmediyse Sheets'ten senkronlar; okunamazsa False."""
+    try:
+        if not get_mirror().has_synced(sheet_id, worksheet_index):
+            # İlk yüklemede aynı dosyadaki tüm çalışma sayfaları birlikte gelir
+            indexes = study_worksheet_indexes(sheet_id) or [worksheet_index]
+            if worksheet_index not in indexes:
+                indexes.append(worksheet_index)
+            sync_if_changed(sheet_id, indexes, force=True)
+        return True
+    except SheetsError as e:
+        st.error(f"⚠️ Google Sheets okunamadı: {e}")
+        return False
+    except:
+        return False
+
+def _fetch_sheet_df(sheet_id, worksheet_index):
+    """
+    Sayfanın tamamını yerel aynadan okur; hata durumunda None döner (önbelleğe yazılmaz),
+    hata loglanır ve okuma önbelleğinin load_errors'una yazılır (arka plan iş parçacığında da çalışır).
+    """
+    try:
+        data = get_mirror().read_values(sheet_id, worksheet_index)
+
+        if not data or len(data) < 1:
+            return pd.DataFrame()
+
+        headers = [str(h).strip() for h in data[0]]
+        rows = data[1:]
+
+        # Duplicate header fix
+        seen = {}
+        unique_headers = []
+        for h in headers:
+            if h in seen:
+                seen[h] += 1
+                unique_headers.append(f"{h}_{seen[h]}")
+            else:
+                seen[h] = 0
+                unique_headers.append(h)
+
+        num_cols = len(unique_headers)
+        fixed_rows = []
+        for row in rows:
+            if len(row) < num_cols:
+                row = row + [""] * (num_cols - len(row))
+            elif len(row) > num_cols:
+                row = row[:num_cols]
+            fixed_rows.append(row)
+
+        t0 = time.perf_counter()
+        df = build_frame(unique_headers, fixed_rows)
+        get_read_cache().record_load(
+            sheet_id, worksheet_index, len(df), memory_bytes(df), time.perf_counter() - t0
+        )
+        return df
+
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}"
+        log.warning(json.dumps(
+            {"event": "parse_error", "sheet_id": sheet_id, "ws_index": worksheet_index, "message": message},
+            ensure_ascii=False,
+        ))
+        get_read_cache().record_load_error(sheet_id, worksheet_index, message)
+        return None
+
+# ===================== PROJEKSİYONLU / SAYFALI OKUMA =====================
+@perf.timed()
+def load_page(sheet_id, worksheet_index, columns, page=0, page_size=50, sort_col=None, descending=False):
+    """
+    Yalnızca columns sütunlarından, sort_col'a göre sıralı page. sayfayı (0 tabanlı)
+    döndürür: (DataFrame, toplam satır). Sıralama ve sayfalama aynada yapılır; tam tablo
+    ayrıştırılmaz. Sonuç veri versiyonu başına saklanır.
+    """
+    if not _ensure_synced(sheet_id, worksheet_index):
+        return pd.DataFrame(), 0
+
+    def build():
+        cols, rows, total = get_mirror().read_page(
+            sheet_id, worksheet_index, columns, sort_col, descending, page * page_size, page_size
+        )
+        return build_frame(cols, rows), total
+
+    name = ("page", tuple(columns), page, page_size, sort_col, descending)
+    return get_read_cache().memo(sheet_id, worksheet_index, name, build)
+
+def load_keys(sheet_id, worksheet_index):
+    """Sayfanın anahtar sütunundaki değerler (sayfa sırasıyla); tam tablo ayrıştırılmaz."""
+    if not _ensure_synced(sheet_id, worksheet_index):
+        return []
+    return get_read_cache().memo(
+        sheet_id, worksheet_index, "keys", lambda: get_mirror().keys(sheet_id, worksheet_index)
+    )
+
+def load_headers(sheet_id, worksheet_index):
+    if not _ensure_synced(sheet_id, worksheet_index):
+        return []
+    return get_read_cache().memo(
+        sheet_id, worksheet_index, "headers", lambda: get_mirror().headers(sheet_id, worksheet_index) or []
+    )
+
+def load_record(sheet_id, worksheet_index, key) -> dict:
+    """Tek kaydın tüm sütunları {başlık: hücre metni} olarak (aynadan); yoksa {}."""
+    if not _ensure_synced(sheet_id, worksheet_index):
+        return {}
+    return get_mirror().get_row(sheet_id, worksheet_index, str(key).strip()) or {}
+
+# ===================== ÖN YÜKLEME =====================
+PREFETCH_WORKERS = 2        # aynı anda en fazla bu kadar sayfa arka planda hazırlanır
+PREFETCH_JOIN_TIMEOUT = 30  # saniye: ön planın süren bir ön yüklemeyi bekleme sınırı
+
+class Prefetcher:
+    """
+    Açık olmayan sekmelerin sayfalarını arka planda aynadan ayrıştırıp okuma
+    önbelleğine koyar; sekmeye ilk geçişte load_data önbellekten döner.
+
+    Ön yükleme hiç Sheets çağrısı yapmaz: yalnızca aynası senkronlanmış sayfalar
+    hazırlanır (ilk yükleme tüm çalışma sayfalarını zaten tek istekle getirir),
+    bu yüzden kotaya dokunmaz. Aynı sayfa için tek iş kuyruğa girer; cancel()
+    henüz başlamamış işleri iptal eder, başlamış olanların sonucunu da önbelleğe yazdırmaz.
+    """
+
+    def __init__(self, workers=PREFETCH_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._lock = threading.RLock()  # cancel() tamamlanma geri çağrısını aynı iş parçacığında tetikler
+        self._pending = {}      # (sheet_id, ws) -> Future
+        self._generation = 0    # cancel() artırır; eski nesil işler sonuç yazmaz
+        self.done = 0
+        self.skipped = 0
+        self.cancelled = 0
+
+    def schedule(self, targets) -> int:
+        """targets: [(sheet_id, ws), ...]; önbellekte olmayanları kuyruğa koyar, eklenen iş sayısını döndürür."""
+        cache, tracker, mirror = get_read_cache(), get_change_tracker(), get_mirror()
+        added = 0
+        with self._lock:
+            for key in targets:
+                if key in self._pending:
+                    continue
+                if cache.get(*key, tracker.confirmed_at(*key), count=False) is not None or not mirror.has_synced(*key):
+                    continue
+                future = self._pool.submit(self._run, key, self._generation)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, key=key: self._finished(key, f))
+                added += 1
+        return added
+
+    def _run(self, key, generation):
+        if generation != self._generation:
+            self.skipped += 1
+            return None
+        cache = get_read_cache()
+        version = cache.version(*key)
+        df = _fetch_sheet_df(*key)
+        if df is None or generation != self._generation:
+            self.skipped += 1
+            return None
+        cache.put(*key, df, version)
+        self.done += 1
+        return df
+
+    def _finished(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def join(self, sheet_id, worksheet_index):
+        """
+        Bu sayfa için çalışan bir ön yükleme varsa sonucunu bekler; kuyrukta bekleyen
+        iş iptal edilir (ön plan kendisi yükler). Sonuç yoksa None.
+        """
+        with self._lock:
+            future = self._pending.get((sheet_id, worksheet_index))
+        if future is None or future.cancel():
+            return None
+        try:
+            return future.result(timeout=PREFETCH_JOIN_TIMEOUT)
+        except Exception:
+            return None
+
+    def cancel(self) -> int:
+        """Bekleyen tüm işleri iptal eder; iptal edilen iş sayısını döndürür."""
+        with self._lock:
+            self._generation += 1
+            n = sum(1 for f in list(self._pending.values()) if f.cancel())
+            self.cancelled += n
+        return n
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "done": self.done,
+                "skipped": self.skipped,
+                "cancelled": self.cancelled,
+            }
+
+@st.cache_resource
+def get_prefetcher():
+    return Prefetcher()
+
+def prefetch_worksheets(exclude=None) -> int:
+    """Çalışma sayfalarından (exclude hariç) önbellekte olmayanları arka planda hazırlatır."""
+    targets = [key for key in STUDY_WORKSHEETS if key != exclude]
+    try:
+        return get_prefetcher().schedule(targets)
+    except Exception:
+        return 0
+
+# ===================== YAZMA İNDEKSİ =====================
+class SheetIndex:
+    """
+    Sayfa başına başlık listesi + tekil anahtar -> satır numarası indeksi.
+    Ekleme/güncelleme/silmede yerinde güncellenir. Worksheet tutamacı önbellekte
+    olduğundan ızgara boyutu (row_count, col_count) yalnızca metadata tazelenince
+    değişir; kurulumdakinden farklıysa indeks yeniden kurulur.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.headers = None   # None: henüz kurulmadı
+        self.key_col = None
+        self.rows = {}        # anahtar -> sayfa satır numarası (1 tabanlı, başlık = 1)
+        self.last_row = 0
+        self.grid = None      # kurulumda görülen (row_count, col_count)
+
+    def is_stale(self, key_col, row_count, col_count) -> bool:
+        return self.headers is None or self.key_col != key_col or self.grid != (row_count, col_count)
+
+    def rebuild(self, values, key_col, row_count, col_count):
+        with self.lock:
+            self.headers = [str(h).strip() for h in values[0]] if values else []
+            self.key_col = key_col
+            self.rows = {}
+            if key_col in self.headers:
+                k = self.headers.index(key_col)
+                for i, row in enumerate(values[1:], start=2):
+                    if k < len(row):
+                        self.rows.setdefault(str(row[k]).strip(), i)
+            self.last_row = len(values)
+            self.grid = (row_count, col_count)
+
+    def record_headers(self, headers):
+        self.headers = list(headers)
+
+    def record_grid(self, row_count, col_count):
+        """
+        Kendi yazmamızdan sonra tutamaçtaki ızgara boyutunu kabul eder: gspread append_rows'ta
+        rowCount'u artırır, delete_rows'ta azaltır. Kaydedilmezse sonraki her yazma indeksi
+        eskimiş sayıp tüm sayfayı yeniden okur.
+        """
+        self.grid = (row_count, col_count)
+
+    def record_append(self, key, row_num=None):
+        row_num = row_num or self.last_row + 1
+        self.rows.setdefault(key, row_num)
+        self.last_row = max(self.last_row, row_num)
+
+    def record_delete(self, row_num):
+        self.rows = {
+            k: (r - 1 if r > row_num else r) for k, r in self.rows.items() if r != row_num
+        }
+        self.last_row -= 1
+
+@st.cache_resource
+def _sheet_indexes():
+    return {}
+
+def get_sheet_index(sheet_id, worksheet_index) -> SheetIndex:
+    return _sheet_indexes().setdefault((sheet_id, worksheet_index), SheetIndex())
+
+def ensure_sheet_index(ws, sheet_id, worksheet_index, key_col) -> SheetIndex:
+    """İndeksi döndürür; ilk kullanımda ya da ızgara boyutu değiştiyse tek okumayla kurar."""
+    idx = get_sheet_index(sheet_id, worksheet_index)
+    if idx.is_stale(key_col, ws.row_count, ws.col_count):
+        values = sheets_call("get_all_values", ws.get_all_values, key=("get_all_values", sheet_id, worksheet_index))
+        idx.rebuild(values, key_col, ws.row_count, ws.col_count)
+    return idx
+
+def _appended_row_number(response):
+    """append_row yanıtındaki 'Sayfa1!A12:CL12' aralığından satır numarasını çıkarır."""
+    try:
+        updated = response["updates"]["updatedRange"]
+        return int(re.search(r"[A-Z]+(\d+)", updated.split("!")[-1]).group(1))
+    except Exception:
+        return None
+
+def _key_cells(ws, col_num, rows) -> list:
+    """rows satırlarının col_num sütunundaki canlı hücre metinleri (tek batch_get)."""
+    letter = colnum_to_letter(col_num)
+    values = sheets_call("batch_get", ws.batch_get, [f"{letter}{r}" for r in rows])
+    return [str(v[0][0]).strip() if v and v[0] else "" for v in values]
+
+def _column_has(ws, col_num, keys) -> set:
+    """keys içinden col_num sütununda şu an bulunanlar (tek col_values)."""
+    present = {str(v).strip() for v in sheets_call("col_values", ws.col_values, col_num)[1:]}
+    return {k for k in keys if k in present}
+
+def _verify_append(ws, col_num, key):
+    """Başarısız görünen ekleme için: anahtar sayfadaysa uygulanmış, değilse güvenle tekrarlanır."""
+    return lambda: bool(_column_has(ws, col_num, [key]))
+
+def _verify_delete(ws, col_num, deleted):
+    """
+    Başarısız görünen silme için: hedef satırlar hâlâ aynı anahtarları taşıyorsa silme
+    uygulanmamıştır (tekrarla); anahtarların hiçbiri yoksa uygulanmıştır; başka her durum
+    belirsizdir (satırlar kaymış olabilir, aynı satır numarasıyla tekrar silinmez).
+    """
+    def verify():
+        if _key_cells(ws, col_num, [row for _, row in deleted]) == [key for key, _ in deleted]:
+            return False
+        return True if not _column_has(ws, col_num, [key for key, _ in deleted]) else None
+    return verify
+
+# ===================== SİLME =====================
+def _rows_for_column(ws, sheet_id, worksheet_index, col_name) -> dict:
+    """
+    col_name sütunundaki değer -> satır numarası eşlemesi.
+    Anahtar sütunu için yazma indeksini kullanır, diğerleri için tek col_values okur.
+    """
+    key_col = WS_KEY_COLS.get(worksheet_index, col_name)
+    idx = ensure_sheet_index(ws, sheet_id, worksheet_index, key_col)
+    if col_name == key_col:
+        return idx.rows
+    if col_name not in idx.headers:
+        return {}
+    col_vals = sheets_call("col_values", ws.col_values, idx.headers.index(col_name) + 1)
+    rows = {}
+    for i, v in enumerate(col_vals[1:], start=2):
+        rows.setdefault(str(v).strip(), i)
+    return rows
+
+def _delete_targets(ws, sheet_id, worksheet_index, col_name, targets) -> list:
+    """Sayfada bulunan hedef anahtarlar: (anahtar, satır) listesi, satırlar azalan sırada."""
+    rows = _rows_for_column(ws, sheet_id, worksheet_index, col_name)
+    return sorted(((k, rows[k]) for k in targets if k in rows), key=lambda kr: kr[1], reverse=True)
+
+def _after_delete(sheet_id, worksheet_index, col_name, deleted):
+    """
+    deleted: (col_name değeri, satır) listesi, satırlar azalan sırada.
+    Ayna WS_KEY_COLS anahtarıyla tutulur; başka sütunla silindiyse ayna anahtarı bilinmediğinden
+    sayfa bir kez senkronlanır (yanlış satır aynadan silinmesin).
+    """
+    idx = get_sheet_index(sheet_id, worksheet_index)
+    ws = get_worksheet(sheet_id, worksheet_index)
+    with idx.lock:
+        for _, row in deleted:
+            idx.record_delete(row)
+        idx.record_grid(ws.row_count, ws.col_count)
+    keys = [key for key, _ in deleted]
+    by_mirror_key = col_name == WS_KEY_COLS.get(worksheet_index, col_name)
+    if by_mirror_key:
+        mirror = get_mirror()
+        for key in keys:
+            mirror.delete_key(sheet_id, worksheet_index, key)
+    get_read_cache().patch(
+        sheet_id, worksheet_index, lambda df: drop_frame_rows(df, col_name, keys), change=(col_name, keys, [])
+    )
+    publish_change(sheet_id, worksheet_index, keys, "delete")
+    if not by_mirror_key:
+        try:
+            sync_from_sheets(sheet_id, [worksheet_index])
+        except SheetsError:
+            pass  # silme uygulandı; arka plan senkronu aynayı uzlaştırır
+
+@perf.timed()
+def delete_row_by_value(sheet_id, worksheet_index, col_name, value):
+    try:
+        return _delete_rows(sheet_id, worksheet_index, col_name, [value]) > 0
+    except (SheetsError, ConflictError) as e:
+        st.error(f"⚠️ {e}")
+        return False
+    except:
+        return False
+
+@perf.timed()
+def delete_rows_by_values(sheet_id, worksheet_index, col_name, values) -> int:
+    """
+    Birden çok kaydı tek batch_update isteğiyle siler.
+    Silinen kayıt sayısını döndürür.
+    """
+    try:
+        return _delete_rows(sheet_id, worksheet_index, col_name, values)
+    except (SheetsError, ConflictError) as e:
+        st.error(f"⚠️ {e}")
+        return 0
+    except:
+        return 0
+
+def _delete_rows(sheet_id, worksheet_index, col_name, values) -> int:
+    """
+    Silme çekirdeği: hatayı yükseltir (günlük yazıcısı tekrar deneyebilsin).
+    Tek satır delete_rows ile, birden çok satır tek batch_update ile silinir; satırlar
+    azalan sırada silinir ki önceki silmeler sonraki indeksleri kaydırmasın.
+    Sayfada olmayan anahtarlar atlanır (tekrar uygulamak güvenli). Silmeden önce hedef
+    satırların canlı anahtar hücreleri tek batch_get ile okunur; indeksle uyuşmazsa indeks
+    yeniden kurulur, yine uyuşmazsa ConflictError (yanlış satır silinmez).
+    """
+    ws = get_worksheet(sheet_id, worksheet_index)
+    targets = {str(v).strip() for v in values}
+    deleted = _delete_targets(ws, sheet_id, worksheet_index, col_name, targets)
+    if not deleted:
+        return 0
+    col_num = get_sheet_index(sheet_id, worksheet_index).headers.index(col_name) + 1
+    if _key_cells(ws, col_num, [row for _, row in deleted]) != [key for key, _ in deleted]:
+        # İndeks eskimiş (başka biri satır ekledi/sildi): sayfayı bir kez okuyup satırları yeniden bul
+        sync_from_sheets(sheet_id, [worksheet_index])
+        deleted = _delete_targets(ws, sheet_id, worksheet_index, col_name, targets)
+        if not deleted:
+            return 0
+        col_num = get_sheet_index(sheet_id, worksheet_index).headers.index(col_name) + 1
+        if _key_cells(ws, col_num, [row for _, row in deleted]) != [key for key, _ in deleted]:
+            raise ConflictError("Silinecek satırların yeri değişti (başka biri ekleme/silme yapıyor). Tekrar deneyin.")
+    verify = _verify_delete(ws, col_num, deleted)
+    if len(deleted) == 1:
+        sheets_call("delete_rows", ws.delete_rows, deleted[0][1], kind="write", idempotent=False, verify=verify)
+    else:
+        requests = [
+            {
+                "deleteDimension": {
+                    "range": {
+                        "sheetId": ws.id,
+                        "dimension": "ROWS",
+                        "startIndex": row - 1,
+                        "endIndex": row,
+                    }
+                }
+            }
+            for _, row in deleted
+        ]
+        sheets_call(
+            "batch_update", get_spreadsheet(sheet_id).batch_update, {"requests": requests},
+            kind="write", idempotent=False, verify=verify,
+        )
+    _after_delete(sheet_id, worksheet_index, col_name, deleted)
+    return len(deleted)
+
+# ===================== KAYIT / GÜNCELLEME (UPSERT) =====================
+class ConflictError(Exception):
+    """Kayıt, formu açtıktan sonra başka biri tarafından değiştirildi; yazma yapılmadı."""
+
+def _write_changed_cells(ws, sheet_id, worksheet_index, headers, uid, row_num, clean_data, unique_col, base_version):
+    """
+    Yalnızca değişen hücreleri tek batch_update ile yazar; headers yerinde genişletilir.
+    Karşılaştırma tabanı aynadaki satırdır. Yazmadan önce canlı satırın anahtarı ve
+    ROW_VERSION_COL değeri kontrol edilir; beklenenden farklıysa ConflictError.
+    Yazılan satırın son hâlini döndürür; değişiklik yoksa None.
+    """
+    cached = get_mirror().get_row(sheet_id, worksheet_index, uid) or {}
+    expected = cached.get(ROW_VERSION_COL, "") if base_version is None else str(base_version)
+    changed = {h: v for h, v in clean_data.items() if not same_cell(v, cached.get(h, ""))}
+    if not changed:
+        return None
+
+    live = sheets_call("row_values", ws.row_values, row_num)
+    live = dict(zip(headers, live + [""] * (len(headers) - len(live))))
+    if live.get(unique_col, "").strip() != uid:
+        conflict = f"{uid} satırının yeri değişmiş (başka biri ekleme/silme yaptı)."
+    elif ROW_VERSION_COL in headers and live.get(ROW_VERSION_COL, "") != expected:
+        conflict = f"{uid} siz düzenlerken başka biri tarafından güncellendi ({live.get(ROW_VERSION_COL)})."
+    else:
+        conflict = None
+    if conflict:
+        raise ConflictError(f"{conflict} Kaydı yeniden açıp tekrar deneyin.")
+
+    changed[ROW_VERSION_COL] = datetime.now().isoformat(timespec="milliseconds")
+    new_headers = [h for h in changed if h not in headers]
+    headers.extend(new_headers)
+    data = [{"range": f"{colnum_to_letter(headers.index(h) + 1)}1", "values": [[h]]} for h in new_headers]
+    data += [
+        {"range": f"{colnum_to_letter(headers.index(h) + 1)}{row_num}", "values": [[v]]}
+        for h, v in changed.items()
+    ]
+    sheets_call("batch_update", ws.batch_update, data, kind="write")
+    return [changed.get(h, live.get(h, "")) for h in headers]
+
+@perf.timed()
+def save_data_row(sheet_id, data_dict, unique_col, worksheet_index=0, base_version=None):
+    """
+    Kaydı ekler ya da günceller. Güncellemede yalnızca değişen hücreler yazılır.
+    base_version: formun açıldığı andaki ROW_VERSION_COL değeri (None: aynadaki değer).
+    Sonucu döndürür ("created" / "added" / "updated" / "unchanged"); günlük yazıcısının
+    iş parçacığında da çalıştığı için kullanıcıya bildirimi çağıran taraf gösterir.
+    """
+    ws = get_worksheet(sheet_id, worksheet_index)
+    if ws is None:
+        raise ValueError(f"{worksheet_index + 1}. sayfa bulunamadı!")
+
+    clean_data = {str(k).strip(): ("" if v is None else str(v)) for k, v in data_dict.items()}
+    idx = ensure_sheet_index(ws, sheet_id, worksheet_index, unique_col)
+
+    if not idx.headers:
+        sheets_call(
+            "append_row", ws.append_row, list(clean_data.keys()), kind="write", idempotent=False,
+            verify=lambda: bool(sheets_call("row_values", ws.row_values, 1)),
+        )
+        sheets_call(
+            "append_row", ws.append_row, list(clean_data.values()), kind="write", idempotent=False,
+            verify=lambda: bool(sheets_call("row_values", ws.row_values, 2)),
+        )
+        sync_from_sheets(sheet_id, [worksheet_index])
+        get_read_cache().bump(sheet_id, worksheet_index)
+        return "created"
+
+    uid = clean_data.get(unique_col, "").strip()
+    if not uid:
+        raise ValueError(f"{unique_col} boş olamaz!")
+
+    try:
+        row_to_save, headers, outcome = _upsert_locked(
+            ws, sheet_id, worksheet_index, idx, uid, clean_data, unique_col, base_version
+        )
+    except ConflictError:
+        # Ayna ve indeks güncel hâle gelsin (indeks kilidi dışında; rebuild kilidi alır)
+        try:
+            sync_from_sheets(sheet_id, [worksheet_index])
+        except Exception:
+            pass
+        raise
+    if row_to_save is None:
+        return outcome
+    get_mirror().upsert_row(sheet_id, worksheet_index, headers, uid, row_to_save)
+    # Liste yeniden okunmadan hemen güncellensin; arka plan senkronu sunucuyla uzlaştırır
+    get_read_cache().patch(
+        sheet_id, worksheet_index, lambda df: upsert_frame_row(df, headers, unique_col, uid, row_to_save),
+        change=(unique_col, [uid], [uid]),
+    )
+    publish_change(sheet_id, worksheet_index, [uid], "save")
+    return outcome
+
+def _upsert_locked(ws, sheet_id, worksheet_index, idx, uid, clean_data, unique_col, base_version):
+    """save_data_row'un indeks kilidi altındaki kısmı: (yazılan satır ya da None, başlıklar, sonuç)."""
+    with idx.lock:
+        headers = list(idx.headers)
+        row_index_to_update = idx.rows.get(uid)
+
+        if row_index_to_update:
+            row_to_save = _write_changed_cells(
+                ws, sheet_id, worksheet_index, headers, uid, row_index_to_update,
+                clean_data, unique_col, base_version,
+            )
+            if row_to_save is None:
+                return None, headers, "unchanged"
+            idx.record_headers(headers)
+            idx.record_grid(ws.row_count, ws.col_count)
+            outcome = "updated"
+        else:
+            missing_cols = [k for k in [unique_col] + list(clean_data.keys()) if k not in headers]
+            if missing_cols:
+                headers.extend(dict.fromkeys(missing_cols))
+                sheets_call("update", ws.update, "1:1", [headers], kind="write")
+                idx.record_headers(headers)
+            if ROW_VERSION_COL in headers:
+                clean_data[ROW_VERSION_COL] = datetime.now().isoformat(timespec="milliseconds")
+            row_to_save = [clean_data.get(h, "") for h in headers]
+            response = sheets_call(
+                "append_row", ws.append_row, row_to_save, kind="write", idempotent=False,
+                verify=_verify_append(ws, headers.index(unique_col) + 1, uid),
+            )
+            idx.record_append(uid, _appended_row_number(response))
+            idx.record_grid(ws.row_count, ws.col_count)
+            outcome = "added"
+    return row_to_save, headers, outcome
+
+# ===================== TÜRETİLMİŞ SÜTUNLAR (TOPLU) =====================
+@perf.timed()
+def recompute_derived_columns(sheet_id, worksheet_index=DATA_WS_INDEX, key_col="Dosya Numarası") -> int:
+    """
+    Tüm sayfadaki türetilmiş sütunları (BMI, BSA, LV Mass, ...) yeniden hesaplar ve
+    yalnızca eskimiş/eksik hücreleri tek batch_update ile yazar. Yazılan hücre sayısını döndürür.
+    Önce sayfa senkronlanır (satır numaraları güncel indeksten gelir); dokunulan her satırın
+    ROW_VERSION_COL değeri de yenilenir ki açık formlar değişikliği görsün.
+    """
+    sync_from_sheets(sheet_id, [worksheet_index])
+    df = load_data(sheet_id, worksheet_index, required_col=key_col)
+    if df.empty:
+        return 0
+    stale = metrics.stale_cells(df)
+    if not stale:
+        return 0
+
+    ws = get_worksheet(sheet_id, worksheet_index)
+    idx = ensure_sheet_index(ws, sheet_id, worksheet_index, key_col)
+    with idx.lock:
+        headers = list(idx.headers)
+        header_updates = []
+        for col in list(stale) + [ROW_VERSION_COL]:
+            if col not in headers:
+                headers.append(col)
+                header_updates.append({"range": f"{colnum_to_letter(len(headers))}1", "values": [[col]]})
+        updates, touched = [], set()
+        keys = df[key_col].astype(str).str.strip().to_numpy()
+        for col, (positions, values) in stale.items():
+            letter = colnum_to_letter(headers.index(col) + 1)
+            for pos, val in zip(positions, values):
+                row = idx.rows.get(keys[pos])
+                if row:
+                    cell = "" if pd.isna(val) else str(float(val))
+                    updates.append({"range": f"{letter}{row}", "values": [[cell]]})
+                    touched.add(row)
+        if not updates:
+            return 0
+        stamp = datetime.now().isoformat(timespec="milliseconds")
+        letter = colnum_to_letter(headers.index(ROW_VERSION_COL) + 1)
+        stamps = [{"range": f"{letter}{row}", "values": [[stamp]]} for row in sorted(touched)]
+        sheets_call("batch_update", ws.batch_update, header_updates + updates + stamps, kind="write")
+        idx.record_headers(headers)
+        idx.record_grid(ws.row_count, ws.col_count)
+
+    sync_from_sheets(sheet_id, [worksheet_index])
+    get_read_cache().bump(sheet_id, worksheet_index)
+    return len(updates)
+
+# ===================== TOPLU İÇE AKTARMA =====================
+BULK_MAX_RANGES = 5000   # tek batch_update'teki en fazla aralık
+BULK_APPEND_CHUNK = 1000  # tek append_rows'taki en fazla satır
+
+@perf.timed()
+def bulk_upsert(sheet_id, records, unique_col, worksheet_index=DATA_WS_INDEX, dry_run=True) -> dict:
+    """
+    bulk_import.validate kayıtlarını anahtar sütununa göre ekler/günceller.
+    Önce sayfa tek okumayla senkronlanır; plan güncel aynaya göre çıkarılır (türetilmiş
+    ölçümler dahil). dry_run=True yalnızca planı döndürür. Yazmada değişen hücreler
+    batch_update ile, yeni kayıtlar append_rows ile toplu gönderilir; satırı bu arada
+    sayfadan kalkan güncellemeler yazılmaz, anahtarları "skipped" listesinde döner.
+    """
+    sync_from_sheets(sheet_id, [worksheet_index])
+    existing = get_mirror().get_rows(sheet_id, worksheet_index, [r[unique_col] for r in records])
+    bulk_import.add_derived(records, existing, unique_col)
+    plan = bulk_import.plan(records, existing, unique_col)
+    if dry_run or not (plan["new"] or plan["updates"]):
+        return plan
+
+    ws = get_worksheet(sheet_id, worksheet_index)
+    idx = ensure_sheet_index(ws, sheet_id, worksheet_index, unique_col)
+    stamp = datetime.now().isoformat(timespec="milliseconds")
+    written = {}  # anahtar -> sayfadaki son satır (ayna için)
+    skipped = []  # senkrondan sonra sayfadan silinen/taşınan kayıtlar: yazılmadı
+    with idx.lock:
+        headers = list(idx.headers)
+        fields = [f for r in plan["new"] for f in r] + [f for u in plan["updates"].values() for f in u]
+        new_headers = [h for h in dict.fromkeys(fields + [ROW_VERSION_COL]) if h not in headers]
+        headers.extend(new_headers)
+        col = {h: colnum_to_letter(i + 1) for i, h in enumerate(headers)}
+
+        data = [{"range": f"{col[h]}1", "values": [[h]]} for h in new_headers]
+        for key, changed in plan["updates"].items():
+            row_num = idx.rows.get(key)
+            if not row_num:
+                skipped.append(key)
+                continue
+            changed = {**changed, ROW_VERSION_COL: stamp}
+            data += [{"range": f"{col[h]}{row_num}", "values": [[v]]} for h, v in changed.items()]
+            written[key] = [changed.get(h, existing[key].get(h, "")) for h in headers]
+        for i in range(0, len(data), BULK_MAX_RANGES):
+            sheets_call("batch_update", ws.batch_update, data[i:i + BULK_MAX_RANGES], kind="write")
+
+        new_rows = [[{**r, ROW_VERSION_COL: stamp}.get(h, "") for h in headers] for r in plan["new"]]
+        for i in range(0, len(new_rows), BULK_APPEND_CHUNK):
+            chunk = new_rows[i:i + BULK_APPEND_CHUNK]
+            response = sheets_call(
+                "append_rows", ws.append_rows, chunk, kind="write", idempotent=False,
+                verify=_verify_append(ws, headers.index(unique_col) + 1, plan["new"][i][unique_col]),
+            )
+            first = _appended_row_number(response)
+            for j, (r, row) in enumerate(zip(plan["new"][i:i + BULK_APPEND_CHUNK], chunk)):
+                idx.record_append(r[unique_col], first + j if first else None)
+                written[r[unique_col]] = row
+        idx.record_headers(headers)
+        idx.record_grid(ws.row_count, ws.col_count)
+
+    mirror = get_mirror()
+    for key, row in written.items():
+        mirror.upsert_row(sheet_id, worksheet_index, headers, key, row)
+    get_read_cache().bump(sheet_id, worksheet_index)
+    publish_change(sheet_id, worksheet_index, list(written), "bulk")
+    plan["written"] = len(written)
+    plan["skipped"] = skipped
+    return plan
+
+# ===================== YAZMA GÜNLÜĞÜ =====================
+JOURNAL_PATH = os.environ.get("NEU_KARDIYO_JOURNAL", "neu_kardiyo_journal.sqlite3")  # bekleyen yazmalar (kalıcı)
+JOURNAL_SUBMIT_WAIT = 3      # saniye: form gönderiminin yazmanın uygulanmasını bekleme sınırı
+JOURNAL_RETRY_BASE = 2       # saniye: başarısız yazmanın ilk tekrar gecikmesi (her denemede 2 katı)
+JOURNAL_RETRY_MAX = 300      # saniye: tekrar gecikmesinin üst sınırı
+JOURNAL_IDLE_WAIT = 30       # saniye: kuyruk boşken yazıcının uyanma aralığı
+JOURNAL_KEEP_DONE = 24 * 3600  # saniye: uygulanmış kayıtların günlükte tutulma süresi
+
+@st.cache_resource
+def get_journal():
+    return WriteJournal(JOURNAL_PATH)
+
+class JournalFlusher:
+    """
+    Günlükteki bekleyen yazmaları eklenme sırasıyla Sheets'e uygulayan arka plan iş parçacığı.
+    Geçici hatalarda (429 / 5xx / ağ) kayıt bekleyen kalır ve üstel gecikmeyle tekrar denenir;
+    sıradaki kayıt beklerken sonrakiler de bekler ki aynı kaydın yazmaları yer değiştirmesin.
+    start=False: iş parçacığı başlatılmaz; flush() doğrudan çağrılır (testler).
+    """
+
+    def __init__(self, journal, start=True):
+        self.journal = journal
+        self.applied = 0
+        self.retries = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="journal-flush", daemon=True)
+        if start:
+            self._thread.start()
+
+    def wake(self):
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                delay = self.flush()
+                self.journal.prune(JOURNAL_KEEP_DONE)
+            except Exception:
+                delay = JOURNAL_RETRY_BASE  # günlük okunamadı: kısa süre sonra tekrar dene
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def flush(self) -> float:
+        """Zamanı gelmiş kayıtları uygular; bir sonraki denemeye kadar beklenecek süreyi döndürür."""
+        while not self._stop.is_set():
+            entry = self.journal.head()
+            if entry is None:
+                return JOURNAL_IDLE_WAIT
+            wait = entry["next_at"] - time.time()
+            if wait > 0:
+                return wait
+            self._apply(entry)
+        return 0
+
+    def _apply(self, entry):
+        journal, entry_id = self.journal, entry["id"]
+        journal.start_attempt(entry_id)
+        try:
+            result = apply_journal_entry(entry)
+        except ConflictError as e:
+            journal.mark_failed(entry_id, str(e), status=CONFLICT)
+        except SheetsError as e:
+            if e.status is None or e.status in RETRYABLE_STATUS:
+                self.retries += 1
+                journal.mark_retry(entry_id, str(e), min(JOURNAL_RETRY_MAX, JOURNAL_RETRY_BASE * 2 ** entry["attempts"]))
+            else:
+                journal.mark_failed(entry_id, str(e))
+        except Exception as e:
+            journal.mark_failed(entry_id, str(e) or type(e).__name__)
+        else:
+            self.applied += 1
+            journal.mark_done(entry_id, result)
+
+@st.cache_resource
+def get_journal_flusher():
+    """Yazıcıyı bir kez başlatır; önceki çalıştırmadan kalan bekleyen kayıtlar da uygulanır."""
+    return JournalFlusher(get_journal())
+
+def apply_journal_entry(entry):
+    """
+    Günlük kaydını Sheets'e uygular (hata yükseltir). Kayıtlar anahtarla upsert / silme
+    olduğu için tekrar uygulamak güvenlidir; önceki deneme yarıda kaldıysa (yazma sunucuya
+    ulaşmış ama yanıt gelmemiş olabilir) önce sayfa senkronlanır ki indeks güncel olsun.
+    """
+    token = _write_origin.set(entry["payload"].get("origin"))  # yayınlanan olaylar gönderen oturumun
+    try:
+        return _apply_entry(entry)
+    finally:
+        _write_origin.reset(token)
+
+def _apply_entry(entry):
+    sheet_id, ws_index, key_col = entry["sheet_id"], entry["ws_index"], entry["key_col"]
+    if entry["attempts"]:
+        sync_from_sheets(sheet_id, [ws_index])
+    if entry["op"] == "save":
+        data = entry["payload"]["data"]
+        if entry["attempts"] and _already_saved(sheet_id, ws_index, entry["keys"][0], data):
+            return "saved"  # önceki deneme sunucuya ulaşmış
+        return save_data_row(sheet_id, data, key_col, ws_index, base_version=entry["payload"].get("base_version"))
+    if entry["op"] == "delete":
+        return _delete_rows(sheet_id, ws_index, key_col, entry["keys"])
+    raise ValueError(f"Bilinmeyen günlük işlemi: {entry['op']}")
+
+def _already_saved(sheet_id, worksheet_index, key, data) -> bool:
+    """Aynadaki satır kaydın tüm hücrelerini zaten taşıyor mu (önceki deneme sunucuya ulaşmış)?"""
+    row = get_mirror().get_row(sheet_id, worksheet_index, key)
+    return row is not None and all(same_cell(row.get(h, ""), v) for h, v in data.items())
+
+def submit_save(sheet_id, data_dict, unique_col, worksheet_index=0, base_version=None, wait=JOURNAL_SUBMIT_WAIT):
+    """
+    Kaydı önce günlüğe yazar, sonra arka plan yazıcısına bırakır; en fazla wait saniye
+    uygulanmasını bekler. Günlük kaydını (status: pending / done / conflict / failed) döndürür;
+    uygulandıysa result save_data_row'un sonucudur.
+    """
+    clean_data = {str(k).strip(): ("" if v is None else str(v)) for k, v in data_dict.items()}
+    uid = clean_data.get(unique_col, "").strip()
+    if not uid:
+        raise ValueError(f"{unique_col} boş olamaz!")
+    entry_id = get_journal().append(
+        "save", sheet_id, worksheet_index, unique_col, [uid],
+        {"data": clean_data, "base_version": base_version, "origin": write_origin()},
+    )
+    get_journal_flusher().wake()
+    return get_journal().wait(entry_id, wait)
+
+def submit_delete(sheet_id, worksheet_index, col_name, values, wait=JOURNAL_SUBMIT_WAIT):
+    """Silmeyi günlüğe yazar ve yazıcıya bırakır; result alanı silinen kayıt sayısıdır."""
+    keys = [str(v).strip() for v in values]
+    entry_id = get_journal().append("delete", sheet_id, worksheet_index, col_name, keys, {"origin": write_origin()})
+    get_journal_flusher().wake()
+    return get_journal().wait(entry_id, wait)
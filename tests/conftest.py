@@ -0,0 +1,10 @@
+"""
+Testler canlı Google Sheets yerine fake_gspread arka ucunu kullanır.
+Ayna ve yazma günlüğü bellekte tutulur; depo kökü içe aktarma yoluna eklenir.
+"""
+import os
+import sys
+
+os.environ.setdefault("NEU_KARDIYO_MIRROR", ":memory:")
+os.environ.setdefault("NEU_KARDIYO_JOURNAL", ":memory:")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,112 @@
+"""Toplu içe aktarma: eşleme, doğrulama, plan ve fake_gspread üzerinde kuru çalıştırma / yazma."""
+import logging
+
+import pandas as pd
+import pytest
+
+import bulk_import
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet
+
+KEY = "Dosya Numarası"
+BMI, BSA = repr(70 / 1.7 ** 2), repr((170 * 70 / 3600) ** 0.5)  # 1. hastanın sayfadaki türetilmiş değerleri
+
+# ===================== suggest_mapping / validate =====================
+def test_suggest_mapping_ignores_case_spacing_and_aliases():
+    fields = [KEY, "Hgb", "LVEDD", "Mitral E/A"]
+    mapping = bulk_import.suggest_mapping(["dosya no", "HGB ", "lvedd", "Mitral E-A", "Bilinmeyen"], fields)
+    assert mapping == {"dosya no": KEY, "HGB ": "Hgb", "lvedd": "LVEDD", "Mitral E-A": "Mitral E/A", "Bilinmeyen": None}
+
+def test_validate_normalizes_and_drops_blank_cells():
+    src = pd.DataFrame({"No": ["1", "2"], "Hgb": ["12,5", ""], "DM": ["evet", "hayır"]})
+    records, errors = bulk_import.validate(src, {"No": KEY, "Hgb": "Hgb", "DM": "DM"}, KEY)
+    assert errors == []
+    assert records == [{KEY: "1", "Hgb": "12.5", "DM": "True"}, {KEY: "2", "DM": "False"}]
+
+def test_validate_rejects_bad_blank_and_duplicate_rows():
+    src = pd.DataFrame({"No": ["1", "", "3", "3", "5"], "Hgb": ["abc", "12", "11", "10", "9"]})
+    records, errors = bulk_import.validate(src, {"No": KEY, "Hgb": "Hgb"}, KEY)
+    assert records == [{KEY: "5", "Hgb": "9.0"}]
+    assert [(e["Satır"], e["Hata"]) for e in errors] == [
+        (2, "Geçersiz değer"), (3, f"{KEY} boş"), (4, "Dosyada tekrar eden kayıt"), (5, "Dosyada tekrar eden kayıt"),
+    ]
+
+def test_validate_requires_key_mapping():
+    records, errors = bulk_import.validate(pd.DataFrame({"Hgb": ["12"]}), {"Hgb": "Hgb"}, KEY)
+    assert records == [] and errors[0]["Hata"] == "Anahtar sütunu eşlenmedi"
+
+# ===================== plan =====================
+def test_plan_splits_new_updated_and_unchanged():
+    existing = {"1": {KEY: "1", "Hgb": "12.5", "Kilo": "70"}, "2": {KEY: "2", "Hgb": "13"}}
+    records = [{KEY: "1", "Hgb": "12,50"}, {KEY: "2", "Hgb": "14"}, {KEY: "3", "Hgb": "9"}]
+    p = bulk_import.plan(records, existing, KEY)
+    assert p["new"] == [{KEY: "3", "Hgb": "9"}]
+    assert p["updates"] == {"2": {"Hgb": "14"}}
+    assert p["unchanged"] == 1
+    assert p["diff"] == [{KEY: "2", "Alan": "Hgb", "Eski": "13", "Yeni": "14"}]
+
+# ===================== bulk_upsert =====================
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [
+                [KEY, "Adı Soyadı", "Hgb", "Boy", "Kilo", "BMI", "BSA"],
+                ["1", "Hasta 1", "12", "170", "70", BMI, BSA],
+                ["2", "Hasta 2", "13", "", ""],
+                ["3", "Hasta 3", "11", "", ""],
+            ]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    yield sh
+    store.use_client(None)
+
+def rows(sh):
+    ws = sh._worksheets[store.DATA_WS_INDEX]
+    headers = ws._rows[0]
+    return {r[0]: dict(zip(headers, r + [""] * (len(headers) - len(r)))) for r in ws._rows[1:]}
+
+def records():
+    src = pd.DataFrame({"No": ["1", "2", "4"], "Hgb": ["12", "14", "9"], "Kilo": ["", "", "80"]})
+    return bulk_import.validate(src, {"No": KEY, "Hgb": "Hgb", "Kilo": "Kilo"}, KEY)[0]
+
+def test_dry_run_plans_without_writing(sheet):
+    before = rows(sheet)
+    p = store.bulk_upsert(store.SHEET_ID, records(), KEY, dry_run=True)
+    assert [r[KEY] for r in p["new"]] == ["4"]
+    assert p["updates"] == {"2": {"Hgb": "14.0"}}
+    assert p["unchanged"] == 1  # 1: aynı Hgb, boş Kilo mevcut değeri silmez; BMI değişmez
+    assert rows(sheet) == before
+    assert "batch_update" not in sheet.calls and "append_rows" not in sheet.calls
+
+def test_apply_writes_plan_and_never_blanks_existing_cells(sheet):
+    result = store.bulk_upsert(store.SHEET_ID, records(), KEY, dry_run=False)
+    assert result["written"] == 2 and result["skipped"] == []
+    after = rows(sheet)
+    assert after["1"]["Kilo"] == "70" and after["1"]["Boy"] == "170"
+    assert after["2"]["Hgb"] == "14.0" and after["2"]["Adı Soyadı"] == "Hasta 2"
+    assert after["2"][store.ROW_VERSION_COL] and not after["1"][store.ROW_VERSION_COL]
+    assert after["4"]["Kilo"] == "80.0" and after["4"]["Hgb"] == "9.0"
+    assert after["3"]["Hgb"] == "11"
+    # tekrar çalıştırınca yazılacak bir şey kalmaz
+    again = store.bulk_upsert(store.SHEET_ID, records(), KEY, dry_run=True)
+    assert again["new"] == [] and again["updates"] == {} and again["unchanged"] == 3
+
+def test_update_for_row_gone_from_index_is_reported_as_skipped(sheet, monkeypatch):
+    ensure = store.ensure_sheet_index
+
+    def row_vanished(*args, **kwargs):
+        idx = ensure(*args, **kwargs)
+        idx.rows.pop("2", None)  # senkron ile yazma arasında başka biri satırı sildi
+        return idx
+
+    monkeypatch.setattr(store, "ensure_sheet_index", row_vanished)
+    result = store.bulk_upsert(store.SHEET_ID, records(), KEY, dry_run=False)
+    assert result["skipped"] == ["2"]
+    assert result["written"] == 1
+    assert rows(sheet)["2"]["Hgb"] == "13"
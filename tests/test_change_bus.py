@@ -0,0 +1,74 @@
+"""Değişiklik yayını: oturum kendi olaylarını görmez, tampon taşınca "sync", yazıcı iş parçacığından yayın."""
+import logging
+
+import pytest
+
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet
+from write_journal import DONE
+
+KEY = "Dosya Numarası"
+DATA = (store.SHEET_ID, store.DATA_WS_INDEX)
+
+def test_session_skips_its_own_events_and_other_sheets():
+    bus = store.ChangeBus()
+    bus.publish(*DATA, ["1"], "save", origin="A")
+    bus.publish(*DATA, ["2"], "delete", origin="B")
+    bus.publish(store.SHEET_ID, 1, ["x"], "save", origin="B")
+    bus.publish(*DATA, ["3"], "sync")  # Sheets'in kendisi
+    events, last = bus.pending(0, "A", DATA)
+    assert [(e["keys"], e["origin"]) for e in events] == [(["2"], "B"), (["3"], None)]
+    assert last == 4
+    assert [e["keys"] for e in bus.pending(0, "B", DATA)[0]] == [["1"], ["3"]]
+    assert bus.pending(last, "A", DATA) == ([], 4)
+
+def test_catch_all_sync_when_behind_the_buffer():
+    bus = store.ChangeBus(keep=3)
+    for k in range(5):
+        bus.publish(*DATA, [str(k)], "save", origin="A")
+    events, last = bus.since(1)
+    assert last == 5
+    assert events[0]["op"] == "sync" and events[0]["sheet_id"] is None and events[0]["seq"] == 2
+    assert [e["seq"] for e in events[1:]] == [3, 4, 5]
+    # kendi yazmaları atlansa da kaçırılan olaylar için sync herkese gider
+    assert [e["op"] for e in bus.pending(1, "A", DATA)[0]] == ["sync"]
+    # tam sınırda: kaçırılan yok, sync eklenmez
+    assert [e["seq"] for e in bus.since(2)[0]] == [3, 4, 5]
+
+def test_seq_from_previous_bus_gets_sync():
+    bus = store.ChangeBus()
+    bus.publish(*DATA, ["1"], "save")
+    events, last = bus.since(40)  # yeniden başlatılan sunucu: oturumun sırası ileride kaldı
+    assert [e["op"] for e in events] == ["sync", "save"] and last == 1
+
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [[KEY, "Adı Soyadı"], ["1", "Hasta 1"]]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    store.load_data(*DATA)
+    yield sh
+    store.use_client(None)
+
+def test_events_from_flusher_thread_carry_submitting_session(sheet):
+    bus = store.get_change_bus()
+    seq = bus.last_seq()
+    token = store._write_origin.set("A")
+    try:
+        save = store.submit_save(store.SHEET_ID, {KEY: "2", "Adı Soyadı": "Hasta 2"}, KEY, store.DATA_WS_INDEX, wait=10)
+        delete = store.submit_delete(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["1"], wait=10)
+    finally:
+        store._write_origin.reset(token)
+    assert (save["status"], delete["status"]) == (DONE, DONE)
+
+    events, _ = bus.since(seq)
+    assert [(e["op"], e["keys"], e["origin"]) for e in events] == [("save", ["2"], "A"), ("delete", ["1"], "A")]
+    assert bus.pending(seq, "A", DATA)[0] == []
+    assert [e["op"] for e in bus.pending(seq, "B", DATA)[0]] == ["save", "delete"]
@@ -0,0 +1,85 @@
+"""Kohort özetleri: yamayla (ReadCache.patch change=...) güncellenen istatistik baştan kurulanla aynı olmalı."""
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sheets_store as store
+from cohort_stats import ALL, GROUPS, CohortStats
+from fake_gspread import FakeClient, FakeSpreadsheet
+from schema import build_frame
+
+KEY = "Dosya Numarası"
+HEADERS = [KEY, "Cinsiyet", "DM", "Homosistein", "LVMi", "GLS", "Mitral E/e'", "RWT", "LVEF"]
+ROWS = [
+    ["1", "Erkek", "True", "14.2", "95", "-18", "8.1", "0.41", "60"],
+    ["2", "Kadın", "False", "11.0", "80", "-20", "7.0", "0.38", "65"],
+    ["3", "Erkek", "False", "18.5", "110", "-15", "11.2", "0.47", "0"],
+    ["4", "Kadın", "True", "9.8", "", "-21", "6.4", "0.35", "62"],
+    ["5", "Erkek", "True", "22.1", "125", "-13", "13.0", "0.52", "55"],
+]
+
+def assert_same_stats(a: CohortStats, b: CohortStats):
+    pd.testing.assert_frame_equal(a.summary(), b.summary(), check_exact=False, rtol=1e-9, atol=1e-9)
+    for group in GROUPS:
+        pd.testing.assert_frame_equal(a.correlations(group), b.correlations(group), check_exact=False, atol=1e-9)
+
+def test_updated_matches_fresh_build():
+    df = build_frame(HEADERS, ROWS)
+    after = build_frame(HEADERS, [ROWS[0], ["2", "Kadın", "True", "30", "90", "-17", "9", "0.4", "58"]] + ROWS[2:4])
+    stats = CohortStats(df).updated(df.iloc[[1, 4]], after.iloc[[1]])
+    assert_same_stats(stats, CohortStats(after))
+
+def test_zero_counts_as_missing():
+    summary = CohortStats(build_frame(HEADERS, ROWS)).summary().set_index(["Grup", "Değişken"])
+    assert summary.loc[(ALL, "LVEF"), "n"] == 4
+    assert summary.loc[(ALL, "LVMi"), "n"] == 4
+    assert summary.loc[("Kadın · DM var", "LVEF"), "n"] == 1
+    assert np.isnan(summary.loc[("Kadın · DM var", "LVEF"), "SS"])
+
+# ===================== ReadCache.patch üzerinden =====================
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            # Sürüm sütunu baştan var: yeni sütun açan yazma yamalanmaz, tablo yeniden okunur
+            ("Veri Girişi", [HEADERS + [store.ROW_VERSION_COL]] + [r + [""] for r in ROWS]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    yield sh
+    store.use_client(None)
+
+def cached_stats(df, updates):
+    """web_app.cohort_stats ile aynı kayıt; update yolunun kullanıldığını sayar."""
+    def update(old, removed, added):
+        updates.append((len(removed), len(added)))
+        return old.updated(removed, added)
+
+    return store.get_read_cache().derived(
+        store.SHEET_ID, store.DATA_WS_INDEX, df, "cohort_stats", lambda: CohortStats(df), update=update,
+    )
+
+def test_patched_stats_after_save_and_delete_match_fresh_build(sheet):
+    updates = []
+    cached_stats(store.load_data(store.SHEET_ID, store.DATA_WS_INDEX), updates)
+
+    save = lambda row: store.save_data_row(store.SHEET_ID, row, KEY, store.DATA_WS_INDEX)
+    assert save({KEY: "2", "Homosistein": "31.5", "DM": True}) == "updated"
+    assert save({KEY: "6", "Cinsiyet": "Kadın", "DM": False, "Homosistein": "12", "LVMi": "88", "GLS": "-19"}) == "added"
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["3"]) == 1
+
+    df = store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)
+    assert store.get_read_cache().patches == 3
+    patched = cached_stats(df, updates)
+    assert updates == [(2, 2)]  # üç yamanın satırları birikti; kohort yeniden taranmadı
+
+    values = sheet._worksheets[store.DATA_WS_INDEX].get_all_values()
+    fresh = build_frame(values[0], values[1:])
+    assert fresh[KEY].tolist() == ["1", "2", "4", "5", "6"]
+    assert_same_stats(patched, CohortStats(fresh))
@@ -0,0 +1,56 @@
+"""Türetilmiş ölçümler: tekil/vektörel hesap, eksik girdi ve eskimiş hücre tespiti."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import derived_metrics as m
+
+def test_scalar_values_match_formulas():
+    out = m.compute_derived({"Boy": 170, "Kilo": 70, "LVEDD": 50, "IVS": 10, "PW": 9, "Mitral E": 80, "Mitral A": 60})
+    assert out["BMI"] == pytest.approx(70 / 1.7 ** 2)
+    assert out["BSA"] == pytest.approx((170 * 70 / 3600) ** 0.5)
+    assert out["LV Mass"] == pytest.approx(0.8 * 1.04 * (6.9 ** 3 - 5.0 ** 3) + 0.6)
+    assert out["LVMi"] == pytest.approx(out["LV Mass"] / out["BSA"])
+    assert out["RWT"] == pytest.approx(2 * 9 / 50)
+    assert out["Mitral E/A"] == pytest.approx(80 / 60)
+
+def test_missing_inputs_give_zero_by_default_and_nan_when_blank():
+    values = {"Boy": 170, "Kilo": 0, "TAPSE": "", "sPAP": 40}
+    zero = m.compute_derived(values)
+    blank = m.compute_derived(values, blank=True)
+    assert zero["BMI"] == 0.0 and zero["TAPSE/sPAP"] == 0.0
+    assert np.isnan(blank["BMI"]) and np.isnan(blank["TAPSE/sPAP"]) and np.isnan(blank["LVMi"])
+    assert isinstance(blank["BMI"], float)
+
+def test_vector_and_scalar_agree():
+    df = pd.DataFrame({"Boy": ["170", "", "160"], "Kilo": ["70", "60", "0"]})
+    out = m.compute_derived(df, blank=True)
+    assert out["BMI"][0] == pytest.approx(m.compute_derived({"Boy": 170, "Kilo": 70})["BMI"])
+    assert np.isnan(out["BMI"][1:]).all()
+
+def test_inputs_present_treats_zero_blank_and_absent_as_missing():
+    df = pd.DataFrame({"Boy": ["170", "0", "", "170"], "Kilo": ["70", "70", "70", "abc"]})
+    assert m.inputs_present(df, "BMI").tolist() == [True, False, False, False]
+    assert m.inputs_present(df, "LACi").tolist() == [False] * 4
+    assert m.inputs_present({"Boy": 170, "Kilo": 70}, "BSA").tolist() == [True]
+
+def test_stale_cells_finds_wrong_and_missing_values_only():
+    df = pd.DataFrame({
+        "Boy": ["170", "170", "170", "", ""],
+        "Kilo": ["70", "70", "70", "70", "70"],
+        "BMI": ["24.2215", "30", "", "0.0", "22"],
+    })
+    stale = m.stale_cells(df)
+    pos, vals = stale["BMI"]
+    assert pos.tolist() == [1, 2, 3]
+    assert vals[:2] == pytest.approx([70 / 1.7 ** 2] * 2)
+    assert np.isnan(vals[2])  # girdisi eksik: eski formun 0.0'ı boşaltılır
+    # 4. satır: girdi eksik ama elle girilmiş değer var; dokunulmaz
+    assert stale["BSA"][0].tolist() == [0, 1, 2]
+
+def test_stale_cells_on_current_sheet_is_empty():
+    df = pd.DataFrame({"Boy": ["170", ""], "Kilo": ["70", ""]})
+    fresh = m.compute_derived(df, blank=True)
+    for col, vals in fresh.items():  # girdi sütunu olmayan ölçümler tekil döner
+        df[col] = ["" if np.isnan(v) else repr(float(v)) for v in np.broadcast_to(vals, (len(df),))]
+    assert m.stale_cells(df) == {}
@@ -0,0 +1,37 @@
+"""Dışa aktarım tablosu: kimlik sütunları ve dosya numarası kodlaması."""
+import pandas as pd
+
+import export
+
+def frame():
+    return pd.DataFrame({
+        "Dosya Numarası": ["100", "200", ""],
+        "Adı Soyadı": ["A B", "C D", "E F"],
+        "İletişim": ["555", "", ""],
+        "Hgb": [12.0, 13.0, None],
+    })
+
+def test_strip_phi_drops_names_and_codes_record_numbers():
+    out = export.prepare(frame(), strip_phi=True, salt="s1")
+    assert list(out.columns) == ["Dosya Numarası", "Hgb"]
+    codes = out["Dosya Numarası"].tolist()
+    assert "100" not in codes and "200" not in codes
+    assert len(codes[0]) == 16 and codes[0] != codes[1]
+    assert codes[2] == ""
+
+def test_record_codes_are_stable_per_salt():
+    a = export.prepare(frame(), strip_phi=True, salt="s1")["Dosya Numarası"]
+    b = export.prepare(frame().iloc[::-1], strip_phi=True, salt="s1")["Dosya Numarası"]
+    c = export.prepare(frame(), strip_phi=True, salt="s2")["Dosya Numarası"]
+    assert a[0] == b[0]
+    assert a[0] != c[0]
+
+def test_case_sheet_record_column_is_coded():
+    df = pd.DataFrame({"Dosya No": ["D-1"], "Hasta": ["X Y"], "Not": ["n"]})
+    out = export.prepare(df, strip_phi=True, salt="s")
+    assert list(out.columns) == ["Dosya No", "Not"]
+    assert out["Dosya No"][0] != "D-1"
+
+def test_without_strip_phi_nothing_changes():
+    out = export.prepare(frame(), strip_phi=False)
+    pd.testing.assert_frame_equal(out, frame())
@@ -0,0 +1,54 @@
+"""Akla yatkınlık kuralları: aralıklar, alanlar arası kurallar ve 0 = eksik."""
+import pandas as pd
+
+import plausibility as pl
+from schema import build_frame
+
+def frame(*rows):
+    """rows: {sütun: metin} sözlükleri; anahtar sırayla 1, 2, ..."""
+    cols = ["Dosya Numarası"] + list(dict.fromkeys(c for r in rows for c in r))
+    return build_frame(cols, [[str(i)] + [r.get(c, "") for c in cols[1:]] for i, r in enumerate(rows, start=1)])
+
+def rules(df):
+    return pl.check_frame(df)[["Dosya Numarası", "Kural"]].values.tolist()
+
+def test_range_violations_are_reported_per_cell():
+    df = frame({"Yaş": "120080", "Hgb": "13"}, {"Yaş": "54", "Hgb": "30"})
+    assert rules(df) == [["1", "Yaş"], ["2", "Hgb"]]
+    assert pl.check_frame(df)["Mesaj"][0] == "Yaş = 120080 (beklenen 18–100)"
+
+def test_zero_and_blank_are_missing_not_violations():
+    df = frame({"Yaş": "0", "Hgb": "", "LVESD": "0", "LVEDD": "45"})
+    assert rules(df) == []
+    assert pl.zero_counts(df).tolist() == [2]
+
+def test_strain_accepts_negative_entry():
+    assert rules(frame({"GLS": "-19"}, {"GLS": "19"}, {"GLS": "-45"})) == [["3", "GLS"]]
+
+def test_cross_rules_need_all_fields_present():
+    df = frame(
+        {"LVESD": "50", "LVEDD": "45"},          # ihlal
+        {"LVESD": "30", "LVEDD": "45"},          # uygun
+        {"LVESD": "50", "LVEDD": "0"},           # LVEDD eksik: kontrol edilmez
+        {"Hct": "40", "Hgb": "8"},               # Hct / Hgb = 5
+        {"TA Sistol": "120", "TA Diyastol": "130"},
+    )
+    assert rules(df) == [["1", "LVESD < LVEDD"], ["4", "Hct ≈ 3 × Hgb"], ["5", "TA Diyastol < TA Sistol"]]
+
+def test_flag_report_groups_by_patient():
+    df = frame({"Yaş": "150", "Hgb": "40", "Kilo": "0"}, {"Yaş": "60"})
+    report = pl.flag_report(df)
+    assert report["Dosya Numarası"].tolist() == ["1"]
+    assert report["Uyarı"].tolist() == [2]
+    assert report["0 kayıtlı alan"].tolist() == [1]
+
+def test_blank_zeros_only_touches_numeric_zeros():
+    out = pl.blank_zeros({"Hgb": 0.0, "Yaş": 0, "DM": False, "Kilo": 70.0, "Notlar": 0, "Boy": "0"})
+    assert out == {"Hgb": "", "Yaş": "", "DM": False, "Kilo": 70.0, "Notlar": 0, "Boy": "0"}
+
+def test_check_record_uses_same_rules():
+    assert pl.check_record({"Hgb": 0.0, "Yaş": 54}) == []
+    assert pl.check_record({"LVESD": 50.0, "LVEDD": 45.0}) == ["LVESD < LVEDD sağlanmıyor (LVESD=50, LVEDD=45)"]
+
+def test_empty_frame_has_no_violations():
+    assert pl.check_frame(pd.DataFrame({"Dosya Numarası": []})).empty
@@ -0,0 +1,46 @@
+"""Türetilmiş sütunların toplu yeniden hesaplanması: doğru satıra yazma ve sürüm damgası."""
+import logging
+
+import pytest
+
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet
+
+KEY = "Dosya Numarası"
+
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [[KEY, "Boy", "Kilo", "BMI"], ["1", "170", "70", ""], ["2", "", "", "0.0"]]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    yield sh
+    store.use_client(None)
+
+def rows_by_key(sh):
+    rows = sh._worksheets[store.DATA_WS_INDEX]._snapshot()
+    return {r[0]: dict(zip(rows[0], r)) for r in rows[1:]}
+
+def test_recompute_writes_values_and_stamps_touched_rows(sheet):
+    assert store.recompute_derived_columns(store.SHEET_ID) >= 2
+    rows = rows_by_key(sheet)
+    assert float(rows["1"]["BMI"]) == pytest.approx(70 / 1.7 ** 2)
+    assert rows["2"]["BMI"] == ""  # girdisi eksik: 0.0 boşaltılır
+    assert rows["1"][store.ROW_VERSION_COL] and rows["2"][store.ROW_VERSION_COL]
+    assert store.recompute_derived_columns(store.SHEET_ID) == 0
+
+def test_recompute_follows_rows_moved_by_someone_else(sheet):
+    store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)  # önbellek ve indeks eski düzende
+    sheet._worksheets[store.DATA_WS_INDEX]._rows.insert(1, ["9", "150", "60", "26.6666"])
+    store.recompute_derived_columns(store.SHEET_ID)
+    rows = rows_by_key(sheet)
+    assert float(rows["1"]["BMI"]) == pytest.approx(70 / 1.7 ** 2)
+    assert rows["9"]["BMI"] == "26.6666"  # güncel değere dokunulmaz
+    assert float(rows["9"]["BSA"]) == pytest.approx((150 * 60 / 3600) ** 0.5)
+    assert float(rows["1"]["BSA"]) == pytest.approx((170 * 70 / 3600) ** 0.5)
@@ -0,0 +1,119 @@
+"""Tiplenmiş yükleyici: dtype eşlemesi, ondalık virgül, mantıksal değerler, taşan tamsayılar."""
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import schema
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet
+
+# ===================== parse_column =====================
+def test_float_column_parses_comma_decimals_blanks_and_text():
+    s = schema.parse_column(["12.5", "13,2", "", "  7 ", "yok"], schema.FLOAT)
+    assert s.dtype == "float32"
+    assert s[:2].tolist() == pytest.approx([12.5, 13.2])
+    assert np.isnan(s[2]) and np.isnan(s[4])
+    assert s[3] == 7
+
+def test_int_column_rounds_and_keeps_blanks_as_na():
+    s = schema.parse_column(["54", "54,6", "", "-3", "x"], schema.INT)
+    assert str(s.dtype) == "Int32"
+    assert s[:2].tolist() == [54, 55]
+    assert s[3] == -3
+    assert s.isna().tolist() == [False, False, True, False, True]
+
+def test_int_column_typo_fits_and_overflow_becomes_na():
+    s = schema.parse_column(["120080", str(schema.INT_LIMIT), "99999999999", "-99999999999"], schema.INT)
+    assert s[0] == 120080  # yazım hatası tabloyu düşürmez, plausibility yakalar
+    assert s[1] == schema.INT_LIMIT
+    assert s[2:].isna().all()
+
+@pytest.mark.parametrize("text,value", [
+    ("True", True), ("false", False), ("1", True), ("0", False),
+    ("Evet", True), ("hayır", False), ("hayir", False), ("var", True), ("YOK", False),
+])
+def test_bool_column_accepts_turkish_and_english(text, value):
+    s = schema.parse_column([text], schema.BOOL)
+    assert str(s.dtype) == "boolean"
+    assert s[0] == value
+
+def test_bool_column_unknown_and_blank_are_na():
+    s = schema.parse_column(["belki", ""], schema.BOOL)
+    assert s.isna().all()
+
+def test_parse_column_keeps_series_index():
+    s = schema.parse_column(pd.Series(["1", "2"], index=[10, 20]), schema.FLOAT)
+    assert s.index.tolist() == [10, 20]
+
+# ===================== build_frame / apply_schema =====================
+def test_build_frame_maps_schema_dtypes_and_leaves_others_as_text():
+    headers = ["Dosya Numarası", "Hgb", "Yaş", "DM", "Cinsiyet", "Not"]
+    rows = [["1", "12,1", "54", "evet", "E", "a"], ["2", "", "", "", "K", ""]]
+    df = schema.build_frame(headers, rows)
+    assert list(df.columns) == headers
+    assert {c: str(df[c].dtype) for c in headers[1:5]} == {
+        "Hgb": "float32", "Yaş": "Int32", "DM": "boolean", "Cinsiyet": "category",
+    }
+    assert df["Dosya Numarası"].tolist() == ["1", "2"]
+    assert df["Not"].tolist() == ["a", ""]
+
+def test_build_frame_without_rows():
+    df = schema.build_frame(["Dosya Numarası", "Hgb"], [])
+    assert df.empty and str(df["Hgb"].dtype) == "float32"
+
+def test_apply_schema_matches_build_frame():
+    headers, rows = ["Hgb", "Yaş", "Not"], [["12,5", "60", "x"], ["", "61", "y"]]
+    typed = schema.apply_schema(pd.DataFrame(rows, columns=headers))
+    pd.testing.assert_frame_equal(typed, schema.build_frame(headers, rows))
+
+# ===================== normalize_cells / same_cell =====================
+def test_normalize_cells_formats_and_flags_invalid():
+    out, bad = schema.normalize_cells(["12,5", "", "abc"], schema.FLOAT)
+    assert out == ["12.5", "", ""]
+    assert bad.tolist() == [False, False, True]
+    out, bad = schema.normalize_cells(["evet", "belki"], schema.BOOL)
+    assert out == ["True", ""] and bad.tolist() == [False, True]
+
+def test_same_cell_compares_numbers_and_blank_as_zero():
+    assert schema.same_cell("13.20", "13,2")
+    assert schema.same_cell("", "0")
+    assert not schema.same_cell("13.2", "13.3")
+    assert not schema.same_cell("abc", "abd")
+
+# ===================== load_data =====================
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [["Dosya Numarası", "Yaş", "Hgb"], ["1", "120080", "12,5"], ["2", "99999999999", ""]]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    yield sh
+    store.use_client(None)
+
+def test_load_data_keeps_table_with_out_of_range_integer(sheet):
+    df = store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)
+    assert len(df) == 2
+    assert df["Yaş"][0] == 120080 and pd.isna(df["Yaş"][1])
+    assert df["Hgb"][0] == pytest.approx(12.5)
+    assert store.get_read_cache().load_errors == {}
+
+def test_load_data_records_parse_errors(sheet, monkeypatch):
+    def broken(headers, rows):
+        raise ValueError("bozuk hücre")
+
+    monkeypatch.setattr(store, "build_frame", broken)
+    assert store.load_data(store.SHEET_ID, store.DATA_WS_INDEX).empty
+    key = (store.SHEET_ID, store.DATA_WS_INDEX)
+    assert store.get_read_cache().load_errors[key] == "ValueError: bozuk hücre"
+
+    monkeypatch.undo()
+    assert len(store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)) == 2
+    assert key not in store.get_read_cache().load_errors
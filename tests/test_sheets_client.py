@@ -0,0 +1,198 @@
+"""SheetsClient: yeniden deneme, geri çekilme, okuma birleştirme ve idempotent olmayan yazmalar."""
+import threading
+import time
+
+import pytest
+
+from fake_gspread import FakeAPIError
+from sheets_client import SheetsClient, SheetsError
+
+def make_client(**kwargs):
+    """Uyumayan istemci: geri çekilme süreleri client.sleeps listesine yazılır."""
+    sleeps = []
+    client = SheetsClient(read_per_min=6000, write_per_min=6000, sleep=sleeps.append, **kwargs)
+    client.sleeps = sleeps
+    return client
+
+class Failing:
+    """İlk n çağrıda status hatası verir, sonra result döndürür."""
+
+    def __init__(self, status, n, result="ok"):
+        self.status = status
+        self.n = n
+        self.result = result
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.n:
+            raise FakeAPIError(self.status)
+        return self.result
+
+# ===================== YENİDEN DENEME =====================
+@pytest.mark.parametrize("status", [400, 403, 404])
+def test_client_errors_are_not_retried(status):
+    client = make_client()
+    fn = Failing(status, n=1)
+    with pytest.raises(SheetsError) as info:
+        client.call("values_get", fn)
+    assert fn.calls == 1
+    assert client.sleeps == []
+    assert info.value.status == status
+    assert info.value.attempts == 1
+    assert client.last_error()["status"] == status
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_retryable_errors_succeed_after_backoff(status):
+    client = make_client(max_retries=5)
+    fn = Failing(status, n=2)
+    assert client.call("values_get", fn) == "ok"
+    assert fn.calls == 3
+    assert len(client.sleeps) == 2
+    assert client.counters["retries"] == 2
+
+def test_retries_stop_at_limit_with_capped_backoff():
+    client = make_client(max_retries=4, base_delay=1.0, max_delay=3.0)
+    fn = Failing(503, n=100)
+    with pytest.raises(SheetsError) as info:
+        client.call("values_get", fn)
+    assert fn.calls == 5
+    assert info.value.status == 503
+    assert info.value.attempts == 5
+    assert len(client.sleeps) == 4
+    for n, delay in enumerate(client.sleeps):
+        assert 0 <= delay <= min(3.0, 1.0 * 2 ** n)
+
+def test_quota_error_flags_is_quota():
+    client = make_client(max_retries=0)
+    with pytest.raises(SheetsError) as info:
+        client.call("values_get", Failing(429, n=1))
+    assert info.value.is_quota
+    assert "kota" in str(info.value)
+
+def test_connection_error_has_no_status():
+    client = make_client(max_retries=1)
+
+    def fn():
+        raise ConnectionError("reset")
+
+    with pytest.raises(SheetsError) as info:
+        client.call("values_get", fn)
+    assert info.value.status is None
+    assert info.value.attempts == 2
+
+# ===================== OKUMA BİRLEŞTİRME =====================
+def test_concurrent_identical_reads_share_one_call():
+    client = make_client()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"values": [["a"]]}
+
+    results = []
+
+    def reader():
+        results.append(client.call("values_get", fn, key=("values", "sheet", 0)))
+
+    threads = [threading.Thread(target=reader) for _ in range(5)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    deadline = time.monotonic() + 5
+    while client.counters["coalesced"] < 4 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(calls) == 1
+    assert client.counters["coalesced"] == 4
+    assert len(results) == 5
+    assert all(r is results[0] for r in results)
+
+def test_coalesced_readers_share_the_error():
+    client = make_client(max_retries=0)
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise FakeAPIError(403)
+
+    errors = []
+
+    def reader():
+        try:
+            client.call("values_get", fn, key="same")
+        except SheetsError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    threads[0].start()
+    assert started.wait(5)
+    for t in threads[1:]:
+        t.start()
+    deadline = time.monotonic() + 5
+    while client.counters["coalesced"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(errors) == 3
+    assert {e.status for e in errors} == {403}
+
+# ===================== İDEMPOTENT OLMAYAN YAZMALAR =====================
+def test_non_idempotent_write_without_verify_is_not_repeated():
+    client = make_client()
+    fn = Failing(503, n=1)
+    with pytest.raises(SheetsError) as info:
+        client.call("append_row", fn, kind="write", idempotent=False)
+    assert fn.calls == 1
+    assert info.value.status == 503
+
+def test_non_idempotent_write_applied_is_not_repeated():
+    client = make_client()
+    fn = Failing(503, n=1)
+    assert client.call("append_row", fn, kind="write", idempotent=False, verify=lambda: True) is None
+    assert fn.calls == 1
+    assert client.sleeps == []
+
+def test_non_idempotent_write_not_applied_is_retried():
+    client = make_client()
+    fn = Failing(503, n=1)
+    assert client.call("append_row", fn, kind="write", idempotent=False, verify=lambda: False) == "ok"
+    assert fn.calls == 2
+
+def test_non_idempotent_write_unknown_state_raises():
+    client = make_client()
+    fn = Failing(503, n=1)
+
+    def verify():
+        raise FakeAPIError(500)
+
+    with pytest.raises(SheetsError):
+        client.call("delete_rows", fn, kind="write", idempotent=False, verify=verify)
+    assert fn.calls == 1
+
+def test_non_idempotent_write_is_retried_on_quota():
+    client = make_client()
+    fn = Failing(429, n=2)
+    assert client.call("append_row", fn, kind="write", idempotent=False) == "ok"
+    assert fn.calls == 3
+
+# ===================== KOTA =====================
+def test_drive_calls_use_their_own_bucket():
+    sleeps = []
+    client = SheetsClient(read_per_min=2, write_per_min=2, drive_per_min=2, sleep=sleeps.append)
+    for _ in range(2):
+        client.call("get_lastUpdateTime", lambda: "t", kind="drive")
+    assert client.buckets["read"].tokens == 2
+    client.call("values_get", lambda: "ok")
+    client.call("values_get", lambda: "ok")
+    assert sleeps == []  # Drive yoklaması Sheets okuma kotasını tüketmedi
@@ -0,0 +1,126 @@
+"""Sunucuda uygulandıktan sonra hata dönen satır ekleme / silme yazmaları tekrarlanmaz."""
+import logging
+
+import pytest
+
+import sheets_store as store
+from fake_gspread import FakeAPIError, FakeClient, FakeSpreadsheet, FaultInjector
+
+KEY = "Dosya Numarası"
+
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [[KEY, "Adı Soyadı", "Hgb"]] + [[str(k), f"Hasta {k}", "12"] for k in (1, 2, 3, 4)]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    store.get_sheets_client()._sleep = lambda _: None
+    yield sh
+    store.use_client(None)
+
+def data_ws():
+    return store.get_worksheet(store.SHEET_ID, store.DATA_WS_INDEX)
+
+def keys(sh):
+    return [r[0] for r in sh._worksheets[store.DATA_WS_INDEX]._rows[1:]]
+
+def lose_write_responses(sh):
+    """Her yazma uygulanır ama yanıtı 503 olarak kaybolur."""
+    sh.faults = FaultInjector(after_rate=1.0, statuses=(503,))
+
+def save(key):
+    return store.save_data_row(store.SHEET_ID, {KEY: key, "Adı Soyadı": f"Hasta {key}"}, KEY, store.DATA_WS_INDEX)
+
+def test_single_delete_applied_then_failed_is_not_repeated(sheet):
+    lose_write_responses(sheet)
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["2"]) == 1
+    assert keys(sheet) == ["1", "3", "4"]
+    assert sheet.calls["delete_rows"] == 1
+
+def test_batch_delete_applied_then_failed_is_not_repeated(sheet):
+    lose_write_responses(sheet)
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["1", "3"]) == 2
+    assert keys(sheet) == ["2", "4"]
+    assert sheet.calls["batch_update"] == 1
+
+def test_append_applied_then_failed_is_not_duplicated(sheet):
+    lose_write_responses(sheet)
+    assert save("5") == "added"
+    assert keys(sheet) == ["1", "2", "3", "4", "5"]
+    assert sheet.calls["append_row"] == 1
+
+def test_append_lost_before_apply_is_retried(sheet):
+    ws = data_ws()
+    append_row = ws.append_row
+    attempts = []
+
+    def flaky_append(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise FakeAPIError(503, "lost before apply")
+        return append_row(*args, **kwargs)
+
+    ws.append_row = flaky_append
+    assert save("6") == "added"
+    assert len(attempts) == 2
+    assert keys(sheet) == ["1", "2", "3", "4", "6"]
+
+def test_failed_write_raises_sheets_error_with_status(sheet):
+    def forbidden(*args, **kwargs):
+        raise FakeAPIError(403, "forbidden")
+
+    data_ws().delete_rows = forbidden
+    with pytest.raises(store.SheetsError) as info:
+        store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["2"])
+    assert info.value.status == 403
+    assert info.value.op == "delete_rows"
+    assert keys(sheet) == ["1", "2", "3", "4"]
+
+def test_delete_reindexes_when_rows_shifted(sheet):
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["yok"]) == 0  # indeks okunur
+    sheet._worksheets[store.DATA_WS_INDEX]._rows.insert(1, ["9", "Hasta 9", "11"])  # başka biri satır ekledi
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["3"]) == 1
+    assert keys(sheet) == ["9", "1", "2", "4"]
+
+def test_delete_aborts_when_rows_keep_moving(sheet, monkeypatch):
+    monkeypatch.setattr(store, "_key_cells", lambda ws, col_num, rows: ["?"] * len(rows))
+    with pytest.raises(store.ConflictError):
+        store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["2", "3"])
+    assert keys(sheet) == ["1", "2", "3", "4"]
+    assert "batch_update" not in sheet.calls
+
+# ===================== API ÇAĞRI SAYISI =====================
+def api_calls(sh, fn):
+    before = dict(sh.calls)
+    fn()
+    return {op: n - before.get(op, 0) for op, n in sh.calls.items() if n != before.get(op, 0)}
+
+def test_consecutive_saves_do_not_reread_the_sheet(sheet):
+    store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)  # ayna ve indeks kurulur
+    assert api_calls(sheet, lambda: save("7")) == {"append_row": 1}
+    assert api_calls(sheet, lambda: save("8")) == {"append_row": 1}
+    update = lambda: store.save_data_row(store.SHEET_ID, {KEY: "7", "Hgb": "9"}, KEY, store.DATA_WS_INDEX)
+    assert api_calls(sheet, update) == {"row_values": 1, "batch_update": 1}
+
+def test_save_after_delete_does_not_reread_the_sheet(sheet):
+    store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)
+    assert api_calls(sheet, lambda: store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["2"])) == {
+        "batch_get": 1, "delete_rows": 1,
+    }
+    assert api_calls(sheet, lambda: save("9")) == {"append_row": 1}
+    assert keys(sheet) == ["1", "3", "4", "9"]
+
+def test_delete_by_other_column_updates_the_mirror(sheet):
+    store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)
+    assert store._delete_rows(store.SHEET_ID, store.DATA_WS_INDEX, "Adı Soyadı", ["Hasta 3"]) == 1
+    assert keys(sheet) == ["1", "2", "4"]
+    mirror = store.get_mirror()
+    assert mirror.get_row(store.SHEET_ID, store.DATA_WS_INDEX, "3") is None
+    assert mirror.get_row(store.SHEET_ID, store.DATA_WS_INDEX, "4")["Adı Soyadı"] == "Hasta 4"
+    assert "3" not in store.load_keys(store.SHEET_ID, store.DATA_WS_INDEX)
@@ -0,0 +1,96 @@
+"""Sayfa -> yerel ayna senkronu: yalnızca eklenen / değişen / silinen satırlar uygulanır."""
+import logging
+
+import pytest
+
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet
+from local_mirror import LocalMirror
+
+KEY = "Dosya Numarası"
+HEADERS = [KEY, "Adı Soyadı", "Hgb"]
+
+def values(*rows):
+    return [list(HEADERS)] + [list(r) for r in rows]
+
+# ===================== LocalMirror.apply_values =====================
+def test_first_sync_adds_all_rows():
+    mirror = LocalMirror()
+    changes = mirror.apply_values("s", 0, values(["1", "A", "12"], ["2", "B", "13"]), KEY)
+    assert changes == {"added": 2, "updated": 0, "removed": 0}
+    assert mirror.has_synced("s", 0)
+    assert mirror.get_row("s", 0, "2")["Hgb"] == "13"
+
+def test_resync_applies_only_the_diff():
+    mirror = LocalMirror()
+    mirror.apply_values("s", 0, values(["1", "A", "12"], ["2", "B", "13"], ["3", "C", "14"]), KEY)
+    changes = mirror.apply_values("s", 0, values(["1", "A", "12"], ["3", "C", "9.5"], ["4", "D", "11"]), KEY)
+    assert changes == {"added": 1, "updated": 1, "removed": 1}
+    assert mirror.get_row("s", 0, "2") is None
+    assert mirror.get_row("s", 0, "3")["Hgb"] == "9.5"
+    assert mirror.read_values("s", 0) == values(["1", "A", "12"], ["3", "C", "9.5"], ["4", "D", "11"])
+
+def test_unchanged_resync_reports_no_changes():
+    mirror = LocalMirror()
+    rows = values(["1", "A", "12"], ["2", "B", "13"])
+    mirror.apply_values("s", 0, rows, KEY)
+    assert mirror.apply_values("s", 0, rows, KEY) == {"added": 0, "updated": 0, "removed": 0}
+
+def test_moved_row_is_not_counted_as_update():
+    mirror = LocalMirror()
+    mirror.apply_values("s", 0, values(["1", "A", "12"], ["2", "B", "13"]), KEY)
+    changes = mirror.apply_values("s", 0, values(["2", "B", "13"], ["1", "A", "12"]), KEY)
+    assert changes == {"added": 0, "updated": 0, "removed": 0}
+    assert mirror.read_values("s", 0) == values(["2", "B", "13"], ["1", "A", "12"])
+
+# ===================== sync_from_sheets =====================
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", values(["1", "A", "12"], ["2", "B", "13"])),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    yield sh
+    store.use_client(None)
+
+def test_sync_from_sheets_applies_remote_changes(sheet):
+    first = store.sync_from_sheets(store.SHEET_ID, [store.DATA_WS_INDEX])
+    assert first[store.DATA_WS_INDEX] == {"added": 2, "updated": 0, "removed": 0}
+
+    rows = sheet._worksheets[store.DATA_WS_INDEX]._rows
+    rows[1][2] = "7.7"                # 1 güncellendi
+    del rows[2]                       # 2 silindi
+    rows.append(["3", "C", "10"])     # 3 eklendi
+    reads = sheet.calls["values_batch_get"]
+
+    second = store.sync_from_sheets(store.SHEET_ID, [store.DATA_WS_INDEX])
+    assert second[store.DATA_WS_INDEX] == {"added": 1, "updated": 1, "removed": 1}
+    assert sheet.calls["values_batch_get"] == reads + 1
+    mirror = store.get_mirror()
+    assert mirror.get_row(store.SHEET_ID, store.DATA_WS_INDEX, "1")["Hgb"] == "7.7"
+    assert mirror.get_row(store.SHEET_ID, store.DATA_WS_INDEX, "2") is None
+    assert store.get_sheet_index(store.SHEET_ID, store.DATA_WS_INDEX).rows.get("3") == 3
+
+def test_change_check_uses_drive_quota(sheet):
+    client = store.get_sheets_client()
+    store.get_spreadsheet(store.SHEET_ID)  # tutamacı açmak bir Sheets okumasıdır
+    before = client.buckets["read"].tokens
+    assert store.remote_change_token(store.SHEET_ID) is not None
+    assert sheet.calls["get_lastUpdateTime"] == 1
+    assert client.buckets["drive"].tokens < client.buckets["drive"].capacity
+    assert client.buckets["read"].tokens >= before
+
+def test_use_client_stops_mirror_sync_thread(sheet, monkeypatch):
+    monkeypatch.setattr(store, "CHANGE_CHECK_INTERVAL", 0.01)
+    thread = store.start_mirror_sync()
+    assert thread.is_alive()
+    store.use_client(FakeClient([sheet]))
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert not store.get_mirror_sync_stop().is_set()  # yeni arka ucun iş parçacığı için yeni işaret
@@ -0,0 +1,162 @@
+"""Yazma günlüğü ve JournalFlusher: sıra, geri çekilme, yeniden kuyruklama, çakışma, yeniden başlatma."""
+import logging
+import time
+
+import pytest
+
+import sheets_store as store
+from fake_gspread import FakeClient, FakeSpreadsheet, FaultInjector
+from write_journal import CONFLICT, DONE, FAILED, PENDING, WriteJournal
+
+KEY = "Dosya Numarası"
+VERSION = "2026-01-05T10:00:00.000"
+
+# ===================== WriteJournal =====================
+def test_head_is_oldest_pending_entry():
+    j = WriteJournal()
+    a = j.append("save", "s", 0, KEY, ["1"], {"data": {KEY: "1"}})
+    b = j.append("delete", "s", 0, KEY, ["2"])
+    assert j.head()["id"] == a
+    j.mark_done(a, "added")
+    assert j.head()["id"] == b
+    j.mark_failed(b, "yetki yok")
+    assert j.head() is None
+    assert j.counts() == {PENDING: 0, DONE: 1, CONFLICT: 0, FAILED: 1}
+    assert [e["id"] for e in j.unresolved()] == [b]
+
+def test_retry_keeps_entry_pending_until_due():
+    j = WriteJournal()
+    a = j.append("save", "s", 0, KEY, ["1"])
+    j.start_attempt(a)
+    j.mark_retry(a, "503", delay=60)
+    e = j.get(a)
+    assert e["status"] == PENDING and e["attempts"] == 1 and e["error"] == "503"
+    assert e["next_at"] == pytest.approx(time.time() + 60, abs=1)
+
+def test_requeue_only_conflicted_or_failed_entries():
+    j = WriteJournal()
+    a = j.append("save", "s", 0, KEY, ["1"], {"data": {KEY: "1"}, "base_version": "eski"})
+    j.requeue(a, {"data": {KEY: "1"}, "base_version": "yeni"})
+    assert j.get(a)["payload"]["base_version"] == "eski"  # bekleyen kayıt değişmez
+    j.start_attempt(a)
+    j.mark_failed(a, "çakışma", status=CONFLICT)
+    j.requeue(a, {"data": {KEY: "1"}, "base_version": "yeni"})
+    e = j.get(a)
+    assert e["status"] == PENDING and e["error"] == "" and e["attempts"] == 1
+    assert e["payload"]["base_version"] == "yeni"
+
+def test_pending_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    j = WriteJournal(path)
+    a = j.append("save", "s", 0, KEY, ["1"], {"data": {KEY: "1", "Hgb": "12"}})
+    j.start_attempt(a)  # deneme sırasında süreç kapandı
+    j._conn.close()
+    e = WriteJournal(path).head()
+    assert (e["id"], e["status"], e["attempts"]) == (a, PENDING, 1)
+    assert e["payload"]["data"] == {KEY: "1", "Hgb": "12"}
+
+# ===================== JournalFlusher =====================
+@pytest.fixture
+def sheet():
+    logging.getLogger("neu_kardiyo").setLevel(logging.CRITICAL)
+    sh = FakeSpreadsheet(
+        store.SHEET_ID,
+        [
+            ("Veri Girişi", [
+                [KEY, "Adı Soyadı", "Hgb", store.ROW_VERSION_COL],
+                ["1", "Hasta 1", "12", VERSION],
+                ["2", "Hasta 2", "13", VERSION],
+            ]),
+            ("Case Report", [["TarihSaat", "Not"]]),
+            ("Editöre Mektup", [["TarihSaat", "Dergi Adı"]]),
+        ],
+    )
+    store.use_client(FakeClient([sh]))
+    store.get_sheets_client()._sleep = lambda _: None
+    store.load_data(store.SHEET_ID, store.DATA_WS_INDEX)
+    yield sh
+    store.use_client(None)
+
+def rows(sh):
+    return {r[0]: r for r in sh._worksheets[store.DATA_WS_INDEX]._rows[1:]}
+
+def save(journal, data, base_version=None):
+    return journal.append("save", store.SHEET_ID, store.DATA_WS_INDEX, KEY, [data[KEY]],
+                          {"data": data, "base_version": base_version})
+
+def make_due(journal):
+    """Geri çekilme süresini beklemeden sıradaki denemeyi vaktine getirir."""
+    with journal._conn:
+        journal._conn.execute("UPDATE journal SET next_at=0 WHERE status=?", (PENDING,))
+
+def test_flush_applies_entries_in_order(sheet):
+    j = WriteJournal()
+    a = save(j, {KEY: "3", "Adı Soyadı": "Hasta 3"})
+    b = j.append("delete", store.SHEET_ID, store.DATA_WS_INDEX, KEY, ["3"])
+    c = save(j, {KEY: "3", "Adı Soyadı": "Hasta 3b"})
+    flusher = store.JournalFlusher(j, start=False)
+    assert flusher.flush() == store.JOURNAL_IDLE_WAIT
+    assert [(j.get(i)["status"], j.get(i)["result"]) for i in (a, b, c)] == [(DONE, "added"), (DONE, 1), (DONE, "added")]
+    assert rows(sheet)["3"][1] == "Hasta 3b"
+    assert list(rows(sheet)) == ["1", "2", "3"]
+    assert flusher.applied == 3
+
+def test_transient_failure_backs_off_and_blocks_later_entries(sheet):
+    j = WriteJournal()
+    a = save(j, {KEY: "1", "Hgb": "14"})
+    b = save(j, {KEY: "1", "Hgb": "15"})
+    flusher = store.JournalFlusher(j, start=False)
+    sheet.faults = FaultInjector(fail_rate=1.0, statuses=(503,))
+
+    wait = flusher.flush()
+    assert wait == pytest.approx(store.JOURNAL_RETRY_BASE, abs=0.5)
+    assert (j.get(a)["status"], j.get(a)["attempts"]) == (PENDING, 1)
+    assert j.get(b)["attempts"] == 0  # sıradaki bekler; yazmalar yer değiştirmez
+    assert flusher.flush() > 0 and j.get(a)["attempts"] == 1  # vakti gelmeden denenmez
+
+    make_due(j)
+    assert flusher.flush() == pytest.approx(store.JOURNAL_RETRY_BASE * 2, abs=0.5)  # gecikme ikiye katlanır
+    assert flusher.retries == 2
+
+    sheet.faults = FaultInjector()
+    make_due(j)
+    flusher.flush()
+    assert j.get(a)["status"] == DONE and j.get(b)["status"] == DONE
+    assert rows(sheet)["1"][2] == "15"
+
+def test_permanent_failure_is_not_retried(sheet):
+    j = WriteJournal()
+    a = save(j, {KEY: "1", "Hgb": "14"})
+    sheet.faults = FaultInjector(fail_rate=1.0, statuses=(403,))
+    store.JournalFlusher(j, start=False).flush()
+    assert j.get(a)["status"] == FAILED and "403" in j.get(a)["error"]
+
+def test_stale_version_is_marked_conflict_and_requeue_applies_it(sheet):
+    j = WriteJournal()
+    a = save(j, {KEY: "2", "Hgb": "9"}, base_version="2026-01-01T00:00:00.000")
+    b = save(j, {KEY: "1", "Hgb": "10"})
+    flusher = store.JournalFlusher(j, start=False)
+    flusher.flush()
+    assert j.get(a)["status"] == CONFLICT
+    assert j.get(b)["status"] == DONE  # çakışma kuyruğu tıkamaz
+    assert rows(sheet)["2"][2] == "13"
+
+    j.requeue(a, {"data": {KEY: "2", "Hgb": "9"}, "base_version": VERSION})
+    flusher.flush()
+    assert j.get(a)["status"] == DONE and rows(sheet)["2"][2] == "9"
+
+def test_replay_after_restart_does_not_duplicate_applied_append(sheet, tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    j = WriteJournal(path)
+    a = save(j, {KEY: "4", "Adı Soyadı": "Hasta 4"})
+    b = save(j, {KEY: "5", "Adı Soyadı": "Hasta 5"})
+    # 1. süreç: a sunucuya yazıldı ama done işaretlenmeden kapandı; b hiç denenmedi
+    j.start_attempt(a)
+    store.save_data_row(store.SHEET_ID, {KEY: "4", "Adı Soyadı": "Hasta 4"}, KEY, store.DATA_WS_INDEX)
+    j._conn.close()
+
+    j = WriteJournal(path)
+    store.JournalFlusher(j, start=False).flush()
+    assert (j.get(a)["status"], j.get(a)["result"]) == (DONE, "saved")
+    assert (j.get(b)["status"], j.get(b)["result"]) == (DONE, "added")
+    assert list(rows(sheet)) == ["1", "2", "4", "5"]
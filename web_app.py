@@ -1,167 +1,239 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime
+import json
+import logging
 import time
 import random
-from io import BytesIO
-
-# ===================== AYARLAR =====================
-SHEET_ID = "1_Jd27n2lvYRl-oKmMOVySd5rGvXLrflDCQJeD_Yz6Y4"
-CASE_SHEET_ID = SHEET_ID
-LETTER_SHEET_ID = SHEET_ID
-
-DATA_WS_INDEX = 0       # 1. sayfa: Veri Girişi
-CASE_WS_INDEX = 1       # 2. sayfa: Case Report Takip
-LETTER_WS_INDEX = 2     # 3. sayfa: Editöre Mektup
+import secrets
+import uuid
+import os
+import functools
+
+import bulk_import
+import derived_metrics as metrics
+import export
+import perf
+import plausibility
+from cohort_stats import ALL as STATS_ALL, GROUPS as STATS_GROUPS, CohortStats
+from schema import COLUMN_SCHEMA
+from search_index import SearchIndex
+from sheets_client import SheetsError
+from write_journal import CONFLICT, DONE, PENDING
+from sheets_store import (
+    CASE_SHEET_ID,
+    CASE_WS_INDEX,
+    DATA_WS_INDEX,
+    LETTER_SHEET_ID,
+    LETTER_WS_INDEX,
+    ROW_VERSION_COL,
+    SHEET_ID,
+    bulk_upsert,
+    get_change_bus,
+    get_change_tracker,
+    get_journal,
+    get_journal_flusher,
+    get_prefetcher,
+    get_read_cache,
+    get_sheets_client,
+    load_data,
+    load_headers,
+    load_keys,
+    load_page,
+    load_record,
+    prefetch_worksheets,
+    recompute_derived_columns,
+    start_mirror_sync,
+    submit_delete,
+    submit_save,
+    sync_from_sheets,
+)
 
 st.set_page_config(page_title="NEÜ-KARDİYO", page_icon="❤️", layout="wide")
 
-# ===================== GOOGLE SHEETS BAĞLANTI =====================
-@st.cache_resource
-def connect_to_gsheets():
-    scope = [
-        "https://spreadsheets.google.com/feeds",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = ServiceAccountCredentials.from_json_keyfile_dict(
-        st.secrets["gcp_service_account"], scope
-    )
-    return gspread.authorize(creds)
-
-# ===================== YARDIMCI =====================
-def safe_float(val):
-    try:
-        return float(val)
-    except:
-        return 0.0
-
-def safe_int(val):
-    try:
-        return int(float(val))
-    except:
-        return 0
-
-def colnum_to_letter(n: int) -> str:
-    s = ""
-    while n > 0:
-        n, r = divmod(n - 1, 26)
-        s = chr(65 + r) + s
-    return s
-
-def to_excel_bytes(df: pd.DataFrame, sheet_name="Sheet1") -> bytes:
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name=sheet_name)
-    return output.getvalue()
-
-def mask_text(x: str) -> str:
-    """Dergi/Makale adını maskeler: her kelimenin ilk harfi + ***"""
-    if not x:
-        return ""
-    parts = str(x).split()
-    return " ".join([(w[0] + "***") if len(w) > 0 else "" for w in parts])
-
-# ===================== VERİ ÇEKME =====================
-def load_data(sheet_id, worksheet_index=0, required_col=None):
-    try:
-        client = connect_to_gsheets()
-        ws = client.open_by_key(sheet_id).get_worksheet(worksheet_index)
-        data = ws.get_all_values()
-
-        if not data or len(data) < 1:
-            return pd.DataFrame()
-
-        headers = [str(h).strip() for h in data[0]]
-
-        if required_col and required_col not in headers:
-            return pd.DataFrame()
-
-        rows = data[1:]
-
-        # Duplicate header fix
-        seen = {}
-        unique_headers = []
-        for h in headers:
-            if h in seen:
-                seen[h] += 1
-                unique_headers.append(f"{h}_{seen[h]}")
-            else:
-                seen[h] = 0
-                unique_headers.append(h)
-
-        num_cols = len(unique_headers)
-        fixed_rows = []
-        for row in rows:
-            if len(row) < num_cols:
-                row += [""] * (num_cols - len(row))
-            fixed_rows.append(row)
-
-        df = pd.DataFrame(fixed_rows, columns=unique_headers)
-        return df.astype(str)
-
-    except:
-        return pd.DataFrame()
-
-# ===================== SİLME =====================
-def delete_row_by_value(sheet_id, worksheet_index, col_name, value):
-    client = connect_to_gsheets()
-    ws = client.open_by_key(sheet_id).get_worksheet(worksheet_index)
-    try:
-        cell = ws.find(str(value))
-        ws.delete_rows(cell.row)
-        return True
-    except:
-        return False
+# ===================== PERFORMANS ÖLÇÜMÜ =====================
+# perf / sheets JSON log satırları stdout'a (konteyner logları)
+_app_log = logging.getLogger("neu_kardiyo")
+if not _app_log.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    _app_log.addHandler(_handler)
+    _app_log.setLevel(logging.INFO)
+    _app_log.propagate = False
+
+def begin_perf_run():
+    """
+    Bu rerun için ölçümü başlatır. st.rerun()/st.stop() ile yarıda kalan önceki
+    rerun burada kapatılıp loglanır ve oturum toplamına eklenir.
+    """
+    st.session_state.setdefault("perf_sid", uuid.uuid4().hex[:8])
+    st.session_state.setdefault("perf_session", perf.RunStats(label="session"))
+    prev = st.session_state.get("perf_run")
+    if prev is not None and prev.total_ms is None:
+        finish_perf_run(prev)
+    st.session_state.perf_run = perf.start_run(session_id=st.session_state.perf_sid)
+    return st.session_state.perf_run
+
+def finish_perf_run(run=None):
+    run = run or st.session_state.get("perf_run")
+    if run is None or run.total_ms is not None:
+        return
+    perf.end_run(run)
+    st.session_state.perf_session.merge(run)
+    st.session_state.perf_last = run
 
-# ===================== KAYIT / GÜNCELLEME (UPSERT) =====================
-def save_data_row(sheet_id, data_dict, unique_col, worksheet_index=0):
-    client = connect_to_gsheets()
-    ws = client.open_by_key(sheet_id).get_worksheet(worksheet_index)
+def perf_fragment(key):
+    """
+    st.fragment(key=...) + ölçüm: fragment tek başına yeniden çalıştığında kendi perf
+    run'ı açılır (etiket "fragment:<key>"), tam rerun içinde ise bir span olarak sayılır.
+    """
+    def deco(fn):
+        @st.fragment(key=key)
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not in_fragment_rerun():
+                with perf.span(f"fragment:{key}"):
+                    return fn(*args, **kwargs)
+            run = begin_perf_run()
+            run.label = f"fragment:{key}"
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                finish_perf_run(run)
+        return wrapper
+    return deco
+
+def in_fragment_rerun() -> bool:
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+def rerun_fragment():
+    """Fragment tek başına çalışıyorsa yalnızca onu, tam rerun içindeyse tüm sayfayı yeniden çalıştırır."""
+    st.rerun(scope="fragment" if in_fragment_rerun() else "app")
+
+def _perf_table(stats: dict, cols):
+    return pd.DataFrame([[k, *v] for k, v in sorted(stats.items(), key=lambda kv: -kv[1][1])], columns=cols)
+
+def render_perf_panel():
+    """Kenar çubuğundaki isteğe bağlı hata ayıklama paneli (son rerun + oturum toplamı)."""
+    last = st.session_state.get("perf_last")
+    sess = st.session_state.get("perf_session")
+    with st.expander("🛠️ Performans", expanded=True):
+        if last is None:
+            st.caption("Henüz tamamlanmış rerun yok.")
+            return
+        st.caption(
+            f"Son rerun ({last.label}): {last.total_ms:.0f} ms · {last.api_calls} API çağrısı · "
+            f"{last.api_bytes / 1024:.0f} KB"
+        )
+        st.dataframe(_perf_table(last.spans, ["bölüm", "adet", "toplam ms", "max ms"]), use_container_width=True)
+        if last.api:
+            st.dataframe(_perf_table(last.api, ["API", "adet", "ms", "bayt", "hata"]), use_container_width=True)
+        st.caption(f"Oturum: {sess.api_calls} API çağrısı · {sess.api_bytes / 1024:.0f} KB")
+        st.caption(f"İstemci: {get_sheets_client().counters} · Arka plan: {perf.BACKGROUND.api_calls} API")
+        st.download_button(
+            "⬇️ JSON",
+            json.dumps({"last": last.to_dict(), "session": sess.to_dict()}, ensure_ascii=False, indent=1),
+            file_name=f"perf_{st.session_state.perf_sid}.json",
+            mime="application/json",
+        )
+
+begin_perf_run()
 
-    clean_data = {str(k).strip(): ("" if v is None else str(v)) for k, v in data_dict.items()}
-    all_values = ws.get_all_values()
+# ===================== YARDIMCI =====================
+@st.cache_resource
+def export_salt() -> str:
+    """
+    Dışa aktarımda dosya numaralarını özetleyen tuz. secrets'taki export_salt (varsa)
+    farklı günlerin dosyalarını eşleştirilebilir kılar; yoksa sunucu süreci başına rastgele.
+    """
+    return st.secrets.get("export_salt", None) or secrets.token_hex(16)
 
-    if not all_values:
-        ws.append_row(list(clean_data.keys()))
-        ws.append_row(list(clean_data.values()))
-        st.toast("✅ İlk kayıt oluşturuldu.", icon="💾")
-        return
+def render_export(df, sheet_id, worksheet_index, base_name: str, derived=False):
+    """
+    Dışa aktarma düğmesi. Dosya yalnızca tıklanınca, parça parça diske yazılarak üretilir
+    ve veri versiyonu başına bir kez kurulur (tekrar indirmeler aynı dosyayı kullanır).
+    df: DataFrame ya da onu döndüren fonksiyon (tam tablo yalnızca tıklanınca yüklenir).
+    Sınır: st.download_button akış desteklemez; dosya-benzeri nesneleri de bayta çevirip
+    medya deposunda tutar. Bu yüzden indirme sırasında dosyanın tamamı bir kez bellekte
+    bulunur (tepe bellek ≈ dosya boyutu; yazım aşaması parça parça kalır).
+    """
+    key = f"{base_name}_{worksheet_index}"
+    fmts = [f for f in export.FORMATS if f != "parquet" or export.parquet_available()]
+    c1, c2, c3 = st.columns([1, 1, 1])
+    fmt = c1.selectbox("Biçim", fmts, format_func=lambda f: export.FORMATS[f][0], key=f"exp_fmt_{key}")
+    strip_phi = c2.checkbox(
+        "Kimlik bilgilerini çıkar", value=True, key=f"exp_phi_{key}",
+        help="Ad ve iletişim sütunları atılır; dosya numaraları tuzlu özetle kodlanır.",
+    )
+    salt = export_salt() if strip_phi else ""
+    cache = get_read_cache()
+    name = f"export:{fmt}:{int(strip_phi)}:{int(derived)}"
 
-    headers = [str(h).strip() for h in all_values[0]]
+    def data():
+        # st.* çağrısı yok: tıklamada Streamlit dışında çalışır
+        frame = df() if callable(df) else df
 
-    if unique_col not in headers:
-        headers.append(unique_col)
+        def build():
+            with perf.span(f"export:{fmt}"):
+                return export.write_file(export.prepare(frame, strip_phi, derived, salt), fmt, sheet_name=base_name)
 
-    missing_cols = [k for k in clean_data.keys() if k not in headers]
-    if missing_cols:
-        headers.extend(missing_cols)
-        ws.update("1:1", [headers])
+        path = cache.derived(sheet_id, worksheet_index, frame, name, build)
+        if os.path.exists(path):
+            os.utime(path)  # kullanılan dosya temizlikte silinmesin
+        else:
+            path = build()
+        with open(path, "rb") as f:
+            return f.read()  # Streamlit zaten bayta çevirir; ek kopya yok
+
+    suffix = "_anonim" if strip_phi else ""
+    c3.download_button(
+        "⬇️ İndir",
+        data,
+        file_name=f"{base_name}{suffix}_{datetime.now():%Y%m%d}.{fmt}",
+        mime=export.FORMATS[fmt][1],
+        on_click="ignore",
+        key=f"exp_btn_{key}",
+    )
 
-    row_to_save = [clean_data.get(h, "") for h in headers]
+def mask_text(values: pd.Series) -> pd.Series:
+    """Dergi/Makale adlarını maskeler (vektörel): her kelimenin ilk harfi + ***"""
+    # Tek regex geçişi: kelimeyi (çevresindeki boşluklarla) "ilk harf*** " yapar, sondaki boşluk atılır
+    return values.fillna("").astype(str).str.replace(r"\s*(\S)\S*\s*", r"\1*** ", regex=True).str.rstrip()
 
-    uid = clean_data.get(unique_col, "").strip()
-    if not uid:
-        raise ValueError(f"{unique_col} boş olamaz!")
+def display_view(sheet_id, worksheet_index, df: pd.DataFrame, name: str, build):
+    """
+    Ekranın gösterim tablosu (sütun seçimi, maskeleme) veri versiyonu başına bir kez
+    kurulur ve oturumlar arasında paylaşılır; rerun'lar kopya üretmez. Yerinde değiştirmeyin.
+    """
+    return get_read_cache().derived(sheet_id, worksheet_index, df, f"view:{name}", build)
 
-    uid_col_idx = headers.index(unique_col) + 1
-    col_vals = ws.col_values(uid_col_idx)
+def cohort_stats(df: pd.DataFrame) -> CohortStats:
+    """
+    İstatistik ekranının kohort özetleri veri versiyonu başına bir kez kurulur; tek satırlık
+    kayıt / silme sonrası kohort yeniden taranmaz, yalnızca değişen satırla güncellenir.
+    """
+    return get_read_cache().derived(
+        SHEET_ID, DATA_WS_INDEX, df, "cohort_stats", lambda: CohortStats(df),
+        update=lambda old, removed, added: old.updated(removed, added),
+    )
 
-    row_index_to_update = None
-    for i, v in enumerate(col_vals[1:], start=2):
-        if str(v).strip() == uid:
-            row_index_to_update = i
-            break
+# Hasta listesinde gösterilen sütunlar; aramaya katılmayan sütunlar
+LIST_COLS = ["Dosya Numarası", "Tarih", "Hekim"]
+LIST_HIDDEN_COLS = ["Adı Soyadı", "TA Sistol", "TA Diyastol"]
 
-    end_col = colnum_to_letter(len(headers))
+LIST_PAGE_SIZES = [25, 50, 100, 250]
 
-    if row_index_to_update:
-        ws.update(f"A{row_index_to_update}:{end_col}{row_index_to_update}", [row_to_save])
-        st.toast(f"✅ Güncellendi: {uid}", icon="🔄")
-    else:
-        ws.append_row(row_to_save)
-        st.toast(f"✅ Kaydedildi: {uid}", icon="💾")
+def editing_record() -> dict:
+    """
+    Düzenleme modunda seçili hastanın tam kaydı (hücre metinleri, yalnızca o satır okunur);
+    yeni kayıtta ya da bulunamazsa {}.
+    """
+    edit_id = st.session_state.get("data_edit_id")
+    if st.session_state.get("data_mode") != "Düzenleme" or not edit_id:
+        return {}
+    return load_record(SHEET_ID, DATA_WS_INDEX, edit_id)
 
 # ===================== AUTH (VERİ GİRİŞİ ŞİFRE) =====================
 def require_password_gate():
@@ -226,9 +298,213 @@ def confirm_delete_with_password(context_key: str) -> bool:
 
     return False
 
-# ===================== HEADER / EKG ANİMASYONU =====================
-st.markdown(
+# ===================== TOPLU İÇE AKTARMA =====================
+def render_bulk_import(columns):
+    """CSV/Excel yükle -> sütun eşle -> kuru çalıştırma önizlemesi -> toplu yaz. columns: sayfa başlıkları."""
+    key_col = "Dosya Numarası"
+    up = st.file_uploader("Eko / laboratuvar dosyası", type=["csv", "xlsx", "xls"], key="bulk_file")
+    if up is None:
+        st.session_state.pop("bulk_plan", None)
+        return
+    try:
+        src = bulk_import.read_table(up.getvalue(), up.name)
+    except Exception as e:
+        st.error(f"Dosya okunamadı: {e}")
+        return
+    st.caption(f"{len(src)} satır, {len(src.columns)} sütun")
+
+    fields = list(dict.fromkeys(list(columns) + list(COLUMN_SCHEMA)))
+    fields = [f for f in fields if f != ROW_VERSION_COL]
+    suggested = bulk_import.suggest_mapping(src.columns, fields)
+    mapping_df = st.data_editor(
+        pd.DataFrame({"Kaynak sütun": list(src.columns), "Alan": [suggested[c] for c in src.columns]}),
+        column_config={"Alan": st.column_config.SelectboxColumn("Alan", options=fields)},
+        disabled=["Kaynak sütun"],
+        hide_index=True,
+        use_container_width=True,
+        key=f"bulk_map_{up.file_id}",
+    )
+    mapping = dict(zip(mapping_df["Kaynak sütun"], mapping_df["Alan"].where(mapping_df["Alan"].notna(), None)))
+
+    if st.button("🔍 Önizle (kuru çalıştırma)", key="bulk_preview_btn"):
+        records, errors = bulk_import.validate(src, mapping, key_col)
+        try:
+            plan = bulk_upsert(SHEET_ID, records, key_col, DATA_WS_INDEX, dry_run=True) if records else None
+        except SheetsError as e:
+            st.error(f"⚠️ {e}")
+            return
+        st.session_state.bulk_plan = {"file": up.file_id, "records": records, "errors": errors, "plan": plan}
+
+    state = st.session_state.get("bulk_plan")
+    if not state or state["file"] != up.file_id:
+        return
+    plan = state["plan"]
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Yeni", len(plan["new"]) if plan else 0)
+    m2.metric("Güncellenecek", len(plan["updates"]) if plan else 0)
+    m3.metric("Değişmeyen", plan["unchanged"] if plan else 0)
+    m4.metric("Hatalı", len(state["errors"]))
+    if state["errors"]:
+        st.dataframe(pd.DataFrame(state["errors"]), use_container_width=True, hide_index=True)
+    if plan and plan["diff"]:
+        st.caption("Değişecek hücreler (ilk 500)")
+        st.dataframe(pd.DataFrame(plan["diff"][:500]), use_container_width=True, hide_index=True)
+
+    ready = bool(plan and (plan["new"] or plan["updates"]))
+    if st.button("✅ İçe aktar", type="primary", key="bulk_apply_btn", disabled=not ready):
+        try:
+            result = bulk_upsert(SHEET_ID, state["records"], key_col, DATA_WS_INDEX, dry_run=False)
+        except SheetsError as e:
+            st.error(f"⚠️ {e}")
+            return
+        st.session_state.pop("bulk_plan", None)
+        skipped = result.get("skipped", [])
+        st.toast(
+            f"📥 {len(result['new'])} yeni, {len(result['updates']) - len(skipped)} güncellenen kayıt yazıldı",
+            icon="✅",
+        )
+        if skipped:
+            st.toast(
+                f"{len(skipped)} kayıt sayfada bulunamadığı için atlandı: {', '.join(skipped[:10])}", icon="⚠️"
+            )
+        st.rerun()
+
+# ===================== YAZMA GÜNLÜĞÜ =====================
+def report_write(entry, done_msg=None) -> bool:
+    """
+    submit_save / submit_delete sonucunu gösterir. Yazma uygulandıysa ya da günlükte
+    bekliyorsa (veri kaybolmaz) True: ekran yenilenebilir.
+    """
+    if entry["status"] == DONE:
+        if done_msg:
+            st.toast(done_msg, icon="✅")
+        return True
+    if entry["status"] == PENDING:
+        st.toast("💾 Kaydedildi; Sheets'e ulaşılamadı, arka planda tekrar denenecek.", icon="⏳")
+        return True
+    if entry["status"] == CONFLICT:
+        st.warning(f"⚠️ {entry['error']}")
+    else:
+        st.error(f"Hata: {entry['error']}")
+    return False
+
+SAVE_RESULTS = {"unchanged": "Değişiklik yok", "updated": "Güncellendi", "created": "İlk kayıt oluşturuldu"}
+
+def save_message(entry, label=None) -> str:
+    """submit_save sonucu için bildirim metni; label verilmezse kaydın anahtarı gösterilir."""
+    return f"{SAVE_RESULTS.get(entry['result'], 'Kaydedildi')}: {label or entry['keys'][0]}"
+
+def render_pending_writes():
+    """Sidebar: Sheets'e henüz yazılmamış ve uygulanamamış yazmalar."""
+    entries = get_journal().unresolved()
+    pending = [e for e in entries if e["status"] == PENDING]
+    if pending:
+        last = pending[0]["error"]
+        st.warning(f"⏳ {len(pending)} yazma Sheets'e gönderilmeyi bekliyor" + (f"\n\n_{last[:120]}_" if last else ""))
+    failed = [e for e in entries if e["status"] != PENDING]
+    if failed:
+        with st.expander(f"⚠️ Uygulanamayan yazmalar ({len(failed)})"):
+            for e in failed:
+                op = "Kayıt" if e["op"] == "save" else "Silme"
+                st.caption(f"{op} · {e['key_col']}: {', '.join(e['keys'][:5])} · {e['error'][:200]}")
+                # Veri sayfasının hasta bilgileri yalnızca şifreyle görülür
+                private = (e["sheet_id"], e["ws_index"]) == (SHEET_ID, DATA_WS_INDEX)
+                can_view = e["op"] == "save" and (not private or st.session_state.get("auth_ok", False))
+                if can_view and st.toggle("Girilen değerleri göster", key=f"journal_show_{e['id']}"):
+                    st.json({k: v for k, v in e["payload"]["data"].items() if v not in ("", "0", "0.0")})
+                b1, b2, b3 = st.columns(3)
+                # Çakışmada yeniden uygulama güncel satırın üzerine yazar (yazıcı önce sayfayı senkronlar)
+                retry_label = "Üzerine yaz" if e["status"] == CONFLICT else "Tekrar dene"
+                if b1.button(retry_label, key=f"journal_retry_{e['id']}"):
+                    payload = {**e["payload"], "base_version": None} if e["op"] == "save" else None
+                    get_journal().requeue(e["id"], payload)
+                    get_journal_flusher().wake()
+                    st.rerun()
+                if can_view and private:
+                    b2.button("Forma yükle", key=f"journal_form_{e['id']}", on_click=load_draft, args=(e,))
+                if b3.button("Kapat", key=f"journal_dismiss_{e['id']}", help="Kaydı günlükten siler"):
+                    get_journal().dismiss(e["id"])
+                    st.rerun()
+
+def load_draft(entry):
+    """
+    Uygulanamamış kaydı veri giriş formuna yükler (on_click: menü ve mod widget'ları bu
+    rerun'da henüz çizilmedi). Kayıt formdan başarıyla kaydedilince günlükten kaldırılır.
+    """
+    key = entry["keys"][0]
+    st.session_state.menu = "🏥 Veri Girişi (H-Type HT) [Şifreli]"
+    if key in load_keys(SHEET_ID, DATA_WS_INDEX):
+        st.session_state.data_mode = "Düzenleme"
+        st.session_state.data_edit_id = key
+    else:
+        st.session_state.data_mode = "Yeni Kayıt"
+    st.session_state.data_draft = {"entry": entry["id"], "data": entry["payload"]["data"]}
+
+# ===================== DEĞİŞİKLİK BİLDİRİMİ =====================
+CHANGE_POLL_INTERVAL = 5  # saniye: oturumun değişiklik yayınını yoklama aralığı (bellekten; API çağrısı yok)
+CHANGE_OPS = {"save": "kaydedildi", "delete": "silindi"}
+
+def pending_changes(target):
+    """
+    Son bakıştan beri başka oturumların (ya da Sheets'in kendisinin) target sayfasına
+    dokunan olayları ve yayının son sıra numarası.
+    """
+    bus = get_change_bus()
+    seq = st.session_state.setdefault("bus_seq", bus.last_seq())
+    return bus.pending(seq, st.session_state.get("perf_sid"), target)
+
+def change_message(e, show_keys=True) -> str:
+    """show_keys=False: şifresiz ekranda hasta dosya numaraları gösterilmez."""
+    keys = e["keys"]
+    if e["op"] == "bulk":
+        return f"Başka bir oturumda {len(keys)} kayıt toplu içe aktarıldı."
+    if e["op"] in CHANGE_OPS:
+        more = f" (+{len(keys) - 3})" if len(keys) > 3 else ""
+        what = f"{', '.join(keys[:3])}{more}" if show_keys else f"{len(keys)} kayıt"
+        return f"{what} başka bir oturumda {CHANGE_OPS[e['op']]}."
+    return "Sayfa Sheets'te değişti; ekran güncellendi."
+
+def notify_changes(target):
+    """Tam rerun başında: bu ekranın sayfasındaki dış değişiklikleri bildirir ve görüldü sayar."""
+    events, st.session_state.bus_seq = pending_changes(target)
+    show_keys = target != (SHEET_ID, DATA_WS_INDEX) or st.session_state.get("auth_ok", False)
+    for e in events[-3:]:
+        st.toast(change_message(e, show_keys), icon="🔔")
+
+def form_record_changed() -> bool:
+    """Düzenleme formunda açık kayıt, form çizildikten sonra değişti mi?"""
+    shown = st.session_state.get("data_form_record")
+    edit_id = st.session_state.get("data_edit_id")
+    if not shown or st.session_state.get("data_mode") != "Düzenleme" or shown.get("Dosya Numarası") != edit_id:
+        return False
+    return load_record(SHEET_ID, DATA_WS_INDEX, edit_id) != shown
+
+@st.fragment(run_every=CHANGE_POLL_INTERVAL)
+def watch_changes(target, form=False):
     """
+    Başka bir oturumun yazması bu ekranın sayfasına dokunduysa ekranı yeniden çizer; veri
+    paylaşılan önbellekte zaten güncel olduğundan Sheets'e gidilmez. Formda açık kayıt
+    değiştiyse girilen değerler kaybolmasın diye yeniden çizmek yerine uyarır.
+    """
+    if get_change_bus().last_seq() == st.session_state.get("bus_seq"):
+        return
+    events, last = pending_changes(target)
+    if not events:
+        st.session_state.bus_seq = last
+        return
+    if form and form_record_changed():
+        st.warning(
+            f"✏️ {st.session_state.data_edit_id} siz düzenlerken başka bir oturumda değişti. "
+            "Kaydedilmemiş değerlerinizi not alıp formu yenileyin."
+        )
+        if not st.button("🔄 Formu yeni değerlerle aç", key="bus_reload_form"):
+            return
+    st.rerun()
+
+# ===================== HEADER / EKG ANİMASYONU =====================
+with perf.span("header"):
+    st.markdown(
+        """
 <style>
 .ecg-container {
     background: #000; height: 90px; width: 100%; overflow: hidden; position: relative;
@@ -269,19 +545,27 @@ st.markdown(
     </div>
 </div>
 """,
-    unsafe_allow_html=True,
-)
+        unsafe_allow_html=True,
+    )
+    st.title("H-TYPE HİPERTANSİYON ÇALIŞMASI")
 
-st.title("H-TYPE HİPERTANSİYON ÇALIŞMASI")
+start_mirror_sync()
+get_journal_flusher()  # önceki çalıştırmadan kalan bekleyen yazmalar da uygulanır
 
 # ===================== SIDEBAR =====================
-with st.sidebar:
+# Menü sekmesi -> gösterdiği sayfa (diğer sekmeler arka planda ön yüklenir)
+MENU_WORKSHEETS = {
+    "🏥 Veri Girişi (H-Type HT) [Şifreli]": (SHEET_ID, DATA_WS_INDEX),
+    "📝 Case Report Takip": (CASE_SHEET_ID, CASE_WS_INDEX),
+    "✉️ Editöre Mektup": (LETTER_SHEET_ID, LETTER_WS_INDEX),
+    "📊 İstatistik (H-Type HT)": (SHEET_ID, DATA_WS_INDEX),
+}
+
+with perf.span("sidebar"), st.sidebar:
     st.title("❤️ NEÜ-KARDİYO")
 
-    menu = st.radio(
-        "Menü",
-        ["🏥 Veri Girişi (H-Type HT) [Şifreli]", "📝 Case Report Takip", "✉️ Editöre Mektup"],
-    )
+    menu = st.radio("Menü", list(MENU_WORKSHEETS), key="menu")
+    st.session_state.perf_run.label = menu
 
     st.divider()
 
@@ -297,6 +581,32 @@ with st.sidebar:
     ]
     st.info(f"💡 **Günün Sözü:**\n\n_{random.choice(quotes)}_")
 
+    cache_stats = get_read_cache().stats()
+    st.caption(f"🗄️ Önbellek: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska")
+    render_pending_writes()
+    prefetch_stats = get_prefetcher().stats()
+    if prefetch_stats["done"]:
+        st.caption(f"⏩ Ön yükleme: {prefetch_stats['done']} sayfa arka planda hazırlandı")
+    sync_stats = get_change_tracker().stats()
+    if sync_stats["checks"]:
+        st.caption(f"🔁 Değişiklik kontrolü: {sync_stats['skipped']}/{sync_stats['checks']} turda okuma atlandı")
+    last_error = get_sheets_client().last_error()
+    if last_error and time.time() - last_error["ts"] < 300:
+        st.warning(f"⚠️ Son Sheets hatası ({last_error['op']}, {last_error['status'] or 'ağ'}): {last_error['message'][:120]}")
+    data_stats = get_read_cache().load_stats.get((SHEET_ID, DATA_WS_INDEX))
+    if data_stats:
+        st.caption(
+            f"📊 Veri: {data_stats['rows']} satır · {data_stats['bytes'] / 1e6:.1f} MB · "
+            f"ayrıştırma {data_stats['parse_ms']:.0f} ms"
+        )
+
+    if st.checkbox("🛠️ Performans paneli", key="perf_panel"):
+        render_perf_panel()
+
+# Başka oturumların yazmaları: bildirim + yeniden çizim (Google yoklanmaz)
+notify_changes(MENU_WORKSHEETS[menu])
+watch_changes(MENU_WORKSHEETS[menu], form=menu == "🏥 Veri Girişi (H-Type HT) [Şifreli]")
+
 # =========================================================
 # ===================== EKRAN 2: CASE REPORT =====================
 # =========================================================
@@ -323,10 +633,9 @@ if menu == "📝 Case Report Takip":
                         "Doktor": n_dr,
                         "Not": n_not,
                     }
-                    save_data_row(CASE_SHEET_ID, payload, unique_col="TarihSaat", worksheet_index=CASE_WS_INDEX)
-                    st.success("✅ Kaydedildi")
-                    time.sleep(0.6)
-                    st.rerun()
+                    entry = submit_save(CASE_SHEET_ID, payload, unique_col="TarihSaat", worksheet_index=CASE_WS_INDEX)
+                    if report_write(entry, save_message(entry, n_dosya or n_ad)):
+                        st.rerun()
                 except Exception as e:
                     st.error(f"Hata: {e}")
 
@@ -334,20 +643,22 @@ if menu == "📝 Case Report Takip":
         dfn = load_data(CASE_SHEET_ID, CASE_WS_INDEX, required_col="TarihSaat")
         if not dfn.empty:
             q = st.text_input("🔎 Arama (dosya no / vaka / doktor)", "")
-            dfn_show = dfn.copy()
-
             # NOT listelenmesin
-            if "Not" in dfn_show.columns:
-                dfn_show = dfn_show.drop(columns=["Not"])
+            dfn_show = display_view(
+                CASE_SHEET_ID, CASE_WS_INDEX, dfn, "list", lambda: dfn.drop(columns=["Not"], errors="ignore")
+            )
 
             if q.strip():
-                mask = dfn_show.apply(
-                    lambda row: row.astype(str).str.contains(q, case=False, na=False).any(),
-                    axis=1,
-                )
-                dfn_show = dfn_show[mask].copy()
+                with perf.span("search:case"):
+                    search_idx = get_read_cache().derived(
+                        CASE_SHEET_ID, CASE_WS_INDEX, dfn, "search", lambda: SearchIndex(dfn_show)
+                    )
+                    dfn_show = search_idx.filter(dfn_show, q)
 
-            st.dataframe(dfn_show, use_container_width=True)
+            with perf.span("render:case_table"):
+                st.dataframe(dfn_show, use_container_width=True)
+            with st.expander("⬇️ Dışa Aktar"):
+                render_export(dfn, CASE_SHEET_ID, CASE_WS_INDEX, "case_report")
 
             st.divider()
             st.markdown("### 🗑️ Silme (Şifreli)")
@@ -356,12 +667,8 @@ if menu == "📝 Case Report Takip":
             if confirm_delete_with_password("case"):
                 del_ts = st.selectbox("Silinecek kayıt (TarihSaat)", dfn["TarihSaat"].unique(), key="case_del_ts")
                 if st.button("🗑️ Sil", key="case_del_btn", type="secondary"):
-                    if delete_row_by_value(SHEET_ID, CASE_WS_INDEX, "TarihSaat", del_ts):
-                        st.success("Silindi")
-                        time.sleep(0.4)
+                    if report_write(submit_delete(SHEET_ID, CASE_WS_INDEX, "TarihSaat", [del_ts]), "🗑️ Silindi"):
                         st.rerun()
-                    else:
-                        st.error("Hata!")
         else:
             st.info("Henüz case report kaydı yok veya 2. sheet yok/başlık uyumsuz.")
 
@@ -389,33 +696,33 @@ elif menu == "✉️ Editöre Mektup":
                         "Makale İsmi": makale,
                         "Yazarlar": yazarlar,
                     }
-                    save_data_row(LETTER_SHEET_ID, payload, unique_col="TarihSaat", worksheet_index=LETTER_WS_INDEX)
-                    st.success("✅ Kaydedildi (3. sayfaya yazıldı)")
-                    time.sleep(0.6)
-                    st.rerun()
+                    entry = submit_save(LETTER_SHEET_ID, payload, unique_col="TarihSaat", worksheet_index=LETTER_WS_INDEX)
+                    if report_write(entry, save_message(entry, dergi or makale)):
+                        st.rerun()
                 except Exception as e:
                     st.error(f"Hata: {e}")
 
     with right:
         dfl = load_data(LETTER_SHEET_ID, LETTER_WS_INDEX, required_col="TarihSaat")
         if not dfl.empty:
-            dfl_show = dfl.copy()
-
             # Dergi adı + makale adı maskeli
-            if "Dergi Adı" in dfl_show.columns:
-                dfl_show["Dergi Adı"] = dfl_show["Dergi Adı"].apply(mask_text)
-            if "Makale İsmi" in dfl_show.columns:
-                dfl_show["Makale İsmi"] = dfl_show["Makale İsmi"].apply(mask_text)
+            dfl_show = display_view(
+                LETTER_SHEET_ID, LETTER_WS_INDEX, dfl, "list",
+                lambda: dfl.assign(**{c: mask_text(dfl[c]) for c in ["Dergi Adı", "Makale İsmi"] if c in dfl.columns}),
+            )
 
             q = st.text_input("🔎 Arama (dergi / makale / yazar)", "")
             if q.strip():
-                mask = dfl_show.apply(
-                    lambda row: row.astype(str).str.contains(q, case=False, na=False).any(),
-                    axis=1,
-                )
-                dfl_show = dfl_show[mask].copy()
+                with perf.span("search:letter"):
+                    search_idx = get_read_cache().derived(
+                        LETTER_SHEET_ID, LETTER_WS_INDEX, dfl, "search", lambda: SearchIndex(dfl_show)
+                    )
+                    dfl_show = search_idx.filter(dfl_show, q)
 
-            st.dataframe(dfl_show, use_container_width=True)
+            with perf.span("render:letter_table"):
+                st.dataframe(dfl_show, use_container_width=True)
+            with st.expander("⬇️ Dışa Aktar"):
+                render_export(dfl, LETTER_SHEET_ID, LETTER_WS_INDEX, "editore_mektup")
 
             st.divider()
             st.markdown("### 🗑️ Silme (Şifreli)")
@@ -423,23 +730,51 @@ elif menu == "✉️ Editöre Mektup":
             if confirm_delete_with_password("letter"):
                 del_ts = st.selectbox("Silinecek kayıt (TarihSaat)", dfl["TarihSaat"].unique(), key="letter_del_ts")
                 if st.button("🗑️ Sil", key="letter_del_btn", type="secondary"):
-                    if delete_row_by_value(SHEET_ID, LETTER_WS_INDEX, "TarihSaat", del_ts):
-                        st.success("Silindi")
-                        time.sleep(0.4)
+                    if report_write(submit_delete(SHEET_ID, LETTER_WS_INDEX, "TarihSaat", [del_ts]), "🗑️ Silindi"):
                         st.rerun()
-                    else:
-                        st.error("Hata!")
         else:
             st.info("Henüz editöre mektup kaydı yok veya 3. sheet yok/başlık uyumsuz.")
 
+# =========================================================
+# ===================== EKRAN 4: İSTATİSTİK =====================
+# =========================================================
+elif menu == "📊 İstatistik (H-Type HT)":
+    st.header("📊 İstatistik (H-Type HT)")
+
+    dfs = load_data(SHEET_ID, DATA_WS_INDEX, required_col="Dosya Numarası")
+    if dfs.empty:
+        st.info("Henüz hasta kaydı yok.")
+    else:
+        with perf.span("stats:cohort"):
+            stats = cohort_stats(dfs)
+            summary = stats.summary()
+        st.caption(f"Kohort: {len(dfs)} hasta · 0 / boş değerler eksik sayılır")
+
+        st.markdown("### Ortalama ± SS (n)")
+        groups = st.multiselect("Gruplar", list(STATS_GROUPS), default=[STATS_ALL, "Erkek", "Kadın", "DM var", "DM yok"])
+        sd = summary["SS"].map("{:.2f}".format).where(summary["SS"].notna(), "—")
+        cell = (
+            summary["Ortalama"].map("{:.2f}".format) + " ± " + sd + " (" + summary["n"].astype(str) + ")"
+        ).where(summary["n"] > 0, "—")
+        table = summary.assign(Değer=cell).pivot(index="Grup", columns="Değişken", values="Değer")
+        st.dataframe(
+            table.reindex(index=[g for g in STATS_GROUPS if g in groups], columns=summary["Değişken"].unique()),
+            use_container_width=True,
+        )
+
+        st.markdown("### Korelasyon (Pearson r)")
+        corr_group = st.selectbox("Grup", list(STATS_GROUPS), key="stats_corr_group")
+        st.dataframe(
+            stats.correlations(corr_group).round({"r": 3}),
+            use_container_width=True, hide_index=True,
+        )
+
 # =========================================================
 # ===================== EKRAN 1: VERİ GİRİŞİ (ŞİFRELİ) =====================
 # =========================================================
 else:
     require_password_gate()
 
-    df = load_data(SHEET_ID, DATA_WS_INDEX, required_col="Dosya Numarası")
-
     # Çalışma kriterleri: ana ekrana taşındı
     st.markdown("### 📋 Çalışma Kriterleri")
     k1, k2 = st.columns(2)
@@ -449,326 +784,465 @@ else:
         st.error("**⛔ HARİÇ:** Sekonder HT, KY, AKS, Cerrahi, Konjenital, Pulmoner HT, ABY, **AF**")
     st.markdown("---")
 
-    col_left, col_right = st.columns([2, 3])
+    # Mod / hasta seçimi yalnızca seçiciyi ve formu yeniden çalıştırır; liste yerinde kalır
+    def _rerun_entry():
+        st.session_state.pop("data_draft", None)  # başka hasta / mod seçildi: yüklenen taslak bırakılır
+        st.rerun(["data_mode", "entry_form"])
 
-    with col_left:
+    @perf_fragment("data_mode")
+    def render_mode_selector():
         st.markdown("##### ⚙️ İşlem Seçimi")
-        mode = st.radio("Mod:", ["Yeni Kayıt", "Düzenleme"], horizontal=True, label_visibility="collapsed")
-
-        current = {}
+        mode = st.radio(
+            "Mod:", ["Yeni Kayıt", "Düzenleme"], horizontal=True, label_visibility="collapsed",
+            key="data_mode", on_change=_rerun_entry,
+        )
         if mode == "Düzenleme":
-            if not df.empty:
-                edit_id = st.selectbox("Düzenlenecek Hasta (Dosya No):", df["Dosya Numarası"].unique())
-                if edit_id:
-                    current = df[df["Dosya Numarası"] == edit_id].iloc[0].to_dict()
+            keys = load_keys(SHEET_ID, DATA_WS_INDEX)
+            if keys:
+                st.selectbox(
+                    "Düzenlenecek Hasta (Dosya No):", keys, key="data_edit_id", on_change=_rerun_entry,
+                )
+                current = editing_record()
+                if current:
                     st.success(f"Seçildi: {current.get('Adı Soyadı', '')}")
             else:
                 st.warning("Düzenlenecek kayıt yok.")
 
-    with col_right:
-        with st.expander("📋 KAYITLI HASTA LİSTESİ / ARAMA / SİLME", expanded=True):
-            if st.button("🔄 Listeyi Yenile"):
-                st.rerun()
+    @perf_fragment("data_list")
+    def render_data_list():
+        """
+        Liste / arama / silme paneli: arama yazarken yalnızca bu bölüm yeniden çalışır.
+        Liste yalnızca gösterilen sütunlarla sayfa sayfa okunur; tam tablo arama ve dışa
+        aktarma için yüklenir.
+        """
+        if st.button("🔄 Listeyi Yenile"):
+            try:
+                sync_from_sheets(SHEET_ID, [DATA_WS_INDEX])
+            except SheetsError as e:
+                st.error(f"⚠️ {e}")
+            else:
+                get_read_cache().bump(SHEET_ID, DATA_WS_INDEX)
+                rerun_fragment()
 
-            if df.empty:
-                st.info("Kayıt yok.")
+        keys = load_keys(SHEET_ID, DATA_WS_INDEX)
+        if not keys:
+            st.info("Kayıt yok.")
+        else:
+            q = st.text_input("🔎 Arama (dosya no / hekim)", "")
+            s1, s2, s3 = st.columns(3)
+            prefix_only = s1.checkbox("Dosya No başından ara", key="data_prefix_search")
+            newest_first = s2.toggle("Yeni tarih önce", value=True, key="data_sort_desc")
+            page_size = s3.selectbox("Sayfa boyutu", LIST_PAGE_SIZES, index=1, key="data_page_size")
+            page = st.session_state.get("data_page", 1) - 1
+
+            if q.strip():
+                # Arama tüm sütunlarda: tam tablo (önbellekte) + indeks; sonuç bellekte sayfalanır
+                df = load_data(SHEET_ID, DATA_WS_INDEX, required_col="Dosya Numarası")
+                with perf.span("search:data"):
+                    # Ad Soyad ve TA sistol/diyastol aramaya katılmaz (listede de görünmez)
+                    search_idx = get_read_cache().derived(
+                        SHEET_ID, DATA_WS_INDEX, df, "search",
+                        lambda: SearchIndex(
+                            df, columns=[c for c in df.columns if c not in LIST_HIDDEN_COLS],
+                            prefix_col="Dosya Numarası",
+                        ),
+                    )
+                    view = display_view(
+                        SHEET_ID, DATA_WS_INDEX, df, "list", lambda: df[[c for c in LIST_COLS if c in df.columns]]
+                    )
+                    hits = search_idx.filter(view, q, prefix=prefix_only)
+                if "Tarih" in hits.columns:
+                    hits = hits.sort_values("Tarih", ascending=not newest_first, kind="stable")
+                total = len(hits)
+                n_pages = max(1, -(-total // page_size))
+                page = min(page, n_pages - 1)
+                show_df = hits.iloc[page * page_size:(page + 1) * page_size]
             else:
-                q = st.text_input("🔎 Arama (dosya no / hekim)", "")
-                show_df = df.copy()
-
-                # Ad Soyad listede görünmesin
-                if "Adı Soyadı" in show_df.columns:
-                    show_df = show_df.drop(columns=["Adı Soyadı"])
-
-                # TA sistol/diyastol listeden kalksın (isteğin)
-                for c in ["TA Sistol", "TA Diyastol"]:
-                    if c in show_df.columns:
-                        show_df = show_df.drop(columns=[c])
-
-                if q.strip():
-                    mask = show_df.apply(
-                        lambda row: row.astype(str).str.contains(q, case=False, na=False).any(),
-                        axis=1,
+                # Projeksiyonlu, sayfalı okuma: sıralama ve sayfalama aynada yapılır
+                show_df, total = load_page(SHEET_ID, DATA_WS_INDEX, LIST_COLS, page, page_size, "Tarih", newest_first)
+                n_pages = max(1, -(-total // page_size))
+                if page >= n_pages:
+                    page = n_pages - 1
+                    show_df, total = load_page(
+                        SHEET_ID, DATA_WS_INDEX, LIST_COLS, page, page_size, "Tarih", newest_first
                     )
-                    show_df = show_df[mask].copy()
-
-                cols_show = ["Dosya Numarası", "Tarih", "Hekim"]
-                final_cols = [c for c in cols_show if c in show_df.columns]
-                st.dataframe(show_df[final_cols], use_container_width=True)
-
-                st.divider()
-                st.markdown("##### 🗑️ Silme")
-                del_id = st.selectbox("Silinecek Dosya No", df["Dosya Numarası"].unique(), key="data_del_id")
-                if st.button("🗑️ SİL", type="secondary", key="data_del_btn"):
-                    if delete_row_by_value(SHEET_ID, DATA_WS_INDEX, "Dosya Numarası", del_id):
-                        st.success("Silindi!")
-                        time.sleep(0.4)
+
+            with perf.span("render:data_table"):
+                st.dataframe(show_df, use_container_width=True, hide_index=True)
+            p1, p2 = st.columns([1, 2])
+            st.session_state["data_page"] = page + 1  # arama / sayfa boyutu değişince geçerli aralıkta kalsın
+            p1.number_input("Sayfa", min_value=1, max_value=n_pages, step=1, key="data_page")
+            p2.caption(f"{total} kayıt · {n_pages} sayfa")
+            with st.expander("⬇️ Dışa Aktar (tüm sütunlar + türetilmiş)"):
+                render_export(
+                    lambda: load_data(SHEET_ID, DATA_WS_INDEX, required_col="Dosya Numarası"),
+                    SHEET_ID, DATA_WS_INDEX, "h_type_ht", derived=True,
+                )
+
+            st.divider()
+            st.markdown("##### 🗑️ Silme")
+            del_id = st.selectbox("Silinecek Dosya No", keys, key="data_del_id")
+            if st.button("🗑️ SİL", type="secondary", key="data_del_btn"):
+                # Silinen kayıt formda açık olabilir: silmelerden sonra tüm sayfa yenilenir
+                if report_write(submit_delete(SHEET_ID, DATA_WS_INDEX, "Dosya Numarası", [del_id]), "🗑️ Silindi"):
+                    st.rerun()
+
+            with st.expander("🧹 Toplu Silme"):
+                bulk_ids = st.multiselect("Silinecek Dosya No'lar", keys, key="data_bulk_del_ids")
+                if st.button("🗑️ Seçilenleri SİL", type="secondary", key="data_bulk_del_btn", disabled=not bulk_ids):
+                    entry = submit_delete(SHEET_ID, DATA_WS_INDEX, "Dosya Numarası", bulk_ids)
+                    if report_write(entry, f"🗑️ {entry['result'] or 0} kayıt silindi"):
                         st.rerun()
+
+            with st.expander("🧮 Türetilmiş Sütunlar"):
+                st.caption("BMI, BSA, LV Mass, LVMi, RWT, E/A, E/e', LACi, TAPSE/Sm, TAPSE/sPAP")
+                if st.button("Tüm kayıtlarda yeniden hesapla", key="data_recompute_btn"):
+                    try:
+                        n_cells = recompute_derived_columns(SHEET_ID, DATA_WS_INDEX)
+                    except SheetsError as e:
+                        st.error(f"⚠️ {e}")
                     else:
-                        st.error("Hata!")
+                        if n_cells:
+                            st.success(f"✅ {n_cells} hücre güncellendi")
+                        else:
+                            st.info("Tüm türetilmiş değerler güncel.")
+
+            with st.expander("📥 Toplu İçe Aktarma (CSV / Excel)"):
+                render_bulk_import(load_headers(SHEET_ID, DATA_WS_INDEX))
+
+            with st.expander("🩺 Veri Kontrolü (olası hatalı değerler)"):
+                st.caption("Makul aralık dışı değerler ve alanlar arası tutarsızlıklar; 0 / boş değerler eksik sayılır.")
+                if st.toggle("Tüm kayıtları kontrol et", key="data_check"):
+                    df = load_data(SHEET_ID, DATA_WS_INDEX, required_col="Dosya Numarası")
+                    with perf.span("check:data"):
+                        report, zeros = get_read_cache().derived(
+                            SHEET_ID, DATA_WS_INDEX, df, "plausibility",
+                            lambda: (plausibility.flag_report(df), plausibility.zero_counts(df)),
+                        )
+                    if report.empty:
+                        st.success("✅ Uyarı yok.")
+                    else:
+                        st.caption(f"{len(report)} hastada {report['Uyarı'].sum()} uyarı")
+                        st.dataframe(report, use_container_width=True, hide_index=True)
+                    if zeros.any():
+                        st.caption(f"{(zeros > 0).sum()} hastada toplam {zeros.sum()} alan 0 olarak kayıtlı (eksik sayıldı)")
+
+    @perf_fragment("entry_form")
+    def render_main_form():
+        """Veri giriş formu; kayıt güncellemesinden sonra yalnızca bu bölüm yeniden çalışır."""
+        current = editing_record()
+        shown = st.session_state.get("data_form_record")
+        if current and shown and shown.get("Dosya Numarası") == current.get("Dosya Numarası") and shown != current:
+            st.warning(
+                "✏️ Bu kayıt siz düzenlerken başka bir oturumda değişti; form yeni değerlerle açıldı. "
+                "Kaydedilmemiş değişikliklerinizi tekrar girin."
+            )
+        st.session_state.data_form_record = current
+        draft = st.session_state.get("data_draft")
+        if draft:
+            # Günlükten yüklenen değerler kaydın üzerine; sürüm (base_version) sayfadaki kayıttan
+            current = {**current, **draft["data"]}
+            st.info(
+                f"📝 Uygulanamamış kayıt forma yüklendi ({draft['data'].get('Dosya Numarası', '')}). "
+                "Değerleri kontrol edip KAYDET'e basın."
+            )
+
+        # ---- FORM HELPER ----
+        def gs(k): return str(current.get(k, ""))
+        def gf(k):
+            # str(): float32 değerleri kısa gösterimiyle alınır (12.3 -> 12.300000190734863 olmasın)
+            try:
+                v = float(str(current.get(k, 0)))
+                return 0.0 if pd.isna(v) else v
+            except: return 0.0
+        def gi(k):
+            try: return int(float(current.get(k, 0)))
+            except: return 0
+        def gc(k): return str(current.get(k, "")).lower() == "true"
+
+        # ---- VERİ GİRİŞ FORMU ----
+        with perf.span("render:main_form"), st.form("main_form"):
+            st.markdown("### 👤 Klinik")
+            c1, c2 = st.columns(2)
+
+            with c1:
+                dosya_no = st.text_input("Dosya Numarası (Zorunlu)", value=gs("Dosya Numarası"))
+                ad_soyad = st.text_input("Adı Soyadı", value=gs("Adı Soyadı"))
 
-    st.divider()
+                try:
+                    d_date = datetime.strptime(gs("Tarih"), "%Y-%m-%d")
+                except:
+                    d_date = datetime.now()
+                basvuru = st.date_input("Başvuru Tarihi", value=d_date)
 
-    # ---- FORM HELPER ----
-    def gs(k): return str(current.get(k, ""))
-    def gf(k):
-        try: return float(current.get(k, 0))
-        except: return 0.0
-    def gi(k):
-        try: return int(float(current.get(k, 0)))
-        except: return 0
-    def gc(k): return str(current.get(k, "")).lower() == "true"
-
-    # ---- VERİ GİRİŞ FORMU ----
-    with st.form("main_form"):
-        st.markdown("### 👤 Klinik")
-        c1, c2 = st.columns(2)
-
-        with c1:
-            dosya_no = st.text_input("Dosya Numarası (Zorunlu)", value=gs("Dosya Numarası"))
-            ad_soyad = st.text_input("Adı Soyadı", value=gs("Adı Soyadı"))
+                hekim = st.text_input("Veriyi Giren Hekim (Zorunlu)", value=gs("Hekim"))
+                iletisim = st.text_input("İletişim", value=gs("İletişim"))
 
-            try:
-                d_date = datetime.strptime(gs("Tarih"), "%Y-%m-%d")
-            except:
-                d_date = datetime.now()
-            basvuru = st.date_input("Başvuru Tarihi", value=d_date)
+            with c2:
+                cy, cc = st.columns(2)
+                yas = cy.number_input("Yaş", step=1, value=gi("Yaş"))
+
+                sex_l = ["Erkek", "Kadın"]
+                try:
+                    s_ix = sex_l.index(gs("Cinsiyet"))
+                except:
+                    s_ix = 0
+                cinsiyet = cc.radio("Cinsiyet", sex_l, index=s_ix, horizontal=True)
+
+                cb1, cb2, cb3 = st.columns(3)
+                boy = cb1.number_input("Boy (cm)", value=gf("Boy"))
+                kilo = cb2.number_input("Kilo (kg)", value=gf("Kilo"))
 
-            hekim = st.text_input("Veriyi Giren Hekim (Zorunlu)", value=gs("Hekim"))
-            iletisim = st.text_input("İletişim", value=gs("İletişim"))
+                bmi = metrics.bmi(boy, kilo)
+                bsa = metrics.bsa(boy, kilo)
+                cb3.metric("BMI", f"{bmi:.1f}")
 
-        with c2:
-            cy, cc = st.columns(2)
-            yas = cy.number_input("Yaş", step=1, value=gi("Yaş"))
+                ct1, ct2 = st.columns(2)
+                ta_sis = ct1.number_input("TA Sistol (mmHg)", value=gi("TA Sistol"))
+                ta_dia = ct2.number_input("TA Diyastol (mmHg)", value=gi("TA Diyastol"))
 
-            sex_l = ["Erkek", "Kadın"]
+            st.markdown("---")
+            ekg_l = ["NSR", "LBBB", "RBBB", "VPB", "SVT", "Diğer"]
             try:
-                s_ix = sex_l.index(gs("Cinsiyet"))
+                e_ix = ekg_l.index(gs("EKG"))
             except:
-                s_ix = 0
-            cinsiyet = cc.radio("Cinsiyet", sex_l, index=s_ix, horizontal=True)
+                e_ix = 0
+            ekg = st.selectbox("EKG", ekg_l, index=e_ix)
+
+            ci1, ci2 = st.columns(2)
+            ilaclar = ci1.text_area("Kullandığı İlaçlar", value=gs("İlaçlar"))
+            baslanan = ci2.text_area("Başlanan İlaçlar", value=gs("Başlanan"))
+
+            st.markdown("##### Ek Hastalıklar")
+            ck1, ck2, ck3, ck4, ck5 = st.columns(5)
+            dm = ck1.checkbox("DM", value=gc("DM"))
+            kah = ck2.checkbox("KAH", value=gc("KAH"))
+            hpl = ck3.checkbox("HPL", value=gc("HPL"))
+            inme = ck4.checkbox("İnme", value=gc("İnme"))
+            sigara = ck5.checkbox("Sigara", value=gc("Sigara"))
+            diger = st.text_input("Diğer", value=gs("Diğer"))
+
+            st.markdown("### 🩸 Laboratuvar")
+            l1, l2, l3, l4 = st.columns(4)
+
+            hgb = l1.number_input("Hgb (g/dL)", value=gf("Hgb"))
+            hct = l1.number_input("Hct (%)", value=gf("Hct"))
+            wbc = l1.number_input("WBC (10³/µL)", value=gf("WBC"))
+            plt = l1.number_input("PLT (10³/µL)", value=gf("PLT"))
+            neu = l1.number_input("Nötrofil (%)", value=gf("Neu"))
+            lym = l1.number_input("Lenfosit (%)", value=gf("Lym"))
+            mpv = l1.number_input("MPV (fL)", value=gf("MPV"))
+            rdw = l1.number_input("RDW (%)", value=gf("RDW"))
+
+            glukoz = l2.number_input("Glukoz (mg/dL)", value=gf("Glukoz"))
+            ure = l2.number_input("Üre (mg/dL)", value=gf("Üre"))
+            krea = l2.number_input("Kreatinin (mg/dL)", value=gf("Kreatinin"))
+            uric = l2.number_input("Ürik Asit (mg/dL)", value=gf("Ürik Asit"))
+            na = l2.number_input("Na (mEq/L)", value=gf("Na"))
+            k_val = l2.number_input("K (mEq/L)", value=gf("K"))
+            alt = l2.number_input("ALT (U/L)", value=gf("ALT"))
+            ast = l2.number_input("AST (U/L)", value=gf("AST"))
+            prot = l2.number_input("Tot Prot (g/dL)", value=gf("Tot. Prot"))
+            alb = l2.number_input("Albümin (g/dL)", value=gf("Albümin"))
+
+            chol = l3.number_input("Chol (mg/dL)", value=gf("Chol"))
+            ldl = l3.number_input("LDL (mg/dL)", value=gf("LDL"))
+            hdl = l3.number_input("HDL (mg/dL)", value=gf("HDL"))
+            trig = l3.number_input("Trig (mg/dL)", value=gf("Trig"))
+
+            homo = l4.number_input("Homosistein (µmol/L)", value=gf("Homosistein"))
+            lpa = l4.number_input("Lp(a) (mg/dL)", value=gf("Lp(a)"))
+            folik = l4.number_input("Folik Asit (ng/mL)", value=gf("Folik Asit"))
+            b12 = l4.number_input("B12 (pg/mL)", value=gf("B12"))
+
+            # EKO parametreleri (eski set geri)
+            st.markdown("### 🫀 Eko")
+            e1, e2, e3, e4 = st.columns(4)
+
+            with e1:
+                st.caption("Yapısal")
+                lvedd = st.number_input("LVEDD (mm)", value=gf("LVEDD"))
+                lvesd = st.number_input("LVESD (mm)", value=gf("LVESD"))
+                ivs = st.number_input("IVS (mm)", value=gf("IVS"))
+                pw = st.number_input("PW (mm)", value=gf("PW"))
+                lvedv = st.number_input("LVEDV (mL)", value=gf("LVEDV"))
+                lvesv = st.number_input("LVESV (mL)", value=gf("LVESV"))
+                ao = st.number_input("Ao Asc (mm)", value=gf("Ao Asc"))
+
+                lvm = metrics.lv_mass(lvedd, ivs, pw)
+                lvmi = metrics.lvmi(lvm, bsa)
+                rwt = metrics.rwt(pw, lvedd)
+                st.caption(f"🔵 Mass:{lvm:.0f} | LVMi:{lvmi:.0f} | RWT:{rwt:.2f}")
+
+            with e2:
+                st.caption("Sistolik")
+                lvef = st.number_input("LVEF (%)", value=gf("LVEF"))
+                sv = st.number_input("SV (mL)", value=gf("SV"))
+                lvot = st.number_input("LVOT VTI (cm)", value=gf("LVOT VTI"))
+                gls = st.number_input("GLS (%)", value=gf("GLS"))
+                gcs = st.number_input("GCS (%)", value=gf("GCS"))
+                sdls = st.number_input("SD-LS (%)", value=gf("SD-LS"))
+
+            with e3:
+                st.caption("Diyastolik")
+                mite = st.number_input("Mitral E (cm/sn)", value=gf("Mitral E"))
+                mita = st.number_input("Mitral A (cm/sn)", value=gf("Mitral A"))
+                septe = st.number_input("Septal e' (cm/sn)", value=gf("Septal e'"))
+                late = st.number_input("Lateral e' (cm/sn)", value=gf("Lateral e'"))
+                laedv = st.number_input("LAEDV (mL)", value=gf("LAEDV"))
+                laesv = st.number_input("LAESV (mL)", value=gf("LAESV"))
+                lastr = st.number_input("LA Strain (%)", value=gf("LA Strain"))
+
+                ea = metrics.ratio(mite, mita)
+                ee = metrics.ratio(mite, septe)
+                laci = metrics.ratio(laedv, lvedv)
+                st.caption(f"🔵 E/A:{ea:.1f} | E/e':{ee:.1f} | LACi:{laci:.2f}")
+
+            with e4:
+                st.caption("Sağ Kalp")
+                tapse = st.number_input("TAPSE (mm)", value=gf("TAPSE"))
+                rvsm = st.number_input("RV Sm (cm/sn)", value=gf("RV Sm"))
+                spap = st.number_input("sPAP (mmHg)", value=gf("sPAP"))
+                tyvel = st.number_input("TY vel. (m/sn)", value=gf("TY vel."))
+                rvot = st.number_input("RVOT VTI (cm)", value=gf("RVOT VTI"))
+                rvota = st.number_input("RVOT accT (ms)", value=gf("RVOT accT"))
+
+                tsm = metrics.ratio(tapse, rvsm)
+                tspap = metrics.ratio(tapse, spap)
+                st.caption(f"🔵 TAPSE/Sm: {tsm:.2f} | TAPSE/sPAP: {tspap:.2f}")
+
+            st.write("")
+            if st.form_submit_button("💾 KAYDET / GÜNCELLE", type="primary"):
+                if not dosya_no or not hekim:
+                    st.error("Dosya No ve Hekim zorunlu!")
+                else:
+                    final_data = {
+                        "Dosya Numarası": dosya_no,
+                        "Adı Soyadı": ad_soyad,
+                        "Tarih": str(basvuru),
+                        "Hekim": hekim,
+                        "İletişim": iletisim,
+                        "Yaş": yas,
+                        "Cinsiyet": cinsiyet,
+                        "Boy": boy,
+                        "Kilo": kilo,
+                        "BMI": bmi,
+                        "BSA": bsa,
+                        "TA Sistol": ta_sis,
+                        "TA Diyastol": ta_dia,
+                        "EKG": ekg,
+                        "İlaçlar": ilaclar,
+                        "Başlanan": baslanan,
+                        "DM": dm,
+                        "KAH": kah,
+                        "HPL": hpl,
+                        "İnme": inme,
+                        "Sigara": sigara,
+                        "Diğer": diger,
+                        "Hgb": hgb,
+                        "Hct": hct,
+                        "WBC": wbc,
+                        "PLT": plt,
+                        "Neu": neu,
+                        "Lym": lym,
+                        "MPV": mpv,
+                        "RDW": rdw,
+                        "Glukoz": glukoz,
+                        "Üre": ure,
+                        "Kreatinin": krea,
+                        "Ürik Asit": uric,
+                        "Na": na,
+                        "K": k_val,
+                        "ALT": alt,
+                        "AST": ast,
+                        "Tot. Prot": prot,
+                        "Albümin": alb,
+                        "Chol": chol,
+                        "LDL": ldl,
+                        "HDL": hdl,
+                        "Trig": trig,
+                        "Lp(a)": lpa,
+                        "Homosistein": homo,
+                        "Folik Asit": folik,
+                        "B12": b12,
+                        "LVEDD": lvedd,
+                        "LVESD": lvesd,
+                        "IVS": ivs,
+                        "PW": pw,
+                        "LVEDV": lvedv,
+                        "LVESV": lvesv,
+                        "LV Mass": lvm,
+                        "LVMi": lvmi,
+                        "RWT": rwt,
+                        "Ao Asc": ao,
+                        "LVEF": lvef,
+                        "SV": sv,
+                        "LVOT VTI": lvot,
+                        "GLS": gls,
+                        "GCS": gcs,
+                        "SD-LS": sdls,
+                        "Mitral E": mite,
+                        "Mitral A": mita,
+                        "Mitral E/A": ea,
+                        "Septal e'": septe,
+                        "Lateral e'": late,
+                        "Mitral E/e'": ee,
+                        "LAEDV": laedv,
+                        "LAESV": laesv,
+                        "LA Strain": lastr,
+                        "LACi": laci,
+                        "TAPSE": tapse,
+                        "RV Sm": rvsm,
+                        "TAPSE/Sm": tsm,
+                        "sPAP": spap,
+                        "TY vel.": tyvel,
+                        "TAPSE/sPAP": tspap,
+                        "RVOT VTI": rvot,
+                        "RVOT accT": rvota,
+                    }
+                    # Ölçülmeyen alanlar 0 değil boş kaydedilir; şüpheli değerler önce gösterilir,
+                    # aynı değerlerle tekrar KAYDET'e basılırsa uyarılara rağmen kaydedilir
+                    final_data = plausibility.blank_zeros(final_data)
+                    flags = plausibility.check_record(final_data)
+                    if flags and st.session_state.get("data_flags_ack") != (dosya_no, flags):
+                        st.session_state.data_flags_ack = (dosya_no, flags)
+                        st.warning(
+                            "⚠️ Olası hatalı değerler:\n" + "".join(f"\n- {m}" for m in flags)
+                            + "\n\nDeğerler doğruysa tekrar **KAYDET**'e basın."
+                        )
+                    else:
+                        st.session_state.pop("data_flags_ack", None)
+                        try:
+                            entry = submit_save(
+                                SHEET_ID, final_data, unique_col="Dosya Numarası", worksheet_index=DATA_WS_INDEX,
+                                base_version=current.get(ROW_VERSION_COL) if current else None,
+                            )
+                            if report_write(entry, save_message(entry)):
+                                st.session_state.pop("data_form_record", None)  # kendi yazmamız: uyarı gösterilmesin
+                                draft = st.session_state.pop("data_draft", None)
+                                if draft:
+                                    get_journal().dismiss(draft["entry"])
+                                # Listede görünen sütunlar değişmediyse yalnızca form yenilenir
+                                if current and all(str(current.get(c, "")) == str(final_data[c]) for c in LIST_COLS):
+                                    rerun_fragment()
+                                st.rerun()
+                        except Exception as e:
+                            st.error(f"Hata: {e}")
+
+    col_left, col_right = st.columns([2, 3])
 
-            cb1, cb2, cb3 = st.columns(3)
-            boy = cb1.number_input("Boy (cm)", value=gf("Boy"))
-            kilo = cb2.number_input("Kilo (kg)", value=gf("Kilo"))
+    with col_left:
+        render_mode_selector()
 
-            bmi = kilo / ((boy / 100) ** 2) if boy > 0 else 0
-            bsa = (boy * kilo / 3600) ** 0.5 if (boy > 0 and kilo > 0) else 0
-            cb3.metric("BMI", f"{bmi:.1f}")
+    with col_right:
+        with st.expander("📋 KAYITLI HASTA LİSTESİ / ARAMA / SİLME", expanded=True):
+            render_data_list()
 
-            ct1, ct2 = st.columns(2)
-            ta_sis = ct1.number_input("TA Sistol (mmHg)", value=gi("TA Sistol"))
-            ta_dia = ct2.number_input("TA Diyastol (mmHg)", value=gi("TA Diyastol"))
+    st.divider()
 
-        st.markdown("---")
-        ekg_l = ["NSR", "LBBB", "RBBB", "VPB", "SVT", "Diğer"]
-        try:
-            e_ix = ekg_l.index(gs("EKG"))
-        except:
-            e_ix = 0
-        ekg = st.selectbox("EKG", ekg_l, index=e_ix)
-
-        ci1, ci2 = st.columns(2)
-        ilaclar = ci1.text_area("Kullandığı İlaçlar", value=gs("İlaçlar"))
-        baslanan = ci2.text_area("Başlanan İlaçlar", value=gs("Başlanan"))
-
-        st.markdown("##### Ek Hastalıklar")
-        ck1, ck2, ck3, ck4, ck5 = st.columns(5)
-        dm = ck1.checkbox("DM", value=gc("DM"))
-        kah = ck2.checkbox("KAH", value=gc("KAH"))
-        hpl = ck3.checkbox("HPL", value=gc("HPL"))
-        inme = ck4.checkbox("İnme", value=gc("İnme"))
-        sigara = ck5.checkbox("Sigara", value=gc("Sigara"))
-        diger = st.text_input("Diğer", value=gs("Diğer"))
-
-        st.markdown("### 🩸 Laboratuvar")
-        l1, l2, l3, l4 = st.columns(4)
-
-        hgb = l1.number_input("Hgb (g/dL)", value=gf("Hgb"))
-        hct = l1.number_input("Hct (%)", value=gf("Hct"))
-        wbc = l1.number_input("WBC (10³/µL)", value=gf("WBC"))
-        plt = l1.number_input("PLT (10³/µL)", value=gf("PLT"))
-        neu = l1.number_input("Nötrofil (%)", value=gf("Neu"))
-        lym = l1.number_input("Lenfosit (%)", value=gf("Lym"))
-        mpv = l1.number_input("MPV (fL)", value=gf("MPV"))
-        rdw = l1.number_input("RDW (%)", value=gf("RDW"))
-
-        glukoz = l2.number_input("Glukoz (mg/dL)", value=gf("Glukoz"))
-        ure = l2.number_input("Üre (mg/dL)", value=gf("Üre"))
-        krea = l2.number_input("Kreatinin (mg/dL)", value=gf("Kreatinin"))
-        uric = l2.number_input("Ürik Asit (mg/dL)", value=gf("Ürik Asit"))
-        na = l2.number_input("Na (mEq/L)", value=gf("Na"))
-        k_val = l2.number_input("K (mEq/L)", value=gf("K"))
-        alt = l2.number_input("ALT (U/L)", value=gf("ALT"))
-        ast = l2.number_input("AST (U/L)", value=gf("AST"))
-        prot = l2.number_input("Tot Prot (g/dL)", value=gf("Tot. Prot"))
-        alb = l2.number_input("Albümin (g/dL)", value=gf("Albümin"))
-
-        chol = l3.number_input("Chol (mg/dL)", value=gf("Chol"))
-        ldl = l3.number_input("LDL (mg/dL)", value=gf("LDL"))
-        hdl = l3.number_input("HDL (mg/dL)", value=gf("HDL"))
-        trig = l3.number_input("Trig (mg/dL)", value=gf("Trig"))
-
-        homo = l4.number_input("Homosistein (µmol/L)", value=gf("Homosistein"))
-        lpa = l4.number_input("Lp(a) (mg/dL)", value=gf("Lp(a)"))
-        folik = l4.number_input("Folik Asit (ng/mL)", value=gf("Folik Asit"))
-        b12 = l4.number_input("B12 (pg/mL)", value=gf("B12"))
-
-        # EKO parametreleri (eski set geri)
-        st.markdown("### 🫀 Eko")
-        e1, e2, e3, e4 = st.columns(4)
-
-        with e1:
-            st.caption("Yapısal")
-            lvedd = st.number_input("LVEDD (mm)", value=gf("LVEDD"))
-            lvesd = st.number_input("LVESD (mm)", value=gf("LVESD"))
-            ivs = st.number_input("IVS (mm)", value=gf("IVS"))
-            pw = st.number_input("PW (mm)", value=gf("PW"))
-            lvedv = st.number_input("LVEDV (mL)", value=gf("LVEDV"))
-            lvesv = st.number_input("LVESV (mL)", value=gf("LVESV"))
-            ao = st.number_input("Ao Asc (mm)", value=gf("Ao Asc"))
-
-            lvm = 0.0
-            lvmi = 0.0
-            rwt = 0.0
-            if lvedd > 0 and ivs > 0 and pw > 0:
-                d_cm = lvedd / 10
-                i_cm = ivs / 10
-                p_cm = pw / 10
-                lvm = 0.8 * (1.04 * ((d_cm + i_cm + p_cm) ** 3 - d_cm ** 3)) + 0.6
-                if bsa > 0:
-                    lvmi = lvm / bsa
-            if lvedd > 0 and pw > 0:
-                rwt = (2 * pw) / lvedd
-            st.caption(f"🔵 Mass:{lvm:.0f} | LVMi:{lvmi:.0f} | RWT:{rwt:.2f}")
-
-        with e2:
-            st.caption("Sistolik")
-            lvef = st.number_input("LVEF (%)", value=gf("LVEF"))
-            sv = st.number_input("SV (mL)", value=gf("SV"))
-            lvot = st.number_input("LVOT VTI (cm)", value=gf("LVOT VTI"))
-            gls = st.number_input("GLS (%)", value=gf("GLS"))
-            gcs = st.number_input("GCS (%)", value=gf("GCS"))
-            sdls = st.number_input("SD-LS (%)", value=gf("SD-LS"))
-
-        with e3:
-            st.caption("Diyastolik")
-            mite = st.number_input("Mitral E (cm/sn)", value=gf("Mitral E"))
-            mita = st.number_input("Mitral A (cm/sn)", value=gf("Mitral A"))
-            septe = st.number_input("Septal e' (cm/sn)", value=gf("Septal e'"))
-            late = st.number_input("Lateral e' (cm/sn)", value=gf("Lateral e'"))
-            laedv = st.number_input("LAEDV (mL)", value=gf("LAEDV"))
-            laesv = st.number_input("LAESV (mL)", value=gf("LAESV"))
-            lastr = st.number_input("LA Strain (%)", value=gf("LA Strain"))
-
-            ea = mite / mita if mita > 0 else 0
-            ee = mite / septe if septe > 0 else 0
-            laci = laedv / lvedv if lvedv > 0 else 0
-            st.caption(f"🔵 E/A:{ea:.1f} | E/e':{ee:.1f} | LACi:{laci:.2f}")
-
-        with e4:
-            st.caption("Sağ Kalp")
-            tapse = st.number_input("TAPSE (mm)", value=gf("TAPSE"))
-            rvsm = st.number_input("RV Sm (cm/sn)", value=gf("RV Sm"))
-            spap = st.number_input("sPAP (mmHg)", value=gf("sPAP"))
-            tyvel = st.number_input("TY vel. (m/sn)", value=gf("TY vel."))
-            rvot = st.number_input("RVOT VTI (cm)", value=gf("RVOT VTI"))
-            rvota = st.number_input("RVOT accT (ms)", value=gf("RVOT accT"))
-
-            tsm = tapse / rvsm if rvsm > 0 else 0
-            tspap = tapse / spap if spap > 0 else 0
-            st.caption(f"🔵 TAPSE/Sm: {tsm:.2f} | TAPSE/sPAP: {tspap:.2f}")
-
-        st.write("")
-        if st.form_submit_button("💾 KAYDET / GÜNCELLE", type="primary"):
-            if not dosya_no or not hekim:
-                st.error("Dosya No ve Hekim zorunlu!")
-            else:
-                final_data = {
-                    "Dosya Numarası": dosya_no,
-                    "Adı Soyadı": ad_soyad,
-                    "Tarih": str(basvuru),
-                    "Hekim": hekim,
-                    "İletişim": iletisim,
-                    "Yaş": yas,
-                    "Cinsiyet": cinsiyet,
-                    "Boy": boy,
-                    "Kilo": kilo,
-                    "BMI": bmi,
-                    "BSA": bsa,
-                    "TA Sistol": ta_sis,
-                    "TA Diyastol": ta_dia,
-                    "EKG": ekg,
-                    "İlaçlar": ilaclar,
-                    "Başlanan": baslanan,
-                    "DM": dm,
-                    "KAH": kah,
-                    "HPL": hpl,
-                    "İnme": inme,
-                    "Sigara": sigara,
-                    "Diğer": diger,
-                    "Hgb": hgb,
-                    "Hct": hct,
-                    "WBC": wbc,
-                    "PLT": plt,
-                    "Neu": neu,
-                    "Lym": lym,
-                    "MPV": mpv,
-                    "RDW": rdw,
-                    "Glukoz": glukoz,
-                    "Üre": ure,
-                    "Kreatinin": krea,
-                    "Ürik Asit": uric,
-                    "Na": na,
-                    "K": k_val,
-                    "ALT": alt,
-                    "AST": ast,
-                    "Tot. Prot": prot,
-                    "Albümin": alb,
-                    "Chol": chol,
-                    "LDL": ldl,
-                    "HDL": hdl,
-                    "Trig": trig,
-                    "Lp(a)": lpa,
-                    "Homosistein": homo,
-                    "Folik Asit": folik,
-                    "B12": b12,
-                    "LVEDD": lvedd,
-                    "LVESD": lvesd,
-                    "IVS": ivs,
-                    "PW": pw,
-                    "LVEDV": lvedv,
-                    "LVESV": lvesv,
-                    "LV Mass": lvm,
-                    "LVMi": lvmi,
-                    "RWT": rwt,
-                    "Ao Asc": ao,
-                    "LVEF": lvef,
-                    "SV": sv,
-                    "LVOT VTI": lvot,
-                    "GLS": gls,
-                    "GCS": gcs,
-                    "SD-LS": sdls,
-                    "Mitral E": mite,
-                    "Mitral A": mita,
-                    "Mitral E/A": ea,
-                    "Septal e'": septe,
-                    "Lateral e'": late,
-                    "Mitral E/e'": ee,
-                    "LAEDV": laedv,
-                    "LAESV": laesv,
-                    "LA Strain": lastr,
-                    "LACi": laci,
-                    "TAPSE": tapse,
-                    "RV Sm": rvsm,
-                    "TAPSE/Sm": tsm,
-                    "sPAP": spap,
-                    "TY vel.": tyvel,
-                    "TAPSE/sPAP": tspap,
-                    "RVOT VTI": rvot,
-                    "RVOT accT": rvota,
-                }
-                save_data_row(SHEET_ID, final_data, unique_col="Dosya Numarası", worksheet_index=DATA_WS_INDEX)
-                st.success(f"✅ {dosya_no} kaydedildi / güncellendi!")
-                time.sleep(0.6)
-                st.rerun()
+    render_main_form()
+
+
+# Ekran çizildi: diğer sekmelerin sayfalarını arka planda hazırla
+prefetch_worksheets(exclude=MENU_WORKSHEETS.get(menu))
+finish_perf_run()
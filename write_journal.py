@@ -0,0 +1,171 @@
+"""
+Sheets yazmaları için yerel, kalıcı (SQLite) ön-yazma günlüğü.
+
+Form kayıtları ve silmeler önce buraya eklenir, sonra arka plandaki yazıcı
+onları sırayla Sheets'e uygular. Uygulama ya da ağ yarıda kesilirse bekleyen
+kayıtlar diskte kalır ve yeniden başlatmada kaldığı yerden uygulanır.
+Kayıtlar anahtarla (Dosya Numarası / TarihSaat) upsert / silme olduğundan
+tekrar uygulamak çift satır üretmez.
+
+Streamlit'e bağımlı değildir.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+PENDING = "pending"     # Sheets'e henüz yazılmadı (ya da tekrar denenecek)
+DONE = "done"
+CONFLICT = "conflict"   # kayıt başka biri tarafından değiştirilmiş; yazılmadı
+FAILED = "failed"       # tekrar denenmeyecek hata (ör. yetki, geçersiz veri)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS journal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    op TEXT NOT NULL,
+    sheet_id TEXT NOT NULL,
+    ws_index INTEGER NOT NULL,
+    key_col TEXT NOT NULL,
+    keys TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL,
+    error TEXT NOT NULL DEFAULT '',
+    result TEXT NOT NULL DEFAULT 'null',
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS journal_status ON journal (status, id);
+"""
+
+_COLS = (
+    "id", "created_at", "op", "sheet_id", "ws_index", "key_col", "keys",
+    "payload", "status", "attempts", "next_at", "error", "result", "updated_at",
+)
+
+def _entry(row) -> dict:
+    e = dict(zip(_COLS, row))
+    e["keys"] = json.loads(e["keys"])
+    e["payload"] = json.loads(e["payload"])
+    e["result"] = json.loads(e["result"])
+    return e
+
+class WriteJournal:
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)  # durum değişince bekleyenleri uyandırır
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, op, sheet_id, ws_index, key_col, keys, payload=None) -> int:
+        """Yeni yazmayı bekleyen olarak ekler; kayıt diske yazıldıktan sonra id döner."""
+        now = time.time()
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT INTO journal (created_at, op, sheet_id, ws_index, key_col, keys, payload, status, next_at, updated_at)"
+                " VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (
+                    now, op, sheet_id, ws_index, key_col,
+                    json.dumps(list(keys), ensure_ascii=False),
+                    json.dumps(payload or {}, ensure_ascii=False),
+                    PENDING, now, now,
+                ),
+            )
+            return cur.lastrowid
+
+    def get(self, entry_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {','.join(_COLS)} FROM journal WHERE id=?", (entry_id,)
+            ).fetchone()
+        return _entry(row) if row else None
+
+    def head(self):
+        """Sıradaki (en eski) bekleyen kayıt; yoksa None. Yazmalar eklenme sırasıyla uygulanır."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {','.join(_COLS)} FROM journal WHERE status=? ORDER BY id LIMIT 1", (PENDING,)
+            ).fetchone()
+        return _entry(row) if row else None
+
+    def start_attempt(self, entry_id):
+        """Uygulamadan önce deneme sayısını artırır (yarıda kesilen deneme yeniden başlatmada görünür)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE journal SET attempts=attempts+1, updated_at=? WHERE id=?", (time.time(), entry_id)
+            )
+
+    def _finish(self, entry_id, status, error="", result=None, next_at=None):
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE journal SET status=?, error=?, result=?, next_at=COALESCE(?, next_at), updated_at=?"
+                    " WHERE id=?",
+                    (status, error, json.dumps(result, ensure_ascii=False), next_at, time.time(), entry_id),
+                )
+            self._changed.notify_all()
+
+    def mark_done(self, entry_id, result=None):
+        self._finish(entry_id, DONE, result=result)
+
+    def mark_retry(self, entry_id, error, delay):
+        self._finish(entry_id, PENDING, error=error, next_at=time.time() + delay)
+
+    def mark_failed(self, entry_id, error, status=FAILED):
+        self._finish(entry_id, status, error=error)
+
+    def wait(self, entry_id, timeout):
+        """Kayıt bekleyen olmaktan çıkana ya da süre dolana kadar bekler; son hâlini döndürür."""
+        deadline = time.monotonic() + timeout
+        while True:
+            entry = self.get(entry_id)
+            left = deadline - time.monotonic()
+            if entry is None or entry["status"] != PENDING or left <= 0:
+                return entry
+            with self._lock:
+                self._changed.wait(min(left, 0.5))
+
+    def unresolved(self) -> list:
+        """Kullanıcının görmesi gerekenler: bekleyen, çakışan ve başarısız kayıtlar (eskiden yeniye)."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {','.join(_COLS)} FROM journal WHERE status!=? ORDER BY id", (DONE,)
+            ).fetchall()
+        return [_entry(r) for r in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM journal GROUP BY status").fetchall()
+        return {PENDING: 0, DONE: 0, CONFLICT: 0, FAILED: 0, **dict(rows)}
+
+    def requeue(self, entry_id, payload=None):
+        """
+        Çakışan / başarısız kaydı yeniden bekleyen yapar (payload verilirse onunla). Deneme
+        sayısı korunur: yazıcı uygulamadan önce sayfayı senkronlar.
+        """
+        now = time.time()
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE journal SET status=?, error='', next_at=?, updated_at=?, payload=COALESCE(?, payload)"
+                    " WHERE id=? AND status IN (?, ?)",
+                    (
+                        PENDING, now, now, None if payload is None else json.dumps(payload, ensure_ascii=False),
+                        entry_id, CONFLICT, FAILED,
+                    ),
+                )
+            self._changed.notify_all()
+
+    def dismiss(self, entry_id):
+        """Çakışan / başarısız kaydı kullanıcı gördükten sonra listeden kaldırır."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM journal WHERE id=? AND status IN (?, ?)", (entry_id, CONFLICT, FAILED))
+
+    def prune(self, max_age):
+        """max_age saniyeden eski uygulanmış kayıtları siler."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM journal WHERE status=? AND updated_at<?", (DONE, time.time() - max_age)
+            )